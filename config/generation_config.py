@@ -1,35 +1,391 @@
-"""Configuration loader"""
-import yaml
+"""Configuration loader
+
+load_config()/get_config() return the raw generation_config.yaml values.
+load_settings() parses generation_config.yaml and youtube_config.yaml once into
+frozen, validated objects (with DOODLY_* environment overrides), so bad settings
+fail at startup instead of partway through a batch.
+"""
+import os
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+CONFIG_DIR = Path(__file__).parent
 
 _config = None
+_lookups = {}
+_settings = None
+
+# Environment variable -> (config file, key path); values are parsed like the YAML ones
+ENV_OVERRIDES = {
+    'DOODLY_COMFYUI_URL': ('generation', ('comfyui', 'url')),
+    'DOODLY_LOCAL_OUTPUT_DIR': ('generation', ('comfyui', 'local_output_dir')),
+    'DOODLY_COMFYUI_BACKENDS': ('generation', ('comfyui', 'backends')),
+    'DOODLY_DAEMON_URL': ('generation', ('daemon', 'url')),
+    'DOODLY_STEPS': ('youtube', ('default', 'steps')),
+    'DOODLY_CFG_SCALE': ('youtube', ('default', 'cfg_scale')),
+    'DOODLY_RESOLUTION': ('youtube', ('default', 'resolution')),
+    'DOODLY_SEED': ('youtube', ('default', 'seed')),
+    'DOODLY_DELAY': ('youtube', ('batch', 'delay_between')),
+    'DOODLY_TIMEOUT_PER_IMAGE': ('youtube', ('batch', 'timeout_per_image')),
+}
+
+
+class ConfigError(ValueError):
+    """Invalid configuration; lists every problem found"""
+
+
+@dataclass(frozen=True)
+class Preset:
+    name: str
+    steps: int
+    cfg_scale: float
+    resolution: Tuple[int, int]
+    description: str = ""
+    hires: bool = False  # generate at native resolution, then tiled upscale + refine
+
+
+@dataclass(frozen=True)
+class ComfyUISettings:
+    url: str
+    install_path: Path
+    local_output_dir: Optional[Path] = None  # ComfyUI output folder for zero-copy pickup
+    delete_history: bool = True  # drop saved prompts from ComfyUI's /history
+    prune_outputs: bool = False  # delete ComfyUI's copy of saved outputs (local folder only)
+    gc_batch_size: int = 16  # history entries per delete request
+    backends: Tuple[str, ...] = ()  # servers long clips are spread over; empty = just url
+
+
+@dataclass(frozen=True)
+class DaemonSettings:
+    url: Optional[str]  # generation daemon the batch scripts submit to; None = always in-process
+    workers: int  # jobs in flight on ComfyUI across all projects
+
+
+@dataclass(frozen=True)
+class SketchDefaults:
+    steps: int
+    cfg_scale: float
+    resolution: Tuple[int, int]
+    sampler: str
+    scheduler: str
+    seed: int
+
+
+@dataclass(frozen=True)
+class BatchSettings:
+    parallel_workers: int
+    delay_between: float
+    timeout_per_image: float
+
+
+@dataclass(frozen=True)
+class HiresSettings:
+    native_pixels: int
+    denoise: float
+    tile_size: int
+    upscale_model: str  # upscale_models file; empty for a plain resize
+
+
+@dataclass(frozen=True)
+class DraftSettings:
+    preset: str  # sketch preset for the --draft review pass
+    refine_denoise: float  # img2img strength when re-rendering an approved draft
+    auto_approve_white: Tuple[float, float]  # near-white pixel fraction a draft needs to be auto-approved
+
+
+@dataclass(frozen=True)
+class AnimateDiffSettings:
+    default_frames: int
+    context_length: int
+    segment_frames: int  # longest window submitted as one prompt
+    segment_overlap: int  # frames shared (and cross-dissolved) between windows
+
+
+@dataclass(frozen=True)
+class Settings:
+    comfyui: ComfyUISettings
+    sketch_defaults: SketchDefaults
+    presets: Mapping[str, Preset]  # youtube_config.yaml: sketch images
+    clip_presets: Mapping[str, Preset]  # generation_config.yaml: AnimateDiff clips
+    batch: BatchSettings
+    hires: HiresSettings
+    draft: DraftSettings
+    animatediff: AnimateDiffSettings
+    daemon: DaemonSettings
+    fps: int
+    negative_prompt: str
+
+    def preset(self, name: str) -> Preset:
+        """Sketch preset by name"""
+        try:
+            return self.presets[name]
+        except KeyError:
+            raise ConfigError(f"Unknown preset '{name}' (available: {', '.join(self.presets)})") from None
+
 
 def load_config(config_path=None):
     """Load generation configuration"""
     global _config
-    
+
     if _config is not None:
         return _config
-    
+
     if config_path is None:
-        config_path = Path(__file__).parent / "generation_config.yaml"
-    
+        config_path = CONFIG_DIR / "generation_config.yaml"
+
+    import yaml
     with open(config_path, 'r') as f:
         _config = yaml.safe_load(f)
-    
+
     return _config
 
 def get_config(key, default=None):
     """Get a configuration value by key (supports dot notation)"""
+    if key in _lookups:
+        value = _lookups[key]
+        return default if value is None else value
     config = load_config()
-    keys = key.split('.')
     value = config
-    for k in keys:
-        if isinstance(value, dict):
-            value = value.get(k)
-        else:
+    for k in key.split('.'):
+        value = value.get(k) if isinstance(value, dict) else None
+        if value is None:
+            break
+    _lookups[key] = value
+    return default if value is None else value
+
+
+def _read_yaml(path):
+    import yaml
+    try:
+        with open(path, 'r') as f:
+            return yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        raise ConfigError(f"Config file not found: {path}") from None
+    except yaml.YAMLError as e:
+        raise ConfigError(f"Invalid YAML in {path}: {e}") from None
+
+
+def _section(raw, key):
+    value = raw.get(key)
+    return value if isinstance(value, dict) else {}
+
+
+class _Validator:
+    """Collects problems so one ConfigError reports all of them"""
+
+    def __init__(self):
+        self.errors = []
+
+    def number(self, value, field, cast=float, minimum=None, maximum=None, default=None):
+        if value is None:
+            if default is None:
+                self.errors.append(f"{field}: missing")
             return default
+        try:
+            number = cast(value)
+            if cast is int and float(value) != number:
+                raise ValueError
+        except (TypeError, ValueError):
+            self.errors.append(f"{field}: expected {cast.__name__}, got {value!r}")
+            return default
+        if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+            self.errors.append(f"{field}: {number} outside [{minimum}, {maximum}]")
+        return number
+
+    def resolution(self, value, field, default=None):
+        if isinstance(value, str):
+            value = value.lower().split('x')
         if value is None:
+            value = default
+        try:
+            width, height = (int(v) for v in value)
+        except (TypeError, ValueError):
+            self.errors.append(f"{field}: expected [width, height] or WxH, got {value!r}")
             return default
-    return value
+        if width <= 0 or height <= 0 or width % 8 or height % 8:
+            self.errors.append(f"{field}: {width}x{height} must be positive multiples of 8")
+        return (width, height)
+
+    def urls(self, value, field):
+        if isinstance(value, str):
+            value = [part for part in value.split(',') if part.strip()]
+        if not isinstance(value, (list, tuple)):
+            self.errors.append(f"{field}: expected a list of URLs, got {value!r}")
+            return ()
+        return tuple(self.url(item.strip() if isinstance(item, str) else item, f"{field}[{i}]")
+                     for i, item in enumerate(value))
+
+    def url(self, value, field):
+        if not isinstance(value, str) or not value.startswith(('http://', 'https://')):
+            self.errors.append(f"{field}: expected an http(s) URL, got {value!r}")
+            return value
+        return value.rstrip('/')
+
+    def preset(self, name, raw, field, cfg_default):
+        if not isinstance(raw, dict):
+            self.errors.append(f"{field}: expected a mapping")
+            raw = {}
+        return Preset(
+            name=name,
+            steps=self.number(raw.get('steps'), f"{field}.steps", int, 1, 150),
+            cfg_scale=self.number(raw.get('cfg_scale', cfg_default), f"{field}.cfg_scale", float, 0.0, 30.0,
+                                  default=cfg_default),
+            resolution=self.resolution(raw.get('resolution'), f"{field}.resolution"),
+            description=str(raw.get('description', '')),
+            hires=bool(raw.get('hires', False)),
+        )
+
+
+def _apply_env_overrides(raw_files, environ):
+    for var, (file_key, path) in ENV_OVERRIDES.items():
+        value = environ.get(var)
+        if value is None or value == '':
+            continue
+        node = raw_files[file_key]
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+
+
+def parse_settings(generation_raw: dict, youtube_raw: dict) -> Settings:
+    """Validate raw YAML dicts into Settings; raises ConfigError listing every problem"""
+    check = _Validator()
+
+    comfyui_raw = _section(generation_raw, 'comfyui')
+    install_path = Path(str(comfyui_raw.get('install_path', '~/Documents/ComfyUI'))).expanduser()
+    local_output_dir = comfyui_raw.get('local_output_dir', 'auto')
+    if local_output_dir == 'auto':
+        local_output_dir = install_path / 'output'
+    comfyui = ComfyUISettings(
+        url=check.url(comfyui_raw.get('url'), 'comfyui.url'),
+        install_path=install_path,
+        local_output_dir=Path(str(local_output_dir)).expanduser() if local_output_dir else None,
+        delete_history=bool(comfyui_raw.get('delete_history', True)),
+        prune_outputs=bool(comfyui_raw.get('prune_outputs', False)),
+        gc_batch_size=check.number(comfyui_raw.get('gc_batch_size', 16), 'comfyui.gc_batch_size', int, 1, 1000,
+                                   default=16),
+        backends=check.urls(comfyui_raw.get('backends') or [], 'comfyui.backends'),
+    )
+
+    daemon_raw = _section(generation_raw, 'daemon')
+    daemon_url = daemon_raw.get('url', 'http://127.0.0.1:8765')
+    daemon = DaemonSettings(
+        url=check.url(daemon_url, 'daemon.url') if daemon_url else None,
+        workers=check.number(daemon_raw.get('workers', 2), 'daemon.workers', int, 1, 64, default=2),
+    )
+
+    default_raw = _section(youtube_raw, 'default')
+    sketch_defaults = SketchDefaults(
+        steps=check.number(default_raw.get('steps'), 'default.steps', int, 1, 150, default=20),
+        cfg_scale=check.number(default_raw.get('cfg_scale'), 'default.cfg_scale', float, 0.0, 30.0, default=7.0),
+        resolution=check.resolution(default_raw.get('resolution'), 'default.resolution', default=(1024, 768)),
+        sampler=str(default_raw.get('sampler', 'dpmpp_2m')),
+        scheduler=str(default_raw.get('scheduler', 'karras')),
+        seed=check.number(default_raw.get('seed', -1), 'default.seed', int, -1, 2**32 - 1, default=-1),
+    )
+
+    presets = {
+        name: check.preset(name, raw, f"presets.{name}", sketch_defaults.cfg_scale)
+        for name, raw in _section(youtube_raw, 'presets').items()
+    }
+
+    generation = _section(generation_raw, 'generation')
+    clip_cfg = check.number(generation.get('default_cfg_scale', 7.5), 'generation.default_cfg_scale',
+                            float, 0.0, 30.0, default=7.5)
+    clip_presets = {
+        name: check.preset(name, raw, f"generation.presets.{name}", clip_cfg)
+        for name, raw in _section(generation, 'presets').items()
+    }
+
+    batch_raw = _section(youtube_raw, 'batch')
+    batch = BatchSettings(
+        parallel_workers=check.number(batch_raw.get('parallel_workers', 1), 'batch.parallel_workers', int, 1, 64,
+                                      default=1),
+        delay_between=check.number(batch_raw.get('delay_between', 5), 'batch.delay_between', float, 0.0,
+                                   default=5.0),
+        timeout_per_image=check.number(batch_raw.get('timeout_per_image', 180), 'batch.timeout_per_image', float,
+                                       1.0, default=180.0),
+    )
+
+    hires_raw = _section(youtube_raw, 'hires')
+    hires = HiresSettings(
+        native_pixels=check.number(hires_raw.get('native_pixels', 1024 * 1024), 'hires.native_pixels', int,
+                                   256 * 256, 4096 * 4096, default=1024 * 1024),
+        denoise=check.number(hires_raw.get('denoise', 0.35), 'hires.denoise', float, 0.05, 1.0, default=0.35),
+        tile_size=check.number(hires_raw.get('tile_size', 512), 'hires.tile_size', int, 64, 4096, default=512),
+        upscale_model=str(hires_raw.get('upscale_model') or ''),
+    )
+
+    draft_raw = _section(youtube_raw, 'draft')
+    draft_preset = str(draft_raw.get('preset', 'fast'))
+    if draft_preset not in presets:
+        check.errors.append(f"draft.preset: unknown preset {draft_preset!r} (available: {', '.join(presets)})")
+    white = draft_raw.get('auto_approve_white', [0.8, 0.995])
+    if not (isinstance(white, (list, tuple)) and len(white) == 2):
+        check.errors.append(f"draft.auto_approve_white: expected [min, max], got {white!r}")
+        white = [0.8, 0.995]
+    draft = DraftSettings(
+        preset=draft_preset,
+        refine_denoise=check.number(draft_raw.get('refine_denoise', 0.55), 'draft.refine_denoise', float, 0.05, 1.0,
+                                    default=0.55),
+        auto_approve_white=(
+            check.number(white[0], 'draft.auto_approve_white[0]', float, 0.0, 1.0, default=0.8),
+            check.number(white[1], 'draft.auto_approve_white[1]', float, 0.0, 1.0, default=0.995),
+        ),
+    )
+
+    animatediff_raw = _section(generation, 'animatediff')
+    segment_frames = check.number(animatediff_raw.get('segment_frames', 48), 'generation.animatediff.segment_frames',
+                                  int, 2, 4096, default=48)
+    animatediff = AnimateDiffSettings(
+        default_frames=check.number(animatediff_raw.get('default_frames', 48), 'generation.animatediff.default_frames',
+                                    int, 1, 4096, default=48),
+        context_length=check.number(animatediff_raw.get('context_length', 16), 'generation.animatediff.context_length',
+                                    int, 1, 4096, default=16),
+        segment_frames=segment_frames,
+        segment_overlap=check.number(animatediff_raw.get('segment_overlap', 8), 'generation.animatediff.segment_overlap',
+                                     int, 0, segment_frames // 2, default=8),
+    )
+
+    fps = check.number(generation.get('fps', 24), 'generation.fps', int, 1, 120, default=24)
+    negative_prompt = youtube_raw.get('negative_prompt', '')
+    if not isinstance(negative_prompt, str):
+        check.errors.append(f"negative_prompt: expected a string, got {negative_prompt!r}")
+        negative_prompt = ''
+
+    if check.errors:
+        raise ConfigError("Invalid configuration:\n  - " + "\n  - ".join(check.errors))
+
+    return Settings(
+        comfyui=comfyui,
+        sketch_defaults=sketch_defaults,
+        presets=MappingProxyType(presets),
+        clip_presets=MappingProxyType(clip_presets),
+        batch=batch,
+        hires=hires,
+        draft=draft,
+        animatediff=animatediff,
+        daemon=daemon,
+        fps=fps,
+        negative_prompt=negative_prompt,
+    )
+
+
+def load_settings(generation_path=None, youtube_path=None, environ=None) -> Settings:
+    """Parse and validate both config files once (cached for the default paths/environment)"""
+    global _settings
+    use_cache = generation_path is None and youtube_path is None and environ is None
+    if use_cache and _settings is not None:
+        return _settings
 
+    raw_files = {
+        'generation': _read_yaml(generation_path or CONFIG_DIR / "generation_config.yaml"),
+        'youtube': _read_yaml(youtube_path or CONFIG_DIR / "youtube_config.yaml"),
+    }
+    _apply_env_overrides(raw_files, os.environ if environ is None else environ)
+    settings = parse_settings(raw_files['generation'], raw_files['youtube'])
+    if use_cache:
+        _settings = settings
+    return settings
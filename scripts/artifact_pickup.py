@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Pick up ComfyUI outputs without copying them through HTTP
+When ComfyUI runs on this host (the start_comfyui.sh deployment) its output
+folder is on the same filesystem, so the file named in the history entry is
+hard-linked (or, with move=True, os.replace'd) into our output directory: no
+bytes are copied. When the folder is not reachable - ComfyUI on another host, a
+different filesystem, or a file that is not there - the image is streamed from
+/view to disk in chunks instead of being buffered in memory.
+
+Configured by comfyui.local_output_dir in config/generation_config.yaml
+("auto" = <install_path>/output, "" = always use /view).
+
+Usage:
+    python scripts/artifact_pickup.py          # show whether local pickup is active
+"""
+
+import errno
+import hashlib
+import os
+import socket
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.generation_config import load_settings
+
+CHUNK_SIZE = 1024 * 1024
+LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1', '0.0.0.0')
+
+
+def local_output_dir(api_url=None):
+    """
+    ComfyUI's output folder when it is reachable from here, else None
+
+    With api_url, only a server on this host counts: another backend's output
+    filenames say nothing about the files in our local folder.
+    """
+    path = load_settings().comfyui.local_output_dir
+    if path is None or not path.is_dir():
+        return None
+    if api_url is not None and urlparse(api_url).hostname not in LOCAL_HOSTS + (socket.gethostname(),):
+        return None
+    return path
+
+
+def local_source(image_info: dict, local_dir) -> Path:
+    """Path of a history entry's file inside the local output folder, or None if it is not there"""
+    if local_dir is None or image_info.get('type', 'output') != 'output':
+        return None
+    source = Path(local_dir) / image_info.get('subfolder', '') / image_info['filename']
+    return source if source.is_file() else None
+
+
+def _file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link(source: Path, dest: Path, move: bool) -> str:
+    """Place source at dest without copying; returns the method used"""
+    tmp_path = dest.with_name(dest.name + '.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+    if move:
+        os.replace(source, dest)
+        return 'move'
+    os.link(source, tmp_path)
+    # Link under a temporary name first so an existing dest is replaced atomically
+    os.replace(tmp_path, dest)
+    return 'hardlink'
+
+
+def _stream(api_url, image_info: dict, dest: Path):
+    """Stream /view to dest in chunks, hashing on the way; returns (sha256, bytes)"""
+    from scripts.generate_clip import get_session
+
+    params = {"filename": image_info['filename'], "subfolder": image_info.get('subfolder', ''),
+              "type": image_info.get('type', 'output')}
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = dest.with_name(dest.name + '.tmp')
+    with get_session().get(f"{api_url}/view", params=params, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with open(tmp_path, 'wb') as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+    os.replace(tmp_path, dest)
+    return digest.hexdigest(), size
+
+
+def fetch_output(api_url, image_info: dict, dest_path, local_dir=None, move=False) -> dict:
+    """
+    Put one history output at dest_path
+
+    local_dir: ComfyUI's output folder (local_output_dir()); None always streams /view
+    move: take the file out of ComfyUI's folder (os.replace) instead of hard-linking it
+    Returns {'path', 'sha256', 'bytes', 'method'} with method hardlink, move or view.
+    """
+    dest = Path(dest_path)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    source = local_source(image_info, local_dir)
+    if source is not None:
+        try:
+            method = _link(source, dest, move)
+            return {'path': str(dest), 'sha256': _file_sha256(dest), 'bytes': dest.stat().st_size,
+                    'method': method}
+        except OSError as e:
+            # Different filesystem or no hard-link support: fall back to the network path
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES):
+                raise
+    sha256, size = _stream(api_url, image_info, dest)
+    return {'path': str(dest), 'sha256': sha256, 'bytes': size, 'method': 'view'}
+
+
+def main():
+    configured = load_settings().comfyui.local_output_dir
+    reachable = local_output_dir()
+    if configured is None:
+        print("🌐 local_output_dir disabled: outputs are streamed from /view")
+    elif reachable is None:
+        print(f"🌐 {configured} not found: outputs are streamed from /view")
+    else:
+        print(f"📂 Local pickup from {reachable} (hard links, no copies)")
+
+
+if __name__ == '__main__':
+    main()
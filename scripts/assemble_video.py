@@ -2,13 +2,19 @@
 """
 Assemble clips and voiceover into final video
 Usage: python scripts/assemble_video.py --clips clips/ --voiceover voice.wav --output final.mp4
+       python scripts/assemble_video.py --timeline timeline.json --output final.mp4
+       python scripts/assemble_video.py --timeline timeline.json --output final.mp4 --incremental
 """
 
 import argparse
+import hashlib
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import subprocess
 import sys
+import time
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -84,12 +90,35 @@ def assemble_with_ffmpeg(clips_dir, voiceover_path, output_path, resolution=(192
         return False
 
 
+def load_manifest(manifest_path):
+    """
+    Clip records from manifest.json (a list) or manifest.jsonl (one record per line)
+    
+    The JSONL manifest is appended while batch_generate.py runs, so it may be
+    partial and in completion order: records are returned sorted by clip id and a
+    torn last line is ignored.
+    """
+    if Path(manifest_path).suffix.lower() != '.jsonl':
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    
+    manifest = []
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                manifest.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    manifest.sort(key=lambda item: item['clip']['id'])
+    return manifest
+
+
 def assemble_from_manifest(manifest_path, voiceover_path, output_path):
-    """Assemble video from manifest JSON"""
-    with open(manifest_path, 'r') as f:
-        manifest = json.load(f)
+    """Assemble video from a manifest (.json, or a possibly partial .jsonl)"""
+    manifest = load_manifest(manifest_path)
     
     clips = [item['file'] for item in manifest if Path(item['file']).exists()]
+    print(f"Manifest: {len(clips)} finished clip(s)")
     
     if not clips:
         print("Error: No valid clips found in manifest")
@@ -110,10 +139,286 @@ def assemble_from_manifest(manifest_path, voiceover_path, output_path):
     return assemble_with_ffmpeg(temp_dir, voiceover_path, output_path)
 
 
+def assemble_from_timeline(timeline_path, output_path, resolution=(1920, 1080)):
+    """Assemble video + narration from a timeline JSON in a single ffmpeg pass"""
+    from scripts.timeline_planner import load_timeline, build_ffmpeg_command
+    
+    try:
+        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        print("Error: ffmpeg not found. Please install: brew install ffmpeg")
+        return False
+    
+    timeline = load_timeline(timeline_path)
+    if not timeline['scenes']:
+        print("Error: No scenes in timeline")
+        return False
+    
+    work_dir = Path(output_path).parent
+    cmd = build_ffmpeg_command(timeline, output_path, work_dir, resolution)
+    
+    print("Assembling video from timeline...")
+    print(f"Scenes: {len(timeline['scenes'])}")
+    print(f"Duration: {timeline['total_duration']:.1f}s ({timeline['total_frames']} frames)")
+    print(f"Output: {output_path}")
+    
+    try:
+        subprocess.run(cmd, check=True)
+        (work_dir / 'timeline_concat.txt').unlink()
+        print(f"\n✓ Video assembled: {output_path}")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"Error assembling video: {e}")
+        return False
+
+
+# Bump when segment encoding settings change so cached segments are rebuilt
+SEGMENT_FORMAT_VERSION = 2
+
+
+def file_digest(path, hash_cache):
+    """SHA-256 of a file, memoized by (size, mtime) so unchanged inputs are not re-read"""
+    stat = os.stat(path)
+    key = str(Path(path).absolute())
+    cached = hash_cache.get(key)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    hash_cache[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    return hash_cache[key][2]
+
+
+def segment_key(scene, params, hash_cache):
+    """Cache key for a scene segment: hashes of its visual, audio and render parameters"""
+    visual = scene.get('clip') or scene['image']
+    parts = {
+        'version': SEGMENT_FORMAT_VERSION,
+        'params': params,
+        'visual': file_digest(visual, hash_cache),
+        'is_clip': bool(scene.get('clip')),
+        'audio': [file_digest(chunk['file'], hash_cache) for chunk in scene['audio']],
+        'frames': scene['frames'],
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+
+
+def segment_audio_path(segment_path):
+    """PCM narration that goes with a video-only segment"""
+    return segment_path.with_suffix('.wav')
+
+
+def segment_index_path(cache_dir, output_path):
+    """Segments an output was last assembled from; one index per output sharing the cache"""
+    digest = hashlib.sha1(str(Path(output_path).absolute()).encode('utf-8')).hexdigest()[:12]
+    return Path(cache_dir) / f"index_{digest}.json"
+
+
+def _read_index(index_path):
+    try:
+        with open(index_path, 'r') as f:
+            return json.load(f).get('segments', [])
+    except (OSError, ValueError, AttributeError):
+        return []
+
+
+def encode_segment(scene, segment_path, params):
+    """
+    Encode one scene to a video-only MP4 segment plus its padded narration as PCM WAV
+    
+    Audio is kept uncompressed per scene: AAC adds priming samples at the start of
+    every stream, so stream-copying per-scene AAC drifts the narration a little more
+    at each cut. The WAVs are joined sample-exactly and encoded once.
+    """
+    from scripts.timeline_planner import scene_audio_filter
+    from scripts.tracing import span
+    
+    width, height = params['resolution']
+    fps = params['fps']
+    duration = f"{scene['duration']:.6f}"
+    
+    if scene.get('clip'):
+        cmd = ['ffmpeg', '-i', scene['clip']]
+    else:
+        cmd = ['ffmpeg', '-loop', '1', '-framerate', str(fps), '-t', duration, '-i', scene['image']]
+    for chunk in scene['audio']:
+        cmd.extend(['-i', chunk['file']])
+    
+    # Exactly the scene's frames worth of samples, so concatenated WAVs stay on the video clock
+    samples = int(round(scene['frames'] * params['sample_rate'] / fps))
+    filters = [
+        scene_audio_filter(scene, 1, params['sample_rate'], '[apad]'),
+        f"[apad]apad=whole_len={samples},atrim=end_sample={samples}[aout]",
+        f"[0:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:white,fps={fps},setsar=1[vout]",
+    ]
+    tmp_path = segment_path.with_name(segment_path.stem + '.tmp.mp4')
+    audio_path = segment_audio_path(segment_path)
+    tmp_audio_path = segment_path.with_name(segment_path.stem + '.tmp.wav')
+    cmd.extend([
+        '-filter_complex', ';'.join(filters),
+        '-map', '[vout]',
+        '-an',
+        '-c:v', 'libx264',
+        '-pix_fmt', 'yuv420p',
+        '-video_track_timescale', str(fps * 1000),
+        '-frames:v', str(scene['frames']),
+        '-y',
+        str(tmp_path),
+        '-map', '[aout]',
+        '-c:a', 'pcm_s16le',
+        '-ar', str(params['sample_rate']),
+        '-y',
+        str(tmp_audio_path)
+    ])
+    
+    with span('encode', scene=scene['scene_number'], frames=scene['frames']):
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"Error encoding scene {scene['scene_number']}: {result.stderr[-500:]}")
+        return False
+    os.replace(tmp_audio_path, audio_path)
+    os.replace(tmp_path, segment_path)
+    return True
+
+
+def assemble_incremental(timeline_path, output_path, resolution=(1920, 1080), cache_dir=None, jobs=2):
+    """
+    Assemble from a timeline, re-encoding only scenes whose inputs changed
+    
+    Each scene is encoded to a segment named by the hash of its image/clip, audio chunks
+    and render parameters. Unchanged scenes reuse their cached segment; the video
+    segments are joined with a stream-copy concat and the per-scene PCM narration is
+    joined and encoded to AAC once for the whole timeline. Each output keeps an index
+    of its segments in the cache, so outputs sharing a cache only drop their own
+    superseded segments.
+    """
+    from scripts.timeline_planner import load_timeline
+    
+    try:
+        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        print("Error: ffmpeg not found. Please install: brew install ffmpeg")
+        return False
+    
+    timeline = load_timeline(timeline_path)
+    scenes = timeline['scenes']
+    if not scenes:
+        print("Error: No scenes in timeline")
+        return False
+    
+    cache_dir = Path(cache_dir) if cache_dir else Path(output_path).parent / 'segments'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    hash_cache_path = cache_dir / 'hashes.json'
+    hash_cache = {}
+    if hash_cache_path.exists():
+        with open(hash_cache_path, 'r') as f:
+            hash_cache = json.load(f)
+    
+    params = {
+        'resolution': list(resolution),
+        'fps': timeline['fps'],
+        'sample_rate': timeline['sample_rate'],
+    }
+    
+    start_time = time.time()
+    segments = []
+    dirty = []
+    for scene in scenes:
+        segment_path = cache_dir / f"scene_{scene['scene_number']}_{segment_key(scene, params, hash_cache)}.mp4"
+        segments.append(segment_path)
+        if not segment_path.exists() or not segment_audio_path(segment_path).exists():
+            dirty.append((scene, segment_path))
+    
+    tmp_hash_path = hash_cache_path.with_suffix('.tmp')
+    with open(tmp_hash_path, 'w') as f:
+        json.dump(hash_cache, f)
+    os.replace(tmp_hash_path, hash_cache_path)
+    
+    print("Assembling video incrementally...")
+    print(f"Scenes: {len(scenes)} ({len(dirty)} to encode, {len(scenes) - len(dirty)} cached)")
+    
+    if dirty:
+        from scripts.progress import ProgressTracker
+        
+        def encode_job(item):
+            started = progress.start('encode')
+            ok = encode_segment(item[0], item[1], params)
+            progress.finish('encode', started, ok=ok)
+            return ok
+        
+        with ProgressTracker({'encode': len(dirty)}) as progress:
+            with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+                results = list(executor.map(encode_job, dirty))
+        if not all(results):
+            return False
+    
+    concat_file = cache_dir / 'segments_concat.txt'
+    audio_concat_file = cache_dir / 'segments_audio_concat.txt'
+    with open(concat_file, 'w') as f:
+        for segment_path in segments:
+            f.write(f"file '{segment_path.absolute()}'\n")
+    with open(audio_concat_file, 'w') as f:
+        for segment_path in segments:
+            f.write(f"file '{segment_audio_path(segment_path).absolute()}'\n")
+    
+    cmd = [
+        'ffmpeg',
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', str(concat_file),
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', str(audio_concat_file),
+        '-map', '0:v',
+        '-map', '1:a',
+        '-c:v', 'copy',
+        '-c:a', 'aac',
+        '-ar', str(params['sample_rate']),
+        '-movflags', '+faststart',
+        '-y',
+        str(Path(output_path).absolute())
+    ]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        concat_file.unlink()
+        audio_concat_file.unlink()
+    except subprocess.CalledProcessError as e:
+        print(f"Error concatenating segments: {e.stderr.decode(errors='replace')[-500:]}")
+        return False
+    
+    # Drop segments this output no longer uses, unless another output's index still lists them
+    index_path = segment_index_path(cache_dir, output_path)
+    previous = _read_index(index_path)
+    tmp_index_path = index_path.with_suffix('.tmp')
+    with open(tmp_index_path, 'w') as f:
+        json.dump({'output': str(Path(output_path).absolute()),
+                   'segments': [segment_path.name for segment_path in segments]}, f)
+    os.replace(tmp_index_path, index_path)
+    in_use = set()
+    for other_index in cache_dir.glob('index_*.json'):
+        in_use.update(_read_index(other_index))
+    for name in previous:
+        if name not in in_use:
+            for stale in (cache_dir / name, segment_audio_path(cache_dir / name)):
+                if stale.exists():
+                    stale.unlink()
+    
+    print(f"\n✓ Video assembled: {output_path} ({time.time() - start_time:.1f}s)")
+    return True
+
+
 def main():
     parser = argparse.ArgumentParser(description='Assemble clips into final video')
     parser.add_argument('--clips', help='Directory containing clips')
-    parser.add_argument('--manifest', help='Manifest JSON file')
+    parser.add_argument('--manifest', help='Manifest file (manifest.json, or manifest.jsonl while a batch is running)')
+    parser.add_argument('--timeline', help='Timeline JSON from timeline_planner.py (audio-aligned)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='With --timeline: re-encode only scenes whose image/audio changed')
+    parser.add_argument('--segment-cache', help='Segment cache directory (default: <output dir>/segments)')
+    parser.add_argument('--jobs', type=int, default=2, help='Parallel segment encodes with --incremental')
     parser.add_argument('--voiceover', help='Voiceover audio file')
     parser.add_argument('--output', required=True, help='Output video file')
     parser.add_argument('--resolution', default='1920x1080', help='Output resolution')
@@ -121,14 +426,19 @@ def main():
     
     args = parser.parse_args()
     
-    if not args.clips and not args.manifest:
-        print("Error: Must provide --clips or --manifest")
+    if not args.clips and not args.manifest and not args.timeline:
+        print("Error: Must provide --clips, --manifest or --timeline")
         sys.exit(1)
     
     # Parse resolution
     width, height = map(int, args.resolution.split('x'))
     
-    if args.manifest:
+    if args.timeline and args.incremental:
+        success = assemble_incremental(args.timeline, args.output, (width, height),
+                                       args.segment_cache, args.jobs)
+    elif args.timeline:
+        success = assemble_from_timeline(args.timeline, args.output, (width, height))
+    elif args.manifest:
         success = assemble_from_manifest(args.manifest, args.voiceover, args.output)
     else:
         success = assemble_with_ffmpeg(args.clips, args.voiceover, args.output, 
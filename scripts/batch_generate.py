@@ -1,19 +1,27 @@
 #!/usr/bin/env python3
 """
 Batch generate multiple clips from a script file
+Finished clips are appended to <output>/manifest.jsonl as they complete, so
+assemble_video.py --manifest can start on a partial batch (or one that crashed).
+
 Usage: python scripts/batch_generate.py --script projects/example/script.txt
+       python scripts/batch_generate.py --script projects/example/script.txt --parallel 3
 """
 
 import argparse
 import json
+import os
 import yaml
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import sys
-from generate_clip import generate_clip
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from scripts.generate_clip import generate_clip
+from scripts.job_dedup import job_key, link_or_copy, plan_unique_jobs
+
 
 def parse_script(script_path):
     """Parse script file into clip definitions"""
@@ -50,44 +58,113 @@ def parse_script(script_path):
     return clips
 
 
-def batch_generate(script_path, output_dir="projects/output/clips"):
-    """Generate all clips from script"""
+class ManifestWriter:
+    """
+    Append-only JSONL manifest, one line per finished clip
+    
+    Each record is written with a single write() on an O_APPEND descriptor and
+    fsynced, so readers only ever see whole lines and a crash keeps every clip
+    that finished before it.
+    """
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+    
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        os.write(self.fd, line.encode('utf-8'))
+        os.fsync(self.fd)
+    
+    def close(self):
+        os.close(self.fd)
+
+
+def batch_generate(script_path, output_dir="projects/output/clips", seed=-1, parallel=1):
+    """Generate all clips from script
+    
+    With a fixed seed, repeated lines (same prompt and duration) are generated once
+    and hard-linked to clip_<id> files for the other occurrences. With parallel > 1
+    up to that many clips are queued on ComfyUI at once (sharing one HTTP session).
+    """
     clips = parse_script(script_path)
+    plan = plan_unique_jobs(clips, lambda clip: None if seed == -1 else job_key(
+        clip['prompt'], duration=clip['duration'], seed=seed))
+    saved_jobs = len(clips) - len(plan)
     
     print(f"Found {len(clips)} clips to generate")
+    if saved_jobs:
+        print(f"♻️  {saved_jobs} repeated clip(s) will reuse an earlier generation ({len(plan)} GPU jobs)")
     print(f"Output directory: {output_dir}")
     print()
     
     results = []
+    manifest = ManifestWriter(Path(output_dir) / 'manifest.jsonl')
     
-    for clip in clips:
-        print(f"\n[{clip['id']}/{len(clips)}] {clip['description']}")
-        print(f"Duration: {clip['duration']}s")
-        
-        output_path = generate_clip(
+    def run(clip):
+        return generate_clip(
             prompt=clip['prompt'],
             negative_prompt="colored, realistic, complex background, shadows, multiple characters",
             duration=clip['duration'],
+            seed=seed,
             output_dir=output_dir
         )
-        
+    
+    def finish(clip, duplicates, output_path):
         if output_path:
-            results.append({
-                'clip': clip,
-                'file': output_path
-            })
+            finished = [{'clip': clip, 'file': output_path}]
             print(f"✓ Generated: {output_path}")
+            for duplicate in duplicates:
+                target = Path(output_dir) / f"clip_{duplicate['id']:03d}{Path(output_path).suffix}"
+                finished.append({
+                    'clip': duplicate,
+                    'file': link_or_copy(output_path, target),
+                    'reused_from': clip['id']
+                })
+                print(f"♻️  Clip {duplicate['id']} linked: {target}")
+            for result in finished:
+                manifest.append(result)
+            results.extend(finished)
         else:
             print(f"✗ Failed to generate clip {clip['id']}")
+            for duplicate in duplicates:
+                print(f"✗ Failed to generate clip {duplicate['id']} (same job as clip {clip['id']})")
+    
+    try:
+        if parallel > 1:
+            print(f"🔄 Generating {len(plan)} clips, up to {parallel} at once...")
+            with ThreadPoolExecutor(max_workers=parallel) as executor:
+                futures = {executor.submit(run, clip): (clip, duplicates) for clip, duplicates in plan}
+                for future in as_completed(futures):
+                    clip, duplicates = futures[future]
+                    print(f"\n[{clip['id']}/{len(clips)}] {clip['description']}")
+                    try:
+                        output_path = future.result()
+                    except Exception as e:
+                        print(f"Error: {e}")
+                        output_path = None
+                    finish(clip, duplicates, output_path)
+        else:
+            for clip, duplicates in plan:
+                print(f"\n[{clip['id']}/{len(clips)}] {clip['description']}")
+                print(f"Duration: {clip['duration']}s")
+                finish(clip, duplicates, run(clip))
+    finally:
+        manifest.close()
+    
+    results.sort(key=lambda result: result['clip']['id'])
     
-    # Save manifest
+    # Complete manifest in clip order (manifest.jsonl is in completion order)
     manifest_path = Path(output_dir) / 'manifest.json'
     with open(manifest_path, 'w') as f:
         json.dump(results, f, indent=2)
     
     print(f"\n✓ Batch generation complete!")
-    print(f"Manifest saved to: {manifest_path}")
+    print(f"Manifest saved to: {manifest_path} (streamed: {manifest.path})")
     print(f"Generated {len(results)}/{len(clips)} clips")
+    if saved_jobs:
+        print(f"GPU jobs saved by dedup: {saved_jobs}")
     
     return results
 
@@ -96,6 +173,10 @@ def main():
     parser = argparse.ArgumentParser(description='Batch generate clips from script')
     parser.add_argument('--script', required=True, help='Script file path')
     parser.add_argument('--output', default='projects/output/clips', help='Output directory')
+    parser.add_argument('--seed', type=int, default=-1,
+                        help='Seed for every clip (-1 for random; a fixed seed generates repeated lines once)')
+    parser.add_argument('--parallel', type=int, default=1,
+                        help='Clips queued on ComfyUI at once (1=sequential)')
     
     args = parser.parse_args()
     
@@ -104,7 +185,7 @@ def main():
         print(f"Error: Script file not found: {script_path}")
         sys.exit(1)
     
-    batch_generate(script_path, args.output)
+    batch_generate(script_path, args.output, seed=args.seed, parallel=max(1, args.parallel))
 
 
 if __name__ == '__main__':
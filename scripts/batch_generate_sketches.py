@@ -6,27 +6,45 @@ Optimized for speed and quality for YouTube channel production
 Usage: 
     python scripts/batch_generate_sketches.py --file templates/youtube_sketch_prompts.txt
     python scripts/batch_generate_sketches.py --file templates/youtube_sketch_prompts.txt --parallel 3
+    python scripts/batch_generate_sketches.py --replay output/survival/images/run_manifest.json
 """
 
 import argparse
 import json
-import requests
 import time
 import os
 import sys
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from config.generation_config import load_config
+from config.generation_config import ConfigError, load_settings
+from scripts.job_dedup import job_key, link_or_copy
+from scripts.progress import ProgressTracker
+from scripts.run_manifest import (
+    MANIFEST_NAME, RunManifest, parse_scene_list, resolve_seed, workflow_hash, workflow_models
+)
+from scripts.artifact_pickup import fetch_output, local_output_dir
+from scripts.history_gc import flush_all as flush_history, release
+from scripts.job_scheduler import CONTROL_NAME, Job, JobScheduler, parse_assignments
+from scripts.tracing import configure_tracing, print_summary, record_span, span, tracing_enabled
+from scripts.workflow_compiler import (
+    compile_template, compile_workflow, find_nodes, linked_node, load_object_info, set_inputs
+)
+
+from scripts.workflow_validator import format_problems, load_model_inventory, preflight
+
+SKETCH_CHECKPOINT = "dreamshaperXL_lightningDPMSDE.safetensors"
+SKETCH_NEGATIVE_PROMPT = "colored, photo realistic, complex background, shadows, gradients, multiple subjects, blurry, low quality, detailed, realistic, watermark, text"
 
 # Import helper functions (defined inline to avoid circular imports)
 def queue_prompt(api_url, prompt_workflow):
     """Queue a prompt to ComfyUI API"""
+    import requests
     p = {"prompt": prompt_workflow}
     data = json.dumps(p).encode('utf-8')
     req = requests.post(f"{api_url}/prompt", data=data)
@@ -37,18 +55,44 @@ def queue_prompt(api_url, prompt_workflow):
         print(f"Response: {req.text[:200]}")
         raise
 
-def get_image(api_url, filename, subfolder, folder_type):
-    """Download generated image from ComfyUI"""
-    data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-    url = f"{api_url}/view"
-    response = requests.get(url, params=data)
-    return response.content
-
 def get_history(api_url, prompt_id):
     """Get generation history"""
+    import requests
     response = requests.get(f"{api_url}/history/{prompt_id}")
     return response.json()
 
+def execution_times(history_entry):
+    """(started, finished) epoch seconds from ComfyUI's status messages, or (None, None)"""
+    started = finished = None
+    for message in history_entry.get('status', {}).get('messages', []):
+        if len(message) != 2 or not isinstance(message[1], dict):
+            continue
+        event, data = message
+        timestamp = data.get('timestamp')
+        if timestamp is None:
+            continue
+        if event == 'execution_start':
+            started = timestamp / 1000
+        elif event in ('execution_success', 'execution_error', 'execution_interrupted'):
+            finished = timestamp / 1000
+    if started is None or finished is None or started > finished:
+        return None, None
+    return started, finished
+
+
+def record_execution_spans(history_entry, submitted_at, completed_at, **attrs):
+    """Split the wait after submit into queue_wait/execution using ComfyUI's status timestamps"""
+    started, finished = execution_times(history_entry)
+    if started is not None:
+        started = min(max(started, submitted_at), finished)
+        record_span('queue_wait', submitted_at, started, **attrs)
+        record_span('execution', started, finished, **attrs)
+        # Time between the prompt finishing and the client noticing (polling interval)
+        record_span('poll_slack', finished, max(finished, completed_at), **attrs)
+    else:
+        record_span('generation_wait', submitted_at, completed_at, **attrs)
+
+
 def build_sketch_prompt(user_prompt, style="sketch"):
     """Build a complete sketch prompt"""
     sketch_base = "simple line drawing, white background, clean black lines, minimalist style, hand drawn sketch"
@@ -63,95 +107,68 @@ def build_sketch_prompt(user_prompt, style="sketch"):
         return f"{user_prompt}, {addition}, {sketch_base}"
     return f"{user_prompt}, {sketch_base}"
 
-def convert_workflow_to_api_format(workflow_array):
-    """Convert array-based workflow to API format (object with node IDs as keys)"""
-    api_workflow = {}
-    
-    # Build link map: link_id -> (source_node, source_slot, target_node, target_slot, type)
-    link_map = {}
-    for link in workflow_array['links']:
-        # Link format: [link_id, source_node, source_slot, target_node, target_slot, type]
-        link_id = link[0]
-        source_node = link[1]
-        source_slot = link[2]
-        target_node = link[3]
-        target_slot = link[4]
-        link_map[link_id] = (source_node, source_slot, target_node, target_slot)
-    
-    # Convert each node
-    for node in workflow_array['nodes']:
-        node_id = str(node['id'])
-        api_workflow[node_id] = {
-            "inputs": {},
-            "class_type": node.get('class_type', node['type'])
-        }
-        
-        # Add widget values first (direct inputs)
-        if 'widgets_values' in node:
-            widgets = node['widgets_values']
-            node_type = node.get('type', '')
-            
-            if node_type == 'CheckpointLoaderSimple':
-                api_workflow[node_id]["inputs"]["ckpt_name"] = widgets[0]
-            elif node_type == 'CLIPTextEncode':
-                api_workflow[node_id]["inputs"]["text"] = widgets[0]
-            elif node_type == 'EmptyLatentImage':
-                api_workflow[node_id]["inputs"]["width"] = widgets[0]
-                api_workflow[node_id]["inputs"]["height"] = widgets[1]
-                api_workflow[node_id]["inputs"]["batch_size"] = widgets[2] if len(widgets) > 2 else 1
-            elif node_type == 'KSampler':
-                api_workflow[node_id]["inputs"]["seed"] = widgets[0]
-                api_workflow[node_id]["inputs"]["steps"] = widgets[2]
-                api_workflow[node_id]["inputs"]["cfg"] = widgets[3]
-                api_workflow[node_id]["inputs"]["sampler_name"] = widgets[4]
-                api_workflow[node_id]["inputs"]["scheduler"] = widgets[5]
-                api_workflow[node_id]["inputs"]["denoise"] = widgets[6] if len(widgets) > 6 else 1.0
-            elif node_type == 'SaveImage':
-                api_workflow[node_id]["inputs"]["filename_prefix"] = widgets[0]
-        
-        # Add inputs from node inputs (connected inputs)
-        if 'inputs' in node:
-            for inp in node['inputs']:
-                if 'link' in inp:
-                    link_id = inp['link']
-                    if link_id in link_map:
-                        source_node, source_slot, _, _ = link_map[link_id]
-                        api_workflow[node_id]["inputs"][inp['name']] = [str(source_node), source_slot]
-    
-    return api_workflow
+def convert_workflow_to_api_format(workflow_array, object_info=None):
+    """Convert array-based workflow to API format (object with node IDs as keys)
+    object_info: ComfyUI node schema (default: the built-in core node schema)
+    """
+    return compile_workflow(workflow_array, object_info)
 
-def update_workflow(workflow, prompt, negative_prompt, resolution, steps, cfg_scale, seed, output_filename):
-    """Update workflow with parameters - works with array format"""
-    for node in workflow['nodes']:
-        if node.get('type') == 'CheckpointLoaderSimple':
-            node['widgets_values'] = ["dreamshaperXL_lightningDPMSDE.safetensors"]
-        elif node.get('id') == 2 and node.get('type') == 'CLIPTextEncode':
-            node['widgets_values'] = [prompt]
-        elif node.get('id') == 3 and node.get('type') == 'CLIPTextEncode':
-            node['widgets_values'] = [negative_prompt]
-        elif node.get('id') == 4 and node.get('type') == 'EmptyLatentImage':
-            node['widgets_values'] = [resolution[0], resolution[1], 1]
-        elif node.get('id') == 5 and node.get('type') == 'KSampler':
-            node['widgets_values'] = [seed, "fixed", steps, cfg_scale, "dpmpp_2m", "karras", 1.0]
-        elif node.get('id') == 7 and node.get('type') == 'SaveImage':
-            node['widgets_values'] = [output_filename]
+def build_sketch_workflow(workflow_path, prompt, negative_prompt, resolution, steps, cfg_scale, seed,
+                          output_filename, object_info=None):
+    """API workflow for one sketch job: the memoized compiled template with the job's inputs set"""
+    workflow = compile_template(workflow_path, object_info)
+    sampler_id = find_nodes(workflow, 'KSampler')[0]
+    set_inputs(workflow, sampler_id, seed=seed, steps=steps, cfg=cfg_scale,
+               sampler_name="dpmpp_2m", scheduler="karras", denoise=1.0)
+    set_inputs(workflow, linked_node(workflow, sampler_id, 'positive'), text=prompt)
+    set_inputs(workflow, linked_node(workflow, sampler_id, 'negative'), text=negative_prompt)
+    set_inputs(workflow, linked_node(workflow, sampler_id, 'latent_image'),
+               width=resolution[0], height=resolution[1], batch_size=1)
+    for node_id in find_nodes(workflow, 'CheckpointLoaderSimple'):
+        set_inputs(workflow, node_id, ckpt_name=SKETCH_CHECKPOINT)
+    for node_id in find_nodes(workflow, 'SaveImage'):
+        set_inputs(workflow, node_id, filename_prefix=output_filename)
     return workflow
 
 
-def parse_prompts_file(file_path):
+def sketch_workflows(jobs, workflow_path, style, resolution, steps, cfg_scale, hires=False, object_info=None):
+    """
+    (label, API workflow) for every (idx, name, prompt, seed) job, as pre-flight checks them
+    Hi-res jobs yield both stages; the base image name is only known after upload.
+    """
+    if hires:
+        from scripts.hires_pipeline import build_hires_workflow, native_resolution
+        hires_settings = load_settings().hires
+    for idx, name, prompt, job_seed in jobs:
+        full_prompt = build_sketch_prompt(prompt, style)
+        job_seed = resolve_seed(job_seed)
+        if not hires:
+            yield f"scene {idx}", build_sketch_workflow(
+                workflow_path, full_prompt, SKETCH_NEGATIVE_PROMPT, resolution,
+                steps, cfg_scale, job_seed, f"scene-{idx}", object_info)
+            continue
+        yield f"scene {idx} (base)", build_sketch_workflow(
+            workflow_path, full_prompt, SKETCH_NEGATIVE_PROMPT,
+            native_resolution(resolution, hires_settings.native_pixels),
+            steps, cfg_scale, job_seed, f"scene-{idx}", object_info)
+        yield f"scene {idx} (refine)", build_hires_workflow(
+            workflow_path, f"scene-{idx}.png", full_prompt, SKETCH_NEGATIVE_PROMPT, resolution, steps,
+            cfg_scale, job_seed, hires_settings.denoise, f"scene-{idx}", hires_settings.tile_size,
+            hires_settings.upscale_model, object_info)
+
+
+def iter_prompts_file(file_path):
     """
-    Parse prompts from a text file
+    Yield (name, prompt) pairs from a prompts text file as they are parsed
     Format: 
         name:
         Prompt text here...
     """
-    prompts = {}
     current_name = None
     current_prompt = []
     
     with open(file_path, 'r', encoding='utf-8') as f:
         for line in f:
-            original_line = line
             line = line.rstrip()  # Keep leading spaces, remove trailing
             
             # Skip empty lines and comments
@@ -160,9 +177,9 @@ def parse_prompts_file(file_path):
             
             # Check if it's a name line (ends with colon, no leading space)
             if line.endswith(':') and not line.startswith(' '):
-                # Save previous prompt
+                # Emit previous prompt
                 if current_name and current_prompt:
-                    prompts[current_name] = ' '.join(current_prompt).strip()
+                    yield current_name, ' '.join(current_prompt).strip()
                 
                 # Start new prompt
                 current_name = line[:-1].strip()  # Remove colon
@@ -175,48 +192,63 @@ def parse_prompts_file(file_path):
     
     # Don't forget the last one
     if current_name and current_prompt:
-        prompts[current_name] = ' '.join(current_prompt).strip()
-    
-    return prompts
+        yield current_name, ' '.join(current_prompt).strip()
+
+
+def parse_prompts_file(file_path):
+    """
+    Parse prompts from a text file into a {name: prompt} dict
+    Format: 
+        name:
+        Prompt text here...
+    """
+    return dict(iter_prompts_file(file_path))
 
 
 def generate_single_sketch(name, prompt, api_url, workflow_path, output_dir, 
                           resolution=(1024, 768), steps=20, cfg_scale=7.0, 
-                          seed=-1, style="sketch", scene_number=None):
+                          seed=-1, style="sketch", scene_number=None, run_info=None, workflow_builder=None):
     """Generate a single sketch image (optimized for speed)
+    run_info: optional dict filled with the resolved seed, workflow hash, models,
+    prompt_id, timings and output checksum for the run manifest
+    workflow_builder: optional callable(prompt, negative_prompt, output_filename, seed)
+    returning the API workflow to submit instead of the text-to-image template
     Returns: (name, success, output_path, error_message)
     """
-    import random
-    # Convert -1 (random) to actual random seed (API requires >= 0)
-    if seed == -1:
-        seed = random.randint(0, 2**31 - 1)
+    # Convert -1 (random) to an actual seed (API requires >= 0) that gets recorded
+    seed = resolve_seed(seed)
+    if run_info is None:
+        run_info = {}
+    run_info['seed'] = seed
+    job_started = time.time()
     
     try:
-        # Build full sketch prompt
-        full_prompt = build_sketch_prompt(prompt, style)
-        negative_prompt = "colored, photo realistic, complex background, shadows, gradients, multiple subjects, blurry, low quality, detailed, realistic, watermark, text"
-        
-        # Generate output filename as scene-N.png (sequential number)
-        if scene_number is not None:
-            output_filename = f"scene-{scene_number}"
-        else:
-            # Fallback to name-based if no number provided
-            safe_name = name.replace(' ', '_').replace('/', '_')
-            output_filename = f"sketch_{safe_name}"
-        
-        # Load workflow
-        with open(workflow_path, 'r') as f:
-            workflow_array = json.load(f)
-        
-        # Update workflow (array format)
-        workflow_array = update_workflow(workflow_array, full_prompt, negative_prompt, resolution,
-                                        steps, cfg_scale, seed, output_filename)
-        
-        # Convert to API format
-        workflow = convert_workflow_to_api_format(workflow_array)
+        with span('workflow_build', scene=scene_number, job=name):
+            # Build full sketch prompt
+            full_prompt = build_sketch_prompt(prompt, style)
+            negative_prompt = SKETCH_NEGATIVE_PROMPT
+            
+            # Generate output filename as scene-N.png (sequential number)
+            if scene_number is not None:
+                output_filename = f"scene-{scene_number}"
+            else:
+                # Fallback to name-based if no number provided
+                safe_name = name.replace(' ', '_').replace('/', '_')
+                output_filename = f"sketch_{safe_name}"
+            
+            if workflow_builder is not None:
+                workflow = workflow_builder(full_prompt, negative_prompt, output_filename, seed)
+            else:
+                # Compiled template (memoized) with this job's inputs
+                workflow = build_sketch_workflow(workflow_path, full_prompt, negative_prompt, resolution,
+                                                 steps, cfg_scale, seed, output_filename, load_object_info(api_url))
+            run_info['workflow_hash'] = workflow_hash(workflow)
+            run_info['models'] = workflow_models(workflow)
         
         # Queue prompt
-        result = queue_prompt(api_url, workflow)
+        with span('submit', scene=scene_number, job=name):
+            result = queue_prompt(api_url, workflow)
+        submitted_at = time.time()
         if 'error' in result:
             error_msg = result.get('error', {}).get('message', 'Unknown error')
             node_errors = result.get('node_errors', {})
@@ -227,9 +259,10 @@ def generate_single_sketch(name, prompt, api_url, workflow_path, output_dir,
         prompt_id = result.get('prompt_id') or result.get('number')
         if not prompt_id:
             return (name, False, None, f"Unexpected API response: {result}")
+        run_info['prompt_id'] = prompt_id
         
         # Wait for completion (optimized polling)
-        max_wait = 180  # 3 minutes max per image
+        max_wait = load_settings().batch.timeout_per_image
         start_time = time.time()
         poll_interval = 2  # Check every 2 seconds
         
@@ -243,6 +276,13 @@ def generate_single_sketch(name, prompt, api_url, workflow_path, output_dir,
                     break
         else:
             return (name, False, None, "Timeout waiting for generation")
+        completed_at = time.time()
+        record_execution_spans(history[prompt_id], submitted_at, completed_at, scene=scene_number, job=name)
+        started, finished = execution_times(history[prompt_id])
+        timings = run_info.setdefault('timings', {})
+        timings['wait'] = round(completed_at - submitted_at, 3)
+        if started is not None:
+            timings['execution'] = round(finished - started, 3)
         
         # Download result
         output_data = history[prompt_id]['outputs']
@@ -250,11 +290,8 @@ def generate_single_sketch(name, prompt, api_url, workflow_path, output_dir,
             if 'images' in node_output:
                 for image_info in node_output['images']:
                     filename = image_info['filename']
-                    subfolder = image_info.get('subfolder', '')
-                    image_data = get_image(api_url, filename, subfolder, 'output')
                     
                     # Save to output directory with scene-N.png naming
-                    os.makedirs(output_dir, exist_ok=True)
                     if scene_number is not None:
                         # Rename to scene-N.png
                         file_ext = os.path.splitext(filename)[1] or '.png'
@@ -263,8 +300,14 @@ def generate_single_sketch(name, prompt, api_url, workflow_path, output_dir,
                         final_filename = filename
                     
                     output_path = os.path.join(output_dir, final_filename)
-                    with open(output_path, 'wb') as f:
-                        f.write(image_data)
+                    # Hard link from ComfyUI's output folder when local, else streamed from /view
+                    local_dir = local_output_dir(api_url)
+                    with span('download', scene=scene_number, job=name, local=local_dir is not None):
+                        fetched = fetch_output(api_url, image_info, output_path, local_dir)
+                    run_info['sha256'] = fetched['sha256']
+                    timings['total'] = round(time.time() - job_started, 3)
+                    # Saved: ComfyUI's history entry (and, if pruning, its file) can go
+                    release(api_url, prompt_id, output_data)
                     
                     return (name, True, output_path, None)
         
@@ -276,7 +319,9 @@ def generate_single_sketch(name, prompt, api_url, workflow_path, output_dir,
 
 def batch_generate_sketches(prompts_file, output_dir="output/survival/images", 
                            resolution=(1024, 768), steps=20, cfg_scale=7.0,
-                           seed=-1, style="sketch", parallel=1, delay=5):
+                           seed=-1, style="sketch", parallel=1, delay=5, api_url=None,
+                           progress_mode=None, manifest_path=None, replay=None, replay_scenes=None,
+                           preflight_check=True, hires=False, priorities=None, deadlines=None, project=None):
     """
     Batch generate sketch images
     
@@ -286,15 +331,26 @@ def batch_generate_sketches(prompts_file, output_dir="output/survival/images",
         resolution: (width, height) tuple
         steps: Sampling steps (20 for speed, 25-30 for quality)
         cfg_scale: CFG scale (7.0 optimized)
-        seed: Random seed (-1 for random)
+        seed: Random seed (-1 for random; a fixed seed lets identical prompts share one generation)
         style: Style type
         parallel: Number of parallel generations (1 = sequential)
         delay: Delay between requests when sequential (seconds)
+        api_url: ComfyUI URL (default: from config)
+        progress_mode: Progress output - auto, tty, json or off (default: $DOODLY_PROGRESS or auto)
+        manifest_path: Run manifest to write (default: <output_dir>/run_manifest.json)
+        replay: RunManifest to regenerate scenes from instead of the prompts file
+        replay_scenes: Scene numbers to replay (default: the failed ones)
+        preflight_check: Validate every job's workflow offline before submitting any
+        hires: Render through the two-stage hi-res pipeline (native base + tiled upscale/refine)
+        priorities: {scene: priority}; higher runs first (default 0)
+        deadlines: {scene: seconds after the start}; earlier runs first within a priority
+        project: Fair-share project name (default: the prompts file name)
     """
-    config = load_config()
-    api_url = config.get('comfyui_url', 'http://127.0.0.1:8188')
+    if api_url is None:
+        api_url = load_settings().comfyui.url
     
     # Check if ComfyUI is running
+    import requests
     try:
         requests.get(f"{api_url}/system_stats", timeout=5)
     except:
@@ -302,14 +358,34 @@ def batch_generate_sketches(prompts_file, output_dir="output/survival/images",
         print("Start it with: ./scripts/start_comfyui.sh")
         return []
     
-    # Load prompts
-    prompts = parse_prompts_file(prompts_file)
-    if not prompts:
-        print(f"❌ No prompts found in {prompts_file}")
-        return []
-    
-    print(f"📝 Loaded {len(prompts)} prompts from {prompts_file}")
-    print(f"⚙️  Settings: {resolution[0]}x{resolution[1]}, {steps} steps, CFG {cfg_scale}")
+    if replay is not None:
+        # Exactly the recorded prompt and seed for each selected scene
+        replay_jobs = [(idx, record['name'], record['prompt'], record['seed'])
+                       for idx, record in replay.select(replay_scenes)]
+        total_prompts = len(replay_jobs)
+        if not total_prompts:
+            print(f"✅ Nothing to replay: no failed scenes in {replay.path}")
+            return []
+        manifest = replay
+        jobs = iter(replay_jobs)
+        print(f"🔁 Replaying {total_prompts} scene(s) from {replay.path}: "
+              f"{', '.join(str(job[0]) for job in replay_jobs)}")
+    else:
+        # Prompts are parsed as jobs are submitted; the count only sizes progress
+        total_prompts = sum(1 for _ in iter_prompts_file(prompts_file))
+        if not total_prompts:
+            print(f"❌ No prompts found in {prompts_file}")
+            return []
+        manifest = RunManifest(manifest_path or Path(output_dir) / MANIFEST_NAME, settings={
+            'prompts_file': str(prompts_file), 'output_dir': str(output_dir), 'resolution': list(resolution),
+            'steps': steps, 'cfg_scale': cfg_scale, 'seed': seed, 'style': style, 'hires': hires,
+        })
+        # Seeds are resolved per job up front so every one is recorded and replayable
+        jobs = ((idx, name, prompt, resolve_seed(seed))
+                for idx, (name, prompt) in enumerate(iter_prompts_file(prompts_file), 1))
+        print(f"📝 Streaming {total_prompts} prompts from {prompts_file}")
+    print(f"⚙️  Settings: {resolution[0]}x{resolution[1]}, {steps} steps, CFG {cfg_scale}"
+          + (" (hi-res: native base + tiled refine)" if hires else ""))
     print(f"🚀 Mode: {'Parallel' if parallel > 1 else 'Sequential'}")
     print("-" * 60)
     
@@ -319,72 +395,211 @@ def batch_generate_sketches(prompts_file, output_dir="output/survival/images",
         print(f"❌ Workflow not found at {workflow_path}")
         return []
     
+    if preflight_check:
+        # Reject the whole batch before any GPU time is spent (cached schema + model listing)
+        object_info = load_object_info(api_url)
+        models = load_model_inventory(api_url, install_path=load_settings().comfyui.install_path)
+        if replay is not None:
+            planned = replay_jobs
+        else:
+            planned = ((idx, name, prompt, seed)
+                       for idx, (name, prompt) in enumerate(iter_prompts_file(prompts_file), 1))
+        checked = 0
+        
+        def counted(planned_jobs):
+            nonlocal checked
+            for job in planned_jobs:
+                checked += 1
+                yield job
+        
+        preflight_start = time.perf_counter()
+        problems = preflight(sketch_workflows(counted(planned), workflow_path, style, resolution, steps, cfg_scale,
+                                              hires, object_info), object_info, models)
+        preflight_ms = (time.perf_counter() - preflight_start) * 1000
+        if problems:
+            print(f"❌ {format_problems(problems)}")
+            print(f"   Nothing was submitted ({checked} jobs checked in {preflight_ms:.0f} ms)")
+            return []
+        print(f"✅ Pre-flight: {checked} workflows valid ({preflight_ms:.0f} ms)")
+    
+    # Dispatch order: priority, deadline, fair share, then file order; re-prioritize
+    # pending scenes at runtime by appending to the control file
+    priorities = priorities or {}
+    deadlines = deadlines or {}
+    project = project or Path(prompts_file or manifest.path).stem
+    scheduler = JobScheduler((Job(job[0], job, project=project) for job in jobs),
+                             control_path=Path(output_dir) / CONTROL_NAME)
+    # Given up front, so scenes beyond the lookahead window are found and run first too
+    for scene, level in priorities.items():
+        scheduler.update(scene, priority=int(level))
+    for scene, seconds in deadlines.items():
+        scheduler.update(scene, deadline=seconds)
+    if priorities or deadlines:
+        print(f"⏫ Scheduled first: {len(priorities)} prioritized, {len(deadlines)} with a deadline")
+    print(f"🎛️  Re-prioritize: python scripts/job_scheduler.py {scheduler.control_path} --scenes N --priority 10")
+    
     results = []
     start_time = time.time()
+    total_jobs = 0
+    saved_jobs = 0
+    reproduced = []
+    changed = []
+    # Identical jobs share one generation: job key -> {'job': ..., 'info': ..., 'result': ..., 'duplicates': [...]}
+    groups = {}
     
-    if parallel > 1:
-        # Parallel generation
-        print(f"🔄 Generating {len(prompts)} images in parallel (max {parallel} at once)...\n")
-        
-        # Create list of (index, name, prompt) tuples to preserve order
-        prompts_list = list(prompts.items())
-        
-        with ThreadPoolExecutor(max_workers=parallel) as executor:
-            futures = {
-                executor.submit(
-                    generate_single_sketch,
-                    name, prompt, api_url, workflow_path, output_dir,
-                    resolution, steps, cfg_scale, seed, style, idx + 1
-                ): (idx, name)
-                for idx, (name, prompt) in enumerate(prompts_list)
-            }
-            
-            completed = 0
-            for future in as_completed(futures):
-                idx, name = futures[future]
-                completed += 1
-                try:
-                    result = future.result()
-                    results.append(result)
-                    result_name, success, path, error = result
-                    
-                    if success:
-                        print(f"✅ [{completed}/{len(prompts)}] Scene {idx + 1}: {name}")
-                        print(f"   Saved: {path}")
-                    else:
-                        print(f"❌ [{completed}/{len(prompts)}] Scene {idx + 1}: {name}")
-                        print(f"   Error: {error}")
-                except Exception as e:
-                    print(f"❌ [{completed}/{len(prompts)}] Scene {idx + 1}: {name}")
-                    print(f"   Exception: {e}")
-                    results.append((name, False, None, str(e)))
-                
-                print()
-    else:
-        # Sequential generation
-        print(f"🔄 Generating {len(prompts)} images sequentially...\n")
-        
-        for idx, (name, prompt) in enumerate(prompts.items(), 1):
-            print(f"[{idx}/{len(prompts)}] Generating Scene {idx}: {name}...")
-            
-            result = generate_single_sketch(
-                name, prompt, api_url, workflow_path, output_dir,
-                resolution, steps, cfg_scale, seed, style, scene_number=idx
-            )
-            results.append(result)
-            
-            result_name, success, path, error = result
+    def record(job, result, info):
+        idx, name, prompt, job_seed = job
+        _, success, path, error = result
+        if replay is not None:
+            previous_sha = (manifest.get(idx) or {}).get('sha256')
+            if previous_sha and info.get('sha256'):
+                (reproduced if previous_sha == info['sha256'] else changed).append(idx)
+        manifest.record(idx, **{'name': name, 'prompt': prompt, 'seed': job_seed, **info,
+                                'success': success, 'output': path, 'error': error})
+    
+    def fan_out(group, result, duplicates):
+        """Hard-link a generated image to the scenes that asked for the same job"""
+        name, success, path, error = result
+        linked = []
+        for dup in duplicates:
+            dup_idx, dup_name = dup[0], dup[1]
             if success:
-                print(f"✅ Success! Saved: {path}")
+                file_ext = os.path.splitext(path)[1] or '.png'
+                target = link_or_copy(path, os.path.join(output_dir, f"scene-{dup_idx}{file_ext}"))
+                linked.append((dup_name, True, target, None))
             else:
-                print(f"❌ Failed: {error}")
+                linked.append((dup_name, False, None, error))
+            info = {'sha256': group['info']['sha256']} if success else {}
+            record(dup, linked[-1], dict(info, reused_from=group['job'][0]))
+        if success and duplicates:
+            print(f"   ♻️  Linked to scene(s) {', '.join(str(d[0]) for d in duplicates)}")
+        return linked
+    
+    def claim(job):
+        """Group to generate the job into, or None when an identical job already covers it"""
+        nonlocal saved_jobs
+        group = {'job': job, 'info': {}, 'result': None, 'duplicates': []}
+        # A random seed means every scene should differ
+        if seed == -1:
+            return group
+        key = job_key(job[2], style=style, resolution=list(resolution), steps=steps, cfg_scale=cfg_scale, seed=job[3])
+        existing = groups.get(key)
+        if existing is None:
+            groups[key] = group
+            return group
+        saved_jobs += 1
+        progress.skip('image')
+        if existing['result'] is None:
+            existing['duplicates'].append(job)
+        else:
+            results.extend(fan_out(existing, existing['result'], [job]))
+        return None
+    
+    def complete(group, result):
+        group['result'] = result
+        results.append(result)
+        record(group['job'], result, group['info'])
+        results.extend(fan_out(group, result, group['duplicates']))
+        group['duplicates'] = []
+    
+    if hires:
+        from scripts.hires_pipeline import generate_hires_sketch as generate_sketch
+    else:
+        generate_sketch = generate_single_sketch
+    
+    def run_parallel_job(group):
+        idx, name, prompt, job_seed = group['job']
+        started = progress.start('image')
+        result = generate_sketch(
+            name, prompt, api_url, workflow_path, output_dir,
+            resolution, steps, cfg_scale, job_seed, style, idx, run_info=group['info']
+        )
+        progress.finish('image', started, ok=result[1])
+        return result
+    
+    with ProgressTracker({'image': total_prompts}, mode=progress_mode) as progress:
+        if parallel > 1:
+            # Parallel generation
+            print(f"🔄 Generating up to {total_prompts} images in parallel (max {parallel} at once)...\n")
             
-            # Delay between requests (except for last one)
-            if idx < len(prompts) and delay > 0:
-                print(f"⏳ Waiting {delay}s before next generation...\n")
-                time.sleep(delay)
-            else:
-                print()
+            with ThreadPoolExecutor(max_workers=parallel) as executor:
+                pending = {}
+                completed = 0
+                
+                def collect(done):
+                    nonlocal completed
+                    for future in done:
+                        idx, name, group = pending.pop(future)
+                        completed += 1
+                        position = f"[{completed}/{total_prompts - saved_jobs}]"
+                        try:
+                            result = future.result()
+                            result_name, success, path, error = result
+                            
+                            if success:
+                                print(f"✅ {position} Scene {idx}: {name}")
+                                print(f"   Saved: {path}")
+                            else:
+                                print(f"❌ {position} Scene {idx}: {name}")
+                                print(f"   Error: {error}")
+                        except Exception as e:
+                            print(f"❌ {position} Scene {idx}: {name}")
+                            print(f"   Exception: {e}")
+                            result = (name, False, None, str(e))
+                        complete(group, result)
+                        
+                        print()
+                
+                for job in scheduler:
+                    total_jobs += 1
+                    group = claim(job)
+                    if group is None:
+                        continue
+                    # Nothing queued beyond the workers, so the scheduler decides every dispatch
+                    if len(pending) >= parallel:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    pending[executor.submit(run_parallel_job, group)] = (job[0], job[1], group)
+                
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+        else:
+            # Sequential generation
+            print(f"🔄 Generating up to {total_prompts} images sequentially...\n")
+            
+            for job in scheduler:
+                idx, name, prompt, job_seed = job
+                total_jobs += 1
+                group = claim(job)
+                if group is None:
+                    continue
+                print(f"[{total_jobs}/{total_prompts}] Generating Scene {idx}: {name}...")
+                
+                # The inter-request delay is part of each job's cost when estimating the ETA
+                started = progress.start('image')
+                result = generate_sketch(
+                    name, prompt, api_url, workflow_path, output_dir,
+                    resolution, steps, cfg_scale, job_seed, style, scene_number=idx, run_info=group['info']
+                )
+                
+                result_name, success, path, error = result
+                if success:
+                    print(f"✅ Success! Saved: {path}")
+                else:
+                    print(f"❌ Failed: {error}")
+                complete(group, result)
+                
+                # Delay between requests (except for last one)
+                if len(scheduler) and delay > 0:
+                    print(f"⏳ Waiting {delay}s before next generation...\n")
+                    time.sleep(delay)
+                else:
+                    print()
+                progress.finish('image', started, ok=success)
+    
+    manifest.save()
+    flush_history()
     
     # Summary
     elapsed = time.time() - start_time
@@ -399,7 +614,16 @@ def batch_generate_sketches(prompts_file, output_dir="output/survival/images",
     print(f"⏱️  Total time: {elapsed/60:.1f} minutes")
     if successful > 0:
         print(f"⚡ Average time per image: {elapsed/successful:.1f} seconds")
+    if saved_jobs:
+        print(f"♻️  GPU jobs saved by dedup: {saved_jobs}/{total_jobs}")
+    if scheduler.late:
+        print(f"⏰ Started after their deadline: scene(s) {', '.join(str(n) for n in scheduler.late)}")
+    if reproduced or changed:
+        print(f"🔁 Replay: {len(reproduced)} identical to the recorded output, {len(changed)} changed")
+        if changed:
+            print(f"   Changed scenes: {', '.join(str(n) for n in changed)}")
     print(f"📁 Output directory: {output_dir}")
+    print(f"📋 Run manifest: {manifest.path}")
     print("=" * 60)
     
     if failed > 0:
@@ -408,6 +632,9 @@ def batch_generate_sketches(prompts_file, output_dir="output/survival/images",
             if not success:
                 print(f"   - {name}: {error}")
     
+    if tracing_enabled():
+        print_summary()
+    
     return results
 
 
@@ -428,25 +655,172 @@ Examples:
   
   # Fast mode (lower quality, faster)
   python scripts/batch_generate_sketches.py --file templates/youtube_sketch_prompts.txt --steps 15 --parallel 2
+  
+  # Named preset from config/youtube_config.yaml (fast, balanced, quality, hd)
+  python scripts/batch_generate_sketches.py --file templates/youtube_sketch_prompts.txt --preset hd
+  
+  # Regenerate the failed scenes of a previous run with their recorded seeds
+  python scripts/batch_generate_sketches.py --replay output/survival/images/run_manifest.json
+  
+  # Fast drafts for review, then re-render the approved scenes at final quality from their drafts
+  python scripts/batch_generate_sketches.py --file templates/youtube_sketch_prompts.txt --draft
+  python scripts/batch_generate_sketches.py --finalize output/survival/images/drafts/run_manifest.json --approve 1,3-5
+  
+  # Regenerate selected scenes exactly
+  python scripts/batch_generate_sketches.py --replay output/survival/images/run_manifest.json --scenes 3,7-9
+  
+  # Preview first: scenes 1-8 ahead of the rest, scene 40 urgently; bump more while it runs
+  python scripts/batch_generate_sketches.py --file templates/youtube_sketch_prompts.txt --priority 1-8 --priority 40=5
+  python scripts/job_scheduler.py output/survival/images/scheduler_control.jsonl --scenes 12-14 --priority 10
+  
+  # With scripts/generation_daemon.py running, plain runs are submitted to it; --local opts out
+  python scripts/batch_generate_sketches.py --file templates/youtube_sketch_prompts.txt --local
         """
     )
-    parser.add_argument('--file', required=True, help='Prompts file path')
-    parser.add_argument('--output', default='output/survival/images', help='Output directory')
-    parser.add_argument('--resolution', default='1024x768', help='Resolution (WxH)')
-    parser.add_argument('--steps', type=int, default=20, help='Sampling steps (15=fast, 20=balanced, 30=quality)')
-    parser.add_argument('--cfg', type=float, default=7.0, help='CFG scale')
-    parser.add_argument('--seed', type=int, default=-1, help='Random seed (-1 for random)')
+    parser.add_argument('--file', help='Prompts file path')
+    parser.add_argument('--output', default=None,
+                        help='Output directory (default: output/survival/images; with --finalize: next to the drafts)')
+    parser.add_argument('--preset', default=None, help='Preset from config/youtube_config.yaml (fast, balanced, quality, hd)')
+    parser.add_argument('--resolution', default=None, help='Resolution (WxH, default: from preset/config)')
+    parser.add_argument('--steps', type=int, default=None, help='Sampling steps (15=fast, 20=balanced, 30=quality)')
+    parser.add_argument('--cfg', type=float, default=None, help='CFG scale')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed (-1 for random)')
     parser.add_argument('--style', default='sketch', choices=['sketch', 'character', 'object', 'scene'],
                        help='Style type')
     parser.add_argument('--parallel', type=int, default=1, 
                        help='Number of parallel generations (1=sequential, 2-3 recommended)')
-    parser.add_argument('--delay', type=int, default=5, 
-                       help='Delay between requests when sequential (seconds)')
+    parser.add_argument('--delay', type=float, default=None, 
+                       help='Delay between requests when sequential (seconds, default: from config)')
+    parser.add_argument('--progress', choices=['auto', 'tty', 'json', 'off'], default=None,
+                       help='Progress/ETA output: status line in a terminal, JSON lines when piped')
+    parser.add_argument('--trace', default=None,
+                       help='Write per-stage timing spans to this JSONL file')
+    parser.add_argument('--skip-preflight', action='store_true',
+                       help='Do not validate the workflows offline before submitting')
+    parser.add_argument('--manifest', default=None,
+                       help='Run manifest path (default: <output>/run_manifest.json)')
+    parser.add_argument('--replay', default=None, metavar='MANIFEST',
+                       help='Regenerate scenes of a previous run with their recorded seeds and settings')
+    parser.add_argument('--scenes', default=None,
+                       help='With --replay: scene numbers to regenerate, e.g. 3,7-9 (default: failed scenes)')
+    parser.add_argument('--hires', action=argparse.BooleanOptionalAction, default=None,
+                        help='Two-stage hi-res rendering (native base + tiled upscale/refine; default: from preset)')
+    parser.add_argument('--draft', action='store_true',
+                        help='Render every scene with the draft preset into <output>/drafts for review')
+    parser.add_argument('--finalize', default=None, metavar='DRAFT_MANIFEST',
+                        help='Re-render approved scenes of a --draft run at final quality, starting from the drafts')
+    parser.add_argument('--approve', default=None,
+                        help='With --draft/--finalize: scenes to finalize, e.g. 1,3-5')
+    parser.add_argument('--auto-approve', action='store_true',
+                        help='With --draft/--finalize: finalize the drafts that look like clean sketches')
+    parser.add_argument('--priority', action='append', default=None, metavar='SCENES[=LEVEL]',
+                        help='Generate these scenes first, e.g. 1-8 or 40=5 (level default 1, repeatable)')
+    parser.add_argument('--deadline', action='append', default=None, metavar='SCENES=SECONDS',
+                        help='Scenes due this many seconds after the start (earliest first, repeatable)')
+    parser.add_argument('--project', default=None,
+                        help='Fair-share project name (default: the prompts file name)')
+    parser.add_argument('--local', action='store_true',
+                        help='Generate in this process even when the generation daemon is running')
     
     args = parser.parse_args()
+    configure_tracing(args.trace)
+    if not args.file and not args.replay and not args.finalize:
+        parser.error('--file is required unless --replay or --finalize is given')
+    if args.scenes and not args.replay:
+        parser.error('--scenes requires --replay')
+    if (args.approve or args.auto_approve) and not (args.draft or args.finalize):
+        parser.error('--approve/--auto-approve require --draft or --finalize')
+    if args.finalize and args.draft:
+        parser.error('--finalize and --draft are separate passes; use --draft --approve for both')
+    try:
+        priorities = parse_assignments(args.priority)
+        deadlines = parse_assignments(args.deadline, default=None)
+    except ValueError as e:
+        parser.error(f'--priority/--deadline: {e}')
+    if any(value is None for value in deadlines.values()):
+        parser.error('--deadline needs SCENES=SECONDS')
+    schedule = {'priorities': priorities, 'deadlines': deadlines, 'project': args.project}
     
-    # Parse resolution
-    width, height = map(int, args.resolution.split('x'))
+    if args.replay:
+        # Replays reuse the recorded settings; generation flags are ignored
+        try:
+            manifest = RunManifest.load(args.replay)
+            replay_scenes = parse_scene_list(args.scenes) if args.scenes else None
+            manifest.select(replay_scenes)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        recorded = manifest.settings
+        results = batch_generate_sketches(
+            recorded.get('prompts_file'),
+            output_dir=recorded['output_dir'],
+            resolution=tuple(recorded['resolution']),
+            steps=recorded['steps'],
+            cfg_scale=recorded['cfg_scale'],
+            seed=recorded['seed'],
+            style=recorded.get('style', 'sketch'),
+            hires=recorded.get('hires', False),
+            parallel=args.parallel,
+            delay=args.delay if args.delay is not None else 0,
+            progress_mode=args.progress,
+            replay=manifest,
+            replay_scenes=replay_scenes,
+            preflight_check=not args.skip_preflight,
+            **schedule
+        )
+        if any(not r[1] for r in results):
+            sys.exit(1)
+        return
+    
+    # Validate config and resolve the preset before any work starts
+    try:
+        settings = load_settings()
+        preset = settings.preset(args.preset) if args.preset else settings.sketch_defaults
+        draft_preset = settings.preset(settings.draft.preset)
+    except ConfigError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    # Explicit flags override the preset
+    if args.resolution:
+        width, height = map(int, args.resolution.split('x'))
+    else:
+        width, height = preset.resolution
+    steps = args.steps if args.steps is not None else preset.steps
+    cfg_scale = args.cfg if args.cfg is not None else preset.cfg_scale
+    seed = args.seed if args.seed is not None else settings.sketch_defaults.seed
+    delay = args.delay if args.delay is not None else settings.batch.delay_between
+    output_dir = args.output or 'output/survival/images'
+    
+    def finalize_drafts(draft_manifest, final_dir):
+        from scripts.draft_refine import auto_approve, finalize
+        if args.approve:
+            approved = parse_scene_list(args.approve)
+        else:
+            approved = auto_approve(draft_manifest, settings.draft.auto_approve_white)
+            print(f"🔎 Auto-approved {len(approved)}/{len(draft_manifest.scenes)} draft(s): "
+                  f"{', '.join(str(n) for n in approved) or 'none'}")
+        if not approved:
+            return None
+        return finalize(draft_manifest, approved, final_dir, (width, height), steps, cfg_scale,
+                        settings.draft.refine_denoise, parallel=args.parallel,
+                        preflight_check=not args.skip_preflight)
+    
+    if args.finalize:
+        if not args.approve and not args.auto_approve:
+            parser.error('--finalize needs --approve SCENES or --auto-approve')
+        try:
+            draft_manifest = RunManifest.load(args.finalize)
+            if args.approve:
+                draft_manifest.select(parse_scene_list(args.approve))
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        final_dir = args.output or str(Path(draft_manifest.settings['output_dir']).parent)
+        results = finalize_drafts(draft_manifest, final_dir)
+        if results is not None and (not results or any(not r[1] for r in results)):
+            sys.exit(1)
+        return
     
     # Validate prompts file
     prompts_path = Path(args.file)
@@ -457,17 +831,71 @@ Examples:
         print(f"❌ Prompts file not found: {prompts_path}")
         sys.exit(1)
     
-    results = batch_generate_sketches(
-        prompts_path,
-        output_dir=args.output,
-        resolution=(width, height),
-        steps=args.steps,
-        cfg_scale=args.cfg,
-        seed=args.seed,
-        style=args.style,
-        parallel=args.parallel,
-        delay=args.delay
-    )
+    if args.draft:
+        # Drafts always use the draft preset; the flags above describe the final pass
+        print(f"✏️  Draft pass: preset '{draft_preset.name}'")
+        draft_dir = str(Path(output_dir) / 'drafts')
+        results = batch_generate_sketches(
+            prompts_path,
+            output_dir=draft_dir,
+            resolution=draft_preset.resolution,
+            steps=draft_preset.steps,
+            cfg_scale=draft_preset.cfg_scale,
+            seed=seed,
+            style=args.style,
+            parallel=args.parallel,
+            delay=delay,
+            progress_mode=args.progress,
+            preflight_check=not args.skip_preflight,
+            **schedule
+        )
+        if not results:
+            sys.exit(1)
+        draft_manifest_path = Path(draft_dir) / MANIFEST_NAME
+        if not args.approve and not args.auto_approve:
+            print(f"\n✏️  Drafts ready for review in {draft_dir}. Finalize the approved scenes with:")
+            print(f"   python scripts/batch_generate_sketches.py --finalize {draft_manifest_path} --approve 1,3-5")
+            return
+        results = finalize_drafts(RunManifest.load(draft_manifest_path), output_dir)
+        if results is not None and (not results or any(not r[1] for r in results)):
+            sys.exit(1)
+        return
+    
+    hires = args.hires if args.hires is not None else getattr(preset, 'hires', False)
+    # A running daemon takes the project (traces are per process, so --trace stays local)
+    from scripts.daemon_client import daemon_url, run_on_daemon
+    daemon = None if args.local or args.trace else daemon_url()
+    if daemon:
+        # Concurrency, pacing and progress output belong to the daemon
+        ignored = [flag for flag, given in (('--parallel', args.parallel != 1), ('--delay', args.delay is not None),
+                                            ('--progress', args.progress is not None)) if given]
+        if ignored:
+            print(f"ℹ️  Ignored on the daemon: {', '.join(ignored)} (it runs daemon.workers jobs at a time; "
+                  f"use --local to generate in this process)")
+        results = run_on_daemon(daemon, {
+            'kind': 'sketches', 'file': str(prompts_path.absolute()), 'output_dir': str(Path(output_dir).absolute()),
+            'manifest': str(Path(args.manifest).absolute()) if args.manifest else None,
+            'resolution': [width, height], 'steps': steps, 'cfg_scale': cfg_scale, 'seed': seed,
+            'style': args.style, 'hires': hires, 'name': args.project,
+            'priorities': priorities, 'deadlines': deadlines, 'skip_preflight': args.skip_preflight,
+        })
+    else:
+        results = batch_generate_sketches(
+            prompts_path,
+            output_dir=output_dir,
+            resolution=(width, height),
+            steps=steps,
+            cfg_scale=cfg_scale,
+            seed=seed,
+            style=args.style,
+            hires=hires,
+            parallel=args.parallel,
+            delay=delay,
+            progress_mode=args.progress,
+            manifest_path=args.manifest,
+            preflight_check=not args.skip_preflight,
+            **schedule
+        )
     
     if not results:
         sys.exit(1)
@@ -0,0 +1,646 @@
+#!/usr/bin/env python3
+"""
+Benchmark the ComfyUI client paths against a local fake ComfyUI server
+No GPU needed: the fake server implements /prompt, /history/{id}, /view, /queue,
+/system_stats, /object_info, /models, /ws and GET/POST /history (list/delete) with configurable per-job latency, jitter, failure rate and image size
+(--gpu-model makes job time follow sampled pixels x executed steps instead)
+
+Measures jobs/sec, p50/p95/p99 end-to-end latency (submit -> image downloaded),
+HTTP requests per job and client CPU for each --parallel setting, and saves JSON
+so runs can be compared.
+
+Usage:
+    python scripts/benchmark_comfyui.py
+    python scripts/benchmark_comfyui.py --targets batch,scenes --parallel 1,2,4 --jobs 24 --latency 0.5
+    python scripts/benchmark_comfyui.py --compare output/benchmarks/comfyui_20250101_120000.json
+    python scripts/benchmark_comfyui.py --serve --port 8199   # run only the fake server
+"""
+
+import argparse
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.workflow_compiler import CORE_OBJECT_INFO, use_cache_dir
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+FAKE_VERSION = "0.0.0-fake"
+# Core node schema and model folders with the checkpoint the repo's workflows use installed
+FAKE_MODELS = {'checkpoints': ["dreamshaperXL_lightningDPMSDE.safetensors"], 'loras': [], 'vae': []}
+FAKE_OBJECT_INFO = dict(CORE_OBJECT_INFO, CheckpointLoaderSimple={
+    **CORE_OBJECT_INFO['CheckpointLoaderSimple'],
+    'input': {'required': {'ckpt_name': [FAKE_MODELS['checkpoints'], {}]}},
+})
+
+
+def fake_png(image_kb: int) -> bytes:
+    """A valid RGB PNG of random noise, about image_kb in size (stored uncompressed)"""
+    side = max(8, int((image_kb * 1024 / 3) ** 0.5) // 2 * 2)  # even, so frames encode as yuv420p
+    rows = b''.join(b'\x00' + os.urandom(side * 3) for _ in range(side))
+
+    def chunk(kind, data):
+        return len(data).to_bytes(4, 'big') + kind + data + zlib.crc32(kind + data).to_bytes(4, 'big')
+
+    header = side.to_bytes(4, 'big') * 2 + bytes([8, 2, 0, 0, 0])
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(rows, 0))
+            + chunk(b'IEND', b''))
+
+
+REFERENCE_WORK = 1024 * 1024 * 20  # one 1 MP image at 20 steps takes `latency` seconds with --gpu-model
+SIZE_NODES = ('EmptyLatentImage', 'LatentUpscale', 'ImageScale')
+
+
+def _pixels(workflow: dict, link, depth=0) -> int:
+    """Pixel count flowing out of a linked node (image or latent), following pass-through nodes"""
+    node = workflow.get(str(link[0])) if isinstance(link, list) else None
+    if node is None or depth > 16:
+        return 1024 * 1024
+    inputs = node.get('inputs', {})
+    if node.get('class_type') in SIZE_NODES:
+        return int(inputs.get('width', 1024)) * int(inputs.get('height', 1024))
+    for name in ('samples', 'pixels', 'image', 'latent_image'):
+        if isinstance(inputs.get(name), list):
+            return _pixels(workflow, inputs[name], depth + 1)
+    return 1024 * 1024
+
+
+def workload(workflow: dict) -> float:
+    """
+    Sampler work of a prompt relative to one 1 MP, 20-step image (linear in pixels x executed steps)
+
+    Like ComfyUI's KSampler, denoise < 1 does not shorten a run: it schedules
+    int(steps / denoise) sigmas and executes the last `steps` of them.
+    """
+    work = 0.0
+    for node in workflow.values():
+        if isinstance(node, dict) and node.get('class_type') == 'KSampler':
+            inputs = node.get('inputs', {})
+            work += _pixels(workflow, inputs.get('latent_image')) * int(inputs.get('steps', 20))
+    return work / REFERENCE_WORK if work else 1.0
+
+
+class FakeComfyUI:
+    """In-memory ComfyUI stand-in: a FIFO queue executed by simulated GPU workers"""
+
+    def __init__(self, latency=1.0, jitter=0.2, failure_rate=0.0, image_kb=800, workers=1, seed=0, gpu_model=False,
+                 output_dir=None):
+        self.latency = latency
+        self.gpu_model = gpu_model
+        # Like ComfyUI's output folder: finished images are also written here (local pickup tests)
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.image = fake_png(image_kb)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)
+        self.pending = deque()
+        self.running = set()
+        self.jobs = {}
+        self.files = {}
+        self.requests = Counter()
+        self.latencies = []
+        self.failures = 0
+        self.counter = 0
+        for _ in range(workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def reset(self):
+        """Clear statistics between benchmark runs"""
+        with self.lock:
+            self.requests.clear()
+            self.latencies = []
+            self.failures = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'requests': dict(self.requests),
+                'latencies': list(self.latencies),
+                'failures': self.failures,
+                'queue_remaining': len(self.pending) + len(self.running),
+                'history_size': sum(1 for job in self.jobs.values() if job['outputs'] is not None),
+            }
+
+    def delete_history(self, body: dict):
+        """POST /history: {"delete": [prompt_id, ...]} or {"clear": true}; running jobs are kept"""
+        with self.lock:
+            if body.get('clear'):
+                prompt_ids = [p for p, job in self.jobs.items() if job['outputs'] is not None]
+            else:
+                prompt_ids = body.get('delete', [])
+            for prompt_id in prompt_ids:
+                job = self.jobs.get(prompt_id)
+                if job is None or job['outputs'] is None:
+                    continue
+                del self.jobs[prompt_id]
+                for filename in job['filenames']:
+                    self.files.pop(filename, None)
+
+    def count(self, endpoint: str):
+        with self.lock:
+            self.requests[endpoint] += 1
+
+    def submit(self, workflow: dict):
+        """Queue a workflow; returns (status_code, response body)"""
+        with self.lock:
+            if self.rng.random() < self.failure_rate:
+                self.failures += 1
+                return 400, {
+                    'error': {'type': 'prompt_outputs_failed_validation', 'message': 'Prompt outputs failed validation'},
+                    'node_errors': {'4': {'errors': [{'message': 'Value not in list'}], 'class_type': 'CheckpointLoaderSimple'}},
+                }
+            prompt_id = str(uuid.uuid4())
+            self.counter += 1
+            prefix = 'ComfyUI'
+            # One output image per latent in the batch, as ComfyUI does for animation frames
+            frames = 1
+            for node in workflow.values():
+                if isinstance(node, dict) and node.get('class_type') == 'EmptyLatentImage':
+                    frames = max(1, int(node.get('inputs', {}).get('batch_size', 1)))
+            for node_id, node in workflow.items():
+                if isinstance(node, dict) and node.get('class_type') == 'SaveImage':
+                    prefix = node.get('inputs', {}).get('filename_prefix', prefix)
+                    save_node = node_id
+                    break
+            else:
+                save_node = '9'
+            filenames = [f"{prefix}_{self.counter:05d}_{frame:03d}_.png" if frames > 1 else f"{prefix}_{self.counter:05d}_.png"
+                         for frame in range(frames)]
+            duration = max(0.0, self.latency * (1 + self.rng.uniform(-self.jitter, self.jitter)))
+            if self.gpu_model:
+                duration *= workload(workflow)
+            self.jobs[prompt_id] = {
+                'submitted': time.time(),
+                'duration': duration,
+                'outputs': None,
+                'save_node': save_node,
+                'filenames': filenames,
+                'number': self.counter,
+            }
+            for filename in filenames:
+                self.files[filename] = prompt_id
+            self.pending.append(prompt_id)
+            self.cond.notify()
+            return 200, {'prompt_id': prompt_id, 'number': self.counter, 'node_errors': {}}
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                prompt_id = self.pending.popleft()
+                self.running.add(prompt_id)
+                job = self.jobs[prompt_id]
+            job['started'] = int(time.time() * 1000)
+            time.sleep(job['duration'])
+            if self.output_dir is not None:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                for filename in job['filenames']:
+                    (self.output_dir / filename).write_bytes(self.image)
+            with self.lock:
+                self.running.discard(prompt_id)
+                job['finished'] = int(time.time() * 1000)
+                job['outputs'] = {
+                    job['save_node']: {'images': [{'filename': filename, 'subfolder': '', 'type': 'output'}
+                                                  for filename in job['filenames']]}
+                }
+
+    def history(self, prompt_id: str = None) -> dict:
+        """One finished job's entry, or every finished job's when prompt_id is None"""
+        if prompt_id is None:
+            with self.lock:
+                finished = [p for p, job in self.jobs.items() if job['outputs'] is not None]
+            entries = {}
+            for p in finished:
+                entries.update(self.history(p))
+            return entries
+        with self.lock:
+            job = self.jobs.get(prompt_id)
+            if not job or job['outputs'] is None:
+                return {}
+            return {prompt_id: {
+                'prompt': [job['number'], prompt_id, {}, {}, [job['save_node']]],
+                'outputs': job['outputs'],
+                'status': {'status_str': 'success', 'completed': True, 'messages': [
+                    ['execution_start', {'prompt_id': prompt_id, 'timestamp': job['started']}],
+                    ['execution_success', {'prompt_id': prompt_id, 'timestamp': job['finished']}],
+                ]},
+            }}
+
+    def view(self, filename: str):
+        with self.lock:
+            prompt_id = self.files.get(filename)
+            if prompt_id is None:
+                return None
+            job = self.jobs[prompt_id]
+            if job['outputs'] is None:
+                return None
+            self.latencies.append(time.time() - job['submitted'])
+            return self.image
+
+    def queue(self) -> dict:
+        with self.lock:
+            return {
+                'queue_running': [[self.jobs[p]['number'], p, {}, {}, []] for p in self.running],
+                'queue_pending': [[self.jobs[p]['number'], p, {}, {}, []] for p in self.pending],
+            }
+
+
+def make_handler(comfy: FakeComfyUI):
+    """Build a request handler class bound to a FakeComfyUI instance"""
+
+    class FakeComfyUIHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, body, status=200):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_body(self) -> bytes:
+            length = int(self.headers.get('Content-Length', 0))
+            return self.rfile.read(length) if length else b''
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            if path == '/prompt':
+                comfy.count('/prompt')
+                try:
+                    payload = json.loads(self._read_body() or b'{}')
+                except json.JSONDecodeError:
+                    self._send_json({'error': {'message': 'Invalid JSON'}}, 400)
+                    return
+                status, body = comfy.submit(payload.get('prompt', {}))
+                self._send_json(body, status)
+            elif path == '/history':
+                comfy.count('/history:delete')
+                try:
+                    comfy.delete_history(json.loads(self._read_body() or b'{}'))
+                except json.JSONDecodeError:
+                    self._send_json({'error': {'message': 'Invalid JSON'}}, 400)
+                    return
+                self._send_json({})
+            elif path == '/upload/image':
+                # Accept the multipart upload; only the file name is kept
+                body = self._read_body()
+                match = re.search(rb'filename="([^"]+)"', body)
+                name = match.group(1).decode('utf-8', 'replace') if match else f"upload_{uuid.uuid4().hex[:8]}.png"
+                self._send_json({'name': name, 'subfolder': '', 'type': 'input'})
+            elif path == '/_bench/reset':
+                self._read_body()
+                comfy.reset()
+                self._send_json({'ok': True})
+            else:
+                self._read_body()
+                self._send_json({'error': 'not found'}, 404)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            path = parsed.path
+            if path.startswith('/history/'):
+                comfy.count('/history')
+                self._send_json(comfy.history(path[len('/history/'):]))
+            elif path == '/history':
+                comfy.count('/history')
+                self._send_json(comfy.history())
+            elif path == '/view':
+                comfy.count('/view')
+                filename = parse_qs(parsed.query).get('filename', [''])[0]
+                data = comfy.view(filename)
+                if data is None:
+                    self._send_json({'error': 'not found'}, 404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            elif path == '/queue':
+                comfy.count('/queue')
+                self._send_json(comfy.queue())
+            elif path == '/system_stats':
+                comfy.count('/system_stats')
+                self._send_json({
+                    'system': {'os': 'fake', 'python_version': sys.version.split()[0], 'embedded_python': False,
+                               'comfyui_version': FAKE_VERSION},
+                    'devices': [{'name': 'fake-gpu', 'type': 'cuda', 'index': 0,
+                                 'vram_total': 24 << 30, 'vram_free': 20 << 30}],
+                })
+            elif path == '/object_info':
+                comfy.count('/object_info')
+                self._send_json(FAKE_OBJECT_INFO)
+            elif path == '/models':
+                self._send_json(sorted(FAKE_MODELS))
+            elif path.startswith('/models/'):
+                self._send_json(FAKE_MODELS.get(path[len('/models/'):], []))
+            elif path == '/ws':
+                comfy.count('/ws')
+                self._websocket()
+            elif path == '/_bench/stats':
+                self._send_json(comfy.stats())
+            else:
+                self._send_json({'error': 'not found'}, 404)
+
+        def _websocket(self):
+            """Minimal server-push WebSocket: periodic queue status messages"""
+            key = self.headers.get('Sec-WebSocket-Key')
+            if not key:
+                self._send_json({'error': 'websocket upgrade required'}, 400)
+                return
+            accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+            self.send_response(101)
+            self.send_header('Upgrade', 'websocket')
+            self.send_header('Connection', 'Upgrade')
+            self.send_header('Sec-WebSocket-Accept', accept)
+            self.end_headers()
+            self.close_connection = True
+            sid = uuid.uuid4().hex
+            try:
+                while True:
+                    message = json.dumps({'type': 'status', 'data': {
+                        'status': {'exec_info': {'queue_remaining': comfy.stats()['queue_remaining']}}, 'sid': sid
+                    }}).encode('utf-8')
+                    header = bytes([0x81, len(message)]) if len(message) < 126 else \
+                        bytes([0x81, 126]) + len(message).to_bytes(2, 'big')
+                    self.wfile.write(header + message)
+                    self.wfile.flush()
+                    time.sleep(0.5)
+            except (BrokenPipeError, ConnectionResetError, OSError):
+                pass
+
+    return FakeComfyUIHandler
+
+
+def serve(port, latency, jitter, failure_rate, image_kb, workers, seed=0, gpu_model=False, output_dir=None):
+    """Run the fake ComfyUI server until interrupted"""
+    comfy = FakeComfyUI(latency, jitter, failure_rate, image_kb, workers, seed, gpu_model, output_dir)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(comfy))
+    server.daemon_threads = True
+    print(f"🧪 Fake ComfyUI at http://127.0.0.1:{port} (latency {latency}s ±{jitter * 100:.0f}%, "
+          f"failures {failure_rate * 100:.0f}%, image {image_kb} KB, {workers} worker(s))", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+@contextlib.contextmanager
+def fake_server_process(port, latency, jitter, failure_rate, image_kb, workers, gpu_model=False):
+    """Start the fake server in a subprocess so its CPU is not counted as client CPU"""
+    import requests
+
+    cmd = [
+        sys.executable, str(Path(__file__).absolute()), '--serve',
+        '--port', str(port), '--latency', str(latency), '--jitter', str(jitter),
+        '--failure-rate', str(failure_rate), '--image-kb', str(image_kb), '--workers', str(workers),
+    ] + (['--gpu-model'] if gpu_model else [])
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"{url}/_bench/stats", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.05)
+        else:
+            raise RuntimeError("Fake ComfyUI server did not start")
+        yield url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile of a list (q in [0, 1])"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+def run_batch(api_url, jobs, parallel, work_dir):
+    """batch_generate_sketches.batch_generate_sketches over a generated prompts file"""
+    from scripts.batch_generate_sketches import batch_generate_sketches
+
+    prompts_path = work_dir / 'prompts.txt'
+    with open(prompts_path, 'w') as f:
+        for i in range(jobs):
+            f.write(f"bench_{i}:\nA benchmark sketch number {i}\n\n")
+    results = batch_generate_sketches(prompts_path, output_dir=str(work_dir / 'batch'), parallel=parallel,
+                                      delay=0, api_url=api_url, progress_mode='off')
+    return sum(1 for r in results if r[1])
+
+
+def run_single(api_url, jobs, parallel, work_dir):
+    """generate_sketch_image.generate_sketch_image called from `parallel` threads"""
+    from scripts.generate_sketch_image import generate_sketch_image
+
+    def job(i):
+        return generate_sketch_image(f"A benchmark sketch number {i}", output_dir=str(work_dir / 'single'),
+                                     output_filename=f"bench_{i}", api_url=api_url)
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        return sum(1 for r in executor.map(job, range(jobs)) if r)
+
+
+def run_scenes(api_url, jobs, parallel, work_dir):
+    """generate_complete_scenes.generate_scene_image called from `parallel` threads"""
+    from scripts.generate_complete_scenes import generate_scene_image
+
+    output_dir = work_dir / 'scenes'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workflow_path = project_root / "workflows" / "basic_image.json"
+
+    def job(i):
+        return generate_scene_image(i + 1, f"A benchmark scene number {i}", output_dir, api_url, workflow_path)
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        return sum(1 for r in executor.map(job, range(jobs)) if r[0])
+
+
+TARGETS = {
+    'batch': run_batch,
+    'single': run_single,
+    'scenes': run_scenes,
+}
+
+
+def run_benchmark(api_url, target, jobs, parallel):
+    """Run one (target, parallel) combination and collect client + server metrics"""
+    import requests
+    from scripts.history_gc import flush_all as flush_history
+
+    requests.post(f"{api_url}/_bench/reset")
+    # Fake-server schema and model snapshots must not land in the real cache
+    with tempfile.TemporaryDirectory() as tmp, use_cache_dir(Path(tmp) / 'cache'):
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            succeeded = TARGETS[target](api_url, jobs, parallel, Path(tmp))
+            # History deletions still batched up belong to this run's requests
+            flush_history()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+    stats = requests.get(f"{api_url}/_bench/stats").json()
+
+    latencies = stats['latencies']
+    total_requests = sum(stats['requests'].values())
+    return {
+        'target': target,
+        'parallel': parallel,
+        'jobs': jobs,
+        'succeeded': succeeded,
+        'server_failures': stats['failures'],
+        'wall_seconds': wall,
+        'jobs_per_sec': succeeded / wall if wall > 0 else 0.0,
+        'latency_p50': percentile(latencies, 0.50),
+        'latency_p95': percentile(latencies, 0.95),
+        'latency_p99': percentile(latencies, 0.99),
+        'http_requests': stats['requests'],
+        'http_requests_per_job': total_requests / jobs if jobs else 0.0,
+        'client_cpu_seconds': cpu,
+        'client_cpu_ms_per_job': cpu * 1000 / jobs if jobs else 0.0,
+    }
+
+
+def format_run(run):
+    def ms(v):
+        return f"{v * 1000:7.0f}" if v is not None else "      -"
+    return (f"{run['target']:<7} {run['parallel']:>3} {run['succeeded']:>4}/{run['jobs']:<4} "
+            f"{run['jobs_per_sec']:7.2f} {ms(run['latency_p50'])} {ms(run['latency_p95'])} {ms(run['latency_p99'])} "
+            f"{run['http_requests_per_job']:8.1f} {run['client_cpu_ms_per_job']:8.1f}")
+
+
+def print_comparison(previous, current):
+    """Print throughput and tail-latency changes against a previous results file"""
+    before = {(r['target'], r['parallel']): r for r in previous['runs']}
+    print("\n📈 Comparison with previous run")
+    for run in current['runs']:
+        old = before.get((run['target'], run['parallel']))
+        if not old:
+            continue
+
+        def change(new, prev):
+            if not prev or new is None:
+                return "   n/a"
+            return f"{(new - prev) / prev * 100:+6.1f}%"
+
+        print(f"   {run['target']:<7} x{run['parallel']:<3} jobs/s {change(run['jobs_per_sec'], old['jobs_per_sec'])}  "
+              f"p95 {change(run['latency_p95'], old['latency_p95'])}  "
+              f"req/job {change(run['http_requests_per_job'], old['http_requests_per_job'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark ComfyUI client code against a fake ComfyUI server',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Default: all client paths at --parallel 1,2,4
+  python scripts/benchmark_comfyui.py
+
+  # Slow GPU, flaky server, big images
+  python scripts/benchmark_comfyui.py --latency 3 --jitter 0.5 --failure-rate 0.05 --image-kb 2000
+
+  # Compare with an earlier run
+  python scripts/benchmark_comfyui.py --compare output/benchmarks/comfyui_20250101_120000.json
+        """
+    )
+    parser.add_argument('--targets', default='batch,single,scenes', help=f"Client paths ({','.join(TARGETS)})")
+    parser.add_argument('--parallel', default='1,2,4', help='Comma-separated --parallel settings')
+    parser.add_argument('--jobs', type=int, default=12, help='Jobs per run')
+    parser.add_argument('--latency', type=float, default=0.5, help='Per-job execution time on the fake GPU (seconds)')
+    parser.add_argument('--jitter', type=float, default=0.2, help='Latency jitter (fraction, +/-)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of /prompt calls rejected')
+    parser.add_argument('--image-kb', type=int, default=800, help='Generated image size (KB)')
+    parser.add_argument('--workers', type=int, default=1, help='Simulated GPU workers')
+    parser.add_argument('--port', type=int, default=8199, help='Fake server port')
+    parser.add_argument('--output', default=None, help='Results JSON (default: output/benchmarks/comfyui_<timestamp>.json)')
+    parser.add_argument('--compare', default=None, help='Previous results JSON to compare against')
+    parser.add_argument('--serve', action='store_true', help='Only run the fake server')
+    parser.add_argument('--output-dir', default=None,
+                        help='With --serve: also write outputs here, like ComfyUI\'s output folder')
+    parser.add_argument('--gpu-model', action='store_true',
+                        help='Scale job time by sampled pixels x executed steps (--latency = 1 MP at 20 steps)')
+
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.latency, args.jitter, args.failure_rate, args.image_kb, args.workers,
+              gpu_model=args.gpu_model, output_dir=args.output_dir)
+        return
+
+    targets = [t.strip() for t in args.targets.split(',') if t.strip()]
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        print(f"❌ Unknown target(s): {', '.join(unknown)}")
+        sys.exit(1)
+    parallel_settings = [int(p) for p in args.parallel.split(',')]
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'server': {
+            'latency': args.latency, 'jitter': args.jitter, 'failure_rate': args.failure_rate,
+            'image_kb': args.image_kb, 'workers': args.workers, 'gpu_model': args.gpu_model,
+        },
+        'runs': [],
+    }
+
+    print(f"🧪 Benchmarking {', '.join(targets)} with {args.jobs} jobs at --parallel {args.parallel}")
+    print(f"{'target':<7} {'par':>3} {'ok':>9} {'jobs/s':>7} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+          f"{'req/job':>8} {'cpu ms/j':>8}")
+    with fake_server_process(args.port, args.latency, args.jitter, args.failure_rate,
+                             args.image_kb, args.workers, args.gpu_model) as api_url:
+        for target in targets:
+            for parallel in parallel_settings:
+                run = run_benchmark(api_url, target, args.jobs, parallel)
+                results['runs'].append(run)
+                print(format_run(run))
+
+    output_path = Path(args.output) if args.output else \
+        project_root / 'output' / 'benchmarks' / f"comfyui_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved: {output_path}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            print_comparison(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the doodly CLI
+Times `doodly --help` and each `doodly <command> --help` in fresh interpreters,
+and uses `python -X importtime` to list the slowest top-level imports.
+
+Usage:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 10 --commands batch,scenes --top 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.doodly import COMMANDS
+
+CLI_PATH = project_root / "scripts" / "doodly.py"
+HELP_BUDGET_MS = 100.0
+
+
+def parse_importtime(stderr: str):
+    """Top-level (cumulative) import times in ms from `python -X importtime` output"""
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part for part in line[len('import time:'):].split('|'))
+        # Nested imports are indented under their importer
+        if name.startswith('  '):
+            continue
+        top_level[name.strip()] = int(cumulative) / 1000
+    return top_level
+
+
+def time_invocation(args, runs):
+    """Median/min wall time (ms) of `python doodly.py <args>` plus its exit code"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    timings = []
+    returncode = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, str(CLI_PATH)] + args, capture_output=True, env=env)
+        timings.append((time.perf_counter() - start) * 1000)
+        returncode = result.returncode
+    return statistics.median(timings), min(timings), returncode
+
+
+def profile_imports(args):
+    result = subprocess.run([sys.executable, '-X', 'importtime', str(CLI_PATH)] + args,
+                            capture_output=True, text=True)
+    return parse_importtime(result.stderr)
+
+
+def run_benchmark(commands, runs, top):
+    # Bare interpreter startup, the floor every invocation pays
+    start_times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], capture_output=True)
+        start_times.append((time.perf_counter() - start) * 1000)
+    baseline = statistics.median(start_times)
+
+    invocations = [['--help']] + [[command, '--help'] for command in commands]
+    results = []
+    for args in invocations:
+        median_ms, min_ms, returncode = time_invocation(args, runs)
+        imports = profile_imports(args)
+        slowest = sorted(imports.items(), key=lambda kv: -kv[1])[:top]
+        results.append({
+            'command': ' '.join(args),
+            'median_ms': round(median_ms, 1),
+            'min_ms': round(min_ms, 1),
+            'over_interpreter_ms': round(median_ms - baseline, 1),
+            'returncode': returncode,
+            'import_ms': round(sum(imports.values()), 1),
+            'slowest_imports': [{'module': m, 'ms': round(ms, 1)} for m, ms in slowest],
+        })
+    return baseline, results
+
+
+def print_results(baseline, results):
+    print(f"\nInterpreter startup (python -c pass): {baseline:.1f} ms")
+    print(f"{'command':<22} {'median ms':>10} {'min ms':>8} {'imports ms':>11}  exit")
+    print("-" * 60)
+    for r in results:
+        flag = ''
+        if r['command'] == '--help':
+            flag = '  ✅' if r['median_ms'] < HELP_BUDGET_MS else f"  ❌ over {HELP_BUDGET_MS:.0f} ms"
+        print(f"{'doodly ' + r['command']:<22} {r['median_ms']:>10.1f} {r['min_ms']:>8.1f} "
+              f"{r['import_ms']:>11.1f}  {r['returncode']:>4}{flag}")
+
+    for r in results:
+        if not r['slowest_imports']:
+            continue
+        print(f"\nSlowest imports for doodly {r['command']}:")
+        for entry in r['slowest_imports']:
+            print(f"   {entry['ms']:>8.1f} ms  {entry['module']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark doodly CLI startup and import time',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # All subcommands, 5 runs each
+  python scripts/benchmark_startup.py
+
+  # Only the image commands, more runs
+  python scripts/benchmark_startup.py --commands sketch,batch --runs 20
+        """
+    )
+    parser.add_argument('--commands', default=','.join(COMMANDS), help='Comma-separated subcommands to time')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per command (median is reported)')
+    parser.add_argument('--top', type=int, default=8, help='Slowest imports to list per command')
+    parser.add_argument('--output', default=None, help='Results JSON (default: output/benchmarks/startup_<timestamp>.json)')
+
+    args = parser.parse_args()
+
+    commands = [c.strip() for c in args.commands.split(',') if c.strip()]
+    unknown = [c for c in commands if c not in COMMANDS]
+    if unknown:
+        print(f"❌ Unknown commands: {', '.join(unknown)}")
+        sys.exit(1)
+
+    baseline, results = run_benchmark(commands, args.runs, args.top)
+    print_results(baseline, results)
+
+    output_path = Path(args.output) if args.output else \
+        project_root / "output" / "benchmarks" / f"startup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump({'python': sys.version.split()[0], 'interpreter_ms': round(baseline, 1),
+                   'help_budget_ms': HELP_BUDGET_MS, 'results': results}, f, indent=2)
+    print(f"\n💾 Results saved: {output_path}")
+
+    help_result = results[0]
+    if help_result['median_ms'] >= HELP_BUDGET_MS:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
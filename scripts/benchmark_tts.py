@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Benchmark the voiceover pipeline against a local stub TTS server
+The stub implements /v1/audio/speech and streams deterministic PCM (24kHz, 16-bit, mono)
+at a configurable synthesis speed and time-to-first-byte
+
+Measures total voiceover wall time, TTS request time, PCM->MP3 conversion time,
+merge time and peak client RSS for 1 KB, 50 KB and 500 KB scripts. Each size
+runs in a fresh process so peak RSS is per run.
+
+Usage:
+    python scripts/benchmark_tts.py
+    python scripts/benchmark_tts.py --sizes 1,50 --speed 50 --ttfb 0.3
+    python scripts/benchmark_tts.py --targets voiceover --compare output/benchmarks/tts_20250101_120000.json
+    python scripts/benchmark_tts.py --serve --port 8198   # run only the stub server
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import resource
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+SAMPLE_RATE = 24000
+SAMPLE_WIDTH = 2
+
+# One second of a 220Hz tone; every response is a deterministic repeat of it
+_TONE = struct.pack(
+    f'<{SAMPLE_RATE}h',
+    *(int(8000 * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)) for i in range(SAMPLE_RATE))
+)
+
+SAMPLE_SENTENCES = [
+    "Survival starts in the mind long before it shows in the body.",
+    "Fear sharpens the senses, but unchecked it freezes every decision.",
+    "Every choice in the wild is a trade between energy, time and risk.",
+    "Water first, then shelter, then fire, then food; the order rarely changes.",
+    "Stay calm, make a plan, and move only when the plan says so.",
+]
+
+
+def make_script(size_kb: int) -> str:
+    """Deterministic narration text of roughly size_kb kilobytes"""
+    target = size_kb * 1024
+    parts, length, i = [], 0, 0
+    while length < target:
+        sentence = SAMPLE_SENTENCES[i % len(SAMPLE_SENTENCES)]
+        parts.append(sentence)
+        length += len(sentence) + 1
+        i += 1
+        if i % 6 == 0:
+            parts.append("\n")
+    return ' '.join(parts)[:target]
+
+
+def make_stub_handler(speed: float, ttfb: float, chars_per_second: float, stats: dict, lock: threading.Lock):
+    """Request handler streaming `len(text) / chars_per_second` seconds of PCM per request"""
+
+    class StubTTSHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path == '/health':
+                body = json.dumps({'status': 'ok', 'tts_available': True, 'voices': ['onyx']}).encode()
+            elif self.path == '/_bench/stats':
+                with lock:
+                    body = json.dumps(stats).encode()
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if self.path != '/v1/audio/speech':
+                self.send_error(404)
+                return
+
+            seconds = max(0.1, len(payload.get('input', '')) / chars_per_second)
+            total = int(seconds * SAMPLE_RATE) * SAMPLE_WIDTH
+            with lock:
+                stats['requests'] += 1
+                stats['bytes'] += total
+
+            time.sleep(ttfb)
+            self.send_response(200)
+            self.send_header('Content-Type', 'audio/pcm')
+            self.send_header('Content-Length', str(total))
+            self.end_headers()
+
+            # Stream 0.1s of audio per write, paced to the synthesis speed
+            block = SAMPLE_RATE * SAMPLE_WIDTH // 10
+            start = time.perf_counter()
+            sent = 0
+            try:
+                while sent < total:
+                    size = min(block, total - sent)
+                    offset = sent % len(_TONE)
+                    data = (_TONE[offset:] + _TONE)[:size]
+                    self.wfile.write(data)
+                    sent += size
+                    due = start + (sent / (SAMPLE_RATE * SAMPLE_WIDTH)) / speed
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return StubTTSHandler
+
+
+def serve(port, speed, ttfb, chars_per_second):
+    """Run the stub TTS server until interrupted"""
+    stats = {'requests': 0, 'bytes': 0}
+    handler = make_stub_handler(speed, ttfb, chars_per_second, stats, threading.Lock())
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    print(f"🧪 Stub TTS at http://127.0.0.1:{port}/v1 ({speed}x realtime, TTFB {ttfb}s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+@contextlib.contextmanager
+def stub_server_process(port, speed, ttfb, chars_per_second):
+    """Start the stub TTS server in a subprocess"""
+    import requests
+
+    cmd = [
+        sys.executable, str(Path(__file__).absolute()), '--serve', '--port', str(port),
+        '--speed', str(speed), '--ttfb', str(ttfb), '--chars-per-second', str(chars_per_second),
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            if process.poll() is not None:
+                break
+            try:
+                requests.get(f"{url}/health", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.05)
+        else:
+            raise RuntimeError("Stub TTS server did not start")
+        # A health answer can come from another server already on the port while ours fails to bind
+        try:
+            process.wait(timeout=0.2)
+        except subprocess.TimeoutExpired:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError(f"Stub TTS server exited with code {process.returncode} (is port {port} in use?)")
+        yield f"{url}/v1"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+class StageTimer:
+    """Accumulate wall time of wrapped pipeline functions"""
+
+    def __init__(self):
+        self.totals = {}
+        self.calls = {}
+
+    def _add(self, name, elapsed):
+        self.totals[name] = self.totals.get(name, 0.0) + elapsed
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def wrap(self, name, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._add(name, time.perf_counter() - start)
+        return timed
+
+    def wrap_async(self, name, fn):
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self._add(name, time.perf_counter() - start)
+        return timed
+
+
+async def run_voiceover(text, base_url, work_dir, timer):
+    """generate_openai_voiceover.generate_voiceover_async with the stub as open-source API"""
+    from scripts import generate_openai_voiceover as voiceover
+
+    voiceover.generate_chunk_openai_async = timer.wrap_async('tts', voiceover.generate_chunk_openai_async)
+    voiceover.convert_pcm_to_mp3 = timer.wrap('convert', voiceover.convert_pcm_to_mp3)
+    voiceover.merge_audio_files = timer.wrap('merge', voiceover.merge_audio_files)
+    return await voiceover.generate_voiceover_async(
+        text, work_dir / 'voiceover.mp3', use_open_source=True, base_url=base_url
+    )
+
+
+async def run_scenes(text, base_url, work_dir, timer, scene_chars=1500):
+    """The voice half of generate_complete_scenes.process_scene for each scene of the script"""
+    from scripts import generate_complete_scenes as scenes
+
+    scenes.convert_pcm_to_mp3 = timer.wrap('convert', scenes.convert_pcm_to_mp3)
+    generate_voice_chunk = timer.wrap_async('tts', scenes.generate_voice_chunk)
+
+    ok = True
+    scene_texts = [text[i:i + scene_chars] for i in range(0, len(text), scene_chars)]
+    for scene_num, scene_text in enumerate(scene_texts, 1):
+        for chunk_letter, chunk_text in scenes.split_voice_text(scene_text, max_chars=1000):
+            success, _ = await generate_voice_chunk(chunk_text, scene_num, chunk_letter, work_dir, base_url)
+            ok = ok and success
+    return ok
+
+
+TARGETS = {
+    'voiceover': run_voiceover,
+    'scenes': run_scenes,
+}
+
+
+def run_one(target, size_kb, base_url):
+    """Child process entry: run one benchmark and print a JSON result line"""
+    text = make_script(size_kb)
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            success = asyncio.run(TARGETS[target](text, base_url, Path(tmp), timer))
+        wall = time.perf_counter() - start
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 if sys.platform == 'darwin' else 1
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale / 1024
+
+    # generate_voice_chunk converts to MP3 inside the timed call
+    tts_seconds = timer.totals.get('tts', 0.0)
+    if target == 'scenes':
+        tts_seconds -= timer.totals.get('convert', 0.0)
+    print(json.dumps({
+        'target': target,
+        'size_kb': size_kb,
+        'chars': len(text),
+        'success': bool(success),
+        'wall_seconds': wall,
+        'tts_seconds': tts_seconds,
+        'tts_calls': timer.calls.get('tts', 0),
+        'convert_seconds': timer.totals.get('convert', 0.0),
+        'convert_calls': timer.calls.get('convert', 0),
+        'merge_seconds': timer.totals.get('merge', 0.0),
+        'peak_rss_mb': peak_rss,
+    }))
+
+
+def print_comparison(previous, current):
+    """Print wall time and peak RSS changes against a previous results file"""
+    before = {(r['target'], r['size_kb']): r for r in previous['runs']}
+    print("\n📈 Comparison with previous run")
+    for run in current['runs']:
+        old = before.get((run['target'], run['size_kb']))
+        if not old:
+            continue
+
+        def change(key):
+            return f"{(run[key] - old[key]) / old[key] * 100:+6.1f}%" if old.get(key) else "   n/a"
+
+        print(f"   {run['target']:<9} {run['size_kb']:>4} KB  wall {change('wall_seconds')}  "
+              f"convert {change('convert_seconds')}  merge {change('merge_seconds')}  rss {change('peak_rss_mb')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the voiceover pipeline against a stub TTS server',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 1 KB, 50 KB and 500 KB scripts through both voice paths
+  python scripts/benchmark_tts.py
+
+  # Slow synthesis with high time-to-first-byte
+  python scripts/benchmark_tts.py --sizes 1,50 --speed 5 --ttfb 1.0
+        """
+    )
+    parser.add_argument('--targets', default='voiceover,scenes', help=f"Voice paths ({','.join(TARGETS)})")
+    parser.add_argument('--sizes', default='1,50,500', help='Script sizes in KB')
+    parser.add_argument('--speed', type=float, default=100.0, help='Stub synthesis speed (x realtime)')
+    parser.add_argument('--ttfb', type=float, default=0.2, help='Stub time to first byte (seconds)')
+    parser.add_argument('--chars-per-second', type=float, default=15.0, help='Narration rate used to size audio')
+    parser.add_argument('--port', type=int, default=8198, help='Stub server port')
+    parser.add_argument('--output', default=None, help='Results JSON (default: output/benchmarks/tts_<timestamp>.json)')
+    parser.add_argument('--compare', default=None, help='Previous results JSON to compare against')
+    parser.add_argument('--serve', action='store_true', help='Only run the stub server')
+    parser.add_argument('--run-one', nargs=3, metavar=('TARGET', 'SIZE_KB', 'BASE_URL'), help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.speed, args.ttfb, args.chars_per_second)
+        return
+    if args.run_one:
+        run_one(args.run_one[0], int(args.run_one[1]), args.run_one[2])
+        return
+
+    targets = [t.strip() for t in args.targets.split(',') if t.strip()]
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        print(f"❌ Unknown target(s): {', '.join(unknown)}")
+        sys.exit(1)
+    sizes = [int(s) for s in args.sizes.split(',')]
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'server': {'speed': args.speed, 'ttfb': args.ttfb, 'chars_per_second': args.chars_per_second},
+        'runs': [],
+    }
+
+    print(f"🧪 Benchmarking {', '.join(targets)} for {args.sizes} KB scripts "
+          f"(stub {args.speed}x realtime, TTFB {args.ttfb}s)")
+    print(f"{'target':<9} {'KB':>4} {'ok':>3} {'wall s':>8} {'tts s':>8} {'conv s':>8} {'merge s':>8} "
+          f"{'rss MB':>7}")
+    with stub_server_process(args.port, args.speed, args.ttfb, args.chars_per_second) as base_url:
+        for target in targets:
+            for size_kb in sizes:
+                proc = subprocess.run(
+                    [sys.executable, str(Path(__file__).absolute()), '--run-one', target, str(size_kb), base_url],
+                    capture_output=True, text=True
+                )
+                if proc.returncode != 0 or not proc.stdout.strip():
+                    print(f"❌ {target} {size_kb} KB failed: {proc.stderr.strip()[-300:]}")
+                    continue
+                run = json.loads(proc.stdout.strip().splitlines()[-1])
+                results['runs'].append(run)
+                print(f"{run['target']:<9} {run['size_kb']:>4} {'✅' if run['success'] else '❌':>2} "
+                      f"{run['wall_seconds']:8.2f} {run['tts_seconds']:8.2f} {run['convert_seconds']:8.2f} "
+                      f"{run['merge_seconds']:8.2f} {run['peak_rss_mb']:7.1f}")
+
+    output_path = Path(args.output) if args.output else \
+        project_root / 'output' / 'benchmarks' / f"tts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved: {output_path}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            print_comparison(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
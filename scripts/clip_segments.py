@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Split long clips into overlapping frame windows and stitch them back together
+Each window is generated as its own prompt (so memory stays bounded and windows
+can run on different backends); the frames shared by neighbouring windows are
+cross-dissolved on the CPU, one vectorized numpy blend per overlap.
+
+Usage:
+    python scripts/clip_segments.py --frames 240            # show the window plan
+    python scripts/clip_segments.py --frames 240 --benchmark # time the stitcher on synthetic frames
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def plan_windows(frame_count: int, window: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    [start, end) frame windows covering frame_count, each at most `window` long
+
+    Neighbouring windows share exactly `overlap` frames; the last window is cut
+    short at the end of the clip rather than generating frames that are dropped.
+    overlap is limited to half a window so only adjacent windows ever overlap.
+    """
+    if frame_count <= window:
+        return [(0, frame_count)]
+    if not 0 <= overlap <= window // 2:
+        raise ValueError(f"overlap must be in [0, {window // 2}] for {window}-frame windows, got {overlap}")
+    stride = window - overlap
+    windows = []
+    start = 0
+    while True:
+        end = min(start + window, frame_count)
+        windows.append((start, end))
+        if end == frame_count:
+            return windows
+        start += stride
+
+
+def crossfade(tail: np.ndarray, head: np.ndarray) -> np.ndarray:
+    """Dissolve from tail to head over their shared frames (both shaped (k, h, w, c))"""
+    k = len(tail)
+    weights = (np.arange(1, k + 1, dtype=np.float32) / (k + 1)).reshape(k, 1, 1, 1)
+    blended = tail.astype(np.float32) * (1 - weights) + head.astype(np.float32) * weights
+    return np.rint(blended).astype(tail.dtype)
+
+
+class SegmentStitcher:
+    """
+    Write one continuous clip from window frames that may arrive in any order
+
+    Frames are passed to write() in order as soon as they are final, so only
+    segments that arrived early and one overlap tail are held in memory.
+    """
+
+    def __init__(self, windows: List[Tuple[int, int]], write: Callable[[np.ndarray], None]):
+        self.windows = windows
+        self.write = write
+        self.ready: Dict[int, np.ndarray] = {}
+        self.next_index = 0
+        self.tail = None
+        self.frames_written = 0
+
+    def _overlap(self, index: int) -> int:
+        """Frames window `index` shares with the next one"""
+        if index + 1 >= len(self.windows):
+            return 0
+        return max(0, self.windows[index][1] - self.windows[index + 1][0])
+
+    def add(self, index: int, frames: np.ndarray):
+        expected = self.windows[index][1] - self.windows[index][0]
+        if len(frames) != expected:
+            raise ValueError(f"Segment {index}: expected {expected} frames, got {len(frames)}")
+        self.ready[index] = frames
+        while self.next_index in self.ready:
+            self._emit(self.ready.pop(self.next_index))
+            self.next_index += 1
+
+    def _emit(self, frames: np.ndarray):
+        index = self.next_index
+        start = 0
+        if self.tail is not None:
+            start = len(self.tail)
+            self._write(crossfade(self.tail, frames[:start]))
+        tail_length = self._overlap(index)
+        end = len(frames) - tail_length
+        self._write(frames[start:end])
+        self.tail = frames[end:].copy() if tail_length else None
+
+    def _write(self, frames: np.ndarray):
+        if len(frames):
+            self.write(frames)
+            self.frames_written += len(frames)
+
+    @property
+    def complete(self) -> bool:
+        return self.next_index == len(self.windows)
+
+
+def stitch(windows: List[Tuple[int, int]], segments: List[np.ndarray]) -> np.ndarray:
+    """All stitched frames as one array (for small clips and checks)"""
+    out = []
+    stitcher = SegmentStitcher(windows, out.append)
+    for index, frames in enumerate(segments):
+        stitcher.add(index, frames)
+    return np.concatenate(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plan or benchmark overlapping clip windows')
+    parser.add_argument('--frames', type=int, required=True, help='Total clip frames')
+    parser.add_argument('--window', type=int, default=None, help='Frames per window (default: from config)')
+    parser.add_argument('--overlap', type=int, default=None, help='Overlap frames (default: from config)')
+    parser.add_argument('--benchmark', action='store_true', help='Time the stitcher on synthetic frames')
+    parser.add_argument('--resolution', default='768x768', help='Frame size for --benchmark (WxH)')
+
+    args = parser.parse_args()
+
+    from config.generation_config import load_settings
+    animatediff = load_settings().animatediff
+    window = args.window or animatediff.segment_frames
+    overlap = animatediff.segment_overlap if args.overlap is None else args.overlap
+
+    windows = plan_windows(args.frames, window, overlap)
+    generated = sum(end - start for start, end in windows)
+    print(f"🎞️  {args.frames} frames -> {len(windows)} window(s) of <= {window} frames "
+          f"({generated} generated, {generated - args.frames} blended)")
+    for index, (start, end) in enumerate(windows):
+        print(f"   {index:>3}: frames {start:>5}-{end - 1:<5}")
+
+    if args.benchmark:
+        width, height = map(int, args.resolution.split('x'))
+        rng = np.random.default_rng(0)
+        base = rng.integers(0, 256, (window, height, width, 3), dtype=np.uint8)
+        segments = [base[:end - start] for start, end in windows]
+        written = 0
+
+        def count(frames):
+            nonlocal written
+            written += len(frames)
+
+        start = time.perf_counter()
+        stitcher = SegmentStitcher(windows, count)
+        # Worst case for memory: segments arrive in reverse order
+        for index in reversed(range(len(windows))):
+            stitcher.add(index, segments[index])
+        elapsed = time.perf_counter() - start
+        print(f"⏱️  Stitched {written} frames at {width}x{height} in {elapsed * 1000:.0f} ms "
+              f"({elapsed / max(written, 1) * 1000:.2f} ms/frame)")
+
+
+if __name__ == '__main__':
+    main()
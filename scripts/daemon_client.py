@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Thin client for the generation daemon (scripts/generation_daemon.py)
+batch_generate_sketches.py and generate_complete_scenes.py submit their project
+here when a daemon answers on daemon.url, then follow it to the end. Only this
+module and the config are imported on that path, so a client starts in well
+under a second and never touches ComfyUI itself.
+
+Usage:
+    python scripts/daemon_client.py                    # daemon status + projects
+    python scripts/daemon_client.py --queue            # pending jobs in dispatch order
+    python scripts/daemon_client.py --project 3        # one project's results
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.generation_config import load_settings
+
+_session = None
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def daemon_url(timeout=2):
+    """URL of a running generation daemon, or None (daemon.url unset or nothing answering)"""
+    url = load_settings().daemon.url
+    if not url:
+        return None
+    try:
+        _get_session().get(f"{url}/health", timeout=timeout).raise_for_status()
+    except requests.RequestException:
+        return None
+    return url
+
+
+def _call(method, url, **kwargs) -> dict:
+    response = _get_session().request(method, url, timeout=30, **kwargs)
+    body = response.json() if response.content else {}
+    if response.status_code >= 400:
+        raise RuntimeError(body.get('error') or f"HTTP {response.status_code}")
+    return body
+
+
+def submit(url, request: dict) -> dict:
+    """Submit a project; returns its summary (raises RuntimeError when the daemon rejects it)"""
+    return _call('POST', f"{url}/projects", json=request)
+
+
+def project_status(url, project_id, since=None) -> dict:
+    """Project summary; with since=N also its finished results from index N on"""
+    params = {} if since is None else {'since': since}
+    return _call('GET', f"{url}/projects/{project_id}", params=params)
+
+
+def run_on_daemon(url, request: dict, poll_interval=1.0):
+    """
+    Submit a project and follow it to the end, printing each scene as it finishes
+
+    Returns (name, success, output_path, error) tuples in completion order, or
+    None when the daemon rejected the project (the reason is printed).
+    Ctrl+C detaches: the project keeps running in the daemon.
+    """
+    try:
+        project = submit(url, request)
+    except (RuntimeError, requests.RequestException) as e:
+        print(f"❌ Daemon rejected the project: {e}")
+        return None
+    project_id = project['id']
+    print(f"🛰️  Project {project_id} ({project['name']}): {project['total']} job(s) queued on {url}")
+    print(f"   Re-prioritize: POST {url}/projects/{project_id}/priority {{\"scenes\": [N], \"priority\": 10}}")
+
+    results = []
+    try:
+        while True:
+            project = project_status(url, project_id, since=len(results))
+            for result in project.get('results', []):
+                results.append((result['name'], result['success'], result['output'], result['error']))
+                position = f"[{len(results)}/{project['total']}]"
+                if result['success']:
+                    print(f"✅ {position} Scene {result['scene']}: {result['name']}")
+                    print(f"   Saved: {result['output']}")
+                else:
+                    print(f"❌ {position} Scene {result['scene']}: {result['name']}")
+                    print(f"   Error: {result['error']}")
+            if project['state'] != 'running':
+                break
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print(f"\n⏸️  Detached; project {project_id} keeps running ({url}/projects/{project_id})")
+        raise
+
+    print("=" * 60)
+    succeeded = project['done'] - project['failed'] - project['cancelled']
+    print(f"📊 Project {project_id}: {succeeded}/{project['total']} succeeded, "
+          f"{project['failed']} failed, {project['cancelled']} cancelled in {project['elapsed']:.1f}s")
+    print(f"📁 Output directory: {project['output_dir']}")
+    print(f"📋 Run manifest: {project['manifest']}")
+    print("=" * 60)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect the generation daemon')
+    parser.add_argument('--queue', action='store_true', help='Pending jobs in dispatch order')
+    parser.add_argument('--project', default=None, help='Show one project and its results')
+
+    args = parser.parse_args()
+
+    url = daemon_url()
+    if url is None:
+        print(f"❌ No generation daemon at {load_settings().daemon.url} "
+              f"(start it with: python scripts/generation_daemon.py)")
+        sys.exit(1)
+
+    if args.project:
+        project = project_status(url, args.project, since=0)
+        print(f"📋 Project {project['id']} ({project['name']}, {project['kind']}): {project['state']}, "
+              f"{project['done']}/{project['total']} done, {project['failed']} failed")
+        for result in project['results']:
+            print(f"   {result['scene']:>4}  {'✅' if result['success'] else '❌'} "
+                  f"{result['output'] or result['error']}")
+        return
+    if args.queue:
+        queue = _call('GET', f"{url}/queue")
+        print(f"📋 {len(queue['jobs'])} pending job(s)")
+        for job in queue['jobs']:
+            deadline = f", due {job['deadline']:.0f}s" if job['deadline'] is not None else ""
+            print(f"   project {job['project_id']} scene {job['scene']}: priority {job['priority']}{deadline}")
+        return
+
+    health = _call('GET', f"{url}/health")
+    print(f"🛰️  {url}: ComfyUI {health['comfyui']} ({'up' if health['comfyui_ok'] else 'DOWN'}), "
+          f"{health['workers']} worker(s), {health['running']} running, {health['pending']} pending")
+    for project in _call('GET', f"{url}/projects")['projects']:
+        print(f"   {project['id']:>4}  {project['state']:<9} {project['done']}/{project['total']}  "
+              f"{project['name']} ({project['kind']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+doodly - single entry point for the whiteboard video pipeline
+Subcommands forward their arguments to the existing scripts, which are only
+imported once a subcommand is chosen, so `doodly --help` stays fast.
+
+Usage:
+    python scripts/doodly.py --help
+    python scripts/doodly.py sketch --prompt "a cat"
+    python scripts/doodly.py batch --file templates/youtube_sketch_prompts.txt --parallel 2
+    python scripts/doodly.py scenes
+    python scripts/doodly.py voice --file templates/youtube_ai_voice_generation.txt --open-source
+    python scripts/doodly.py assemble --timeline timeline.json --output final.mp4
+    python scripts/doodly.py serve-tts --port 8000
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# name -> (module, help); every module exposes main(), parsing sys.argv itself
+COMMANDS = {
+    'sketch': ('scripts.generate_sketch_image', 'Generate a single sketch image'),
+    'batch': ('scripts.batch_generate_sketches', 'Batch generate sketch images from a prompts file'),
+    'scenes': ('scripts.generate_complete_scenes', 'Generate images and voice chunks for every scene in the script'),
+    'voice': ('scripts.generate_openai_voiceover', 'Generate a voiceover from a text file'),
+    'assemble': ('scripts.assemble_video', 'Assemble clips/timeline and narration into the final video'),
+    'serve-tts': ('scripts.tts_api_server', 'Run the local OpenAI-compatible TTS server'),
+}
+
+
+def run_command(name, argv):
+    """Import the subcommand's module and run its main() with the remaining arguments"""
+    import importlib
+    import types
+
+    module_name = COMMANDS[name][0]
+    module = importlib.import_module(module_name)
+    sys.argv = [f"doodly {name}"] + list(argv)
+    result = module.main()
+    # generate_complete_scenes.main is a coroutine
+    if isinstance(result, types.CoroutineType):
+        import asyncio
+        result = asyncio.run(result)
+    return result
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='doodly',
+        description='AI whiteboard video pipeline',
+        epilog="Run 'doodly <command> --help' for the options of a command",
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='<command>')
+    for name, (_, help_text) in COMMANDS.items():
+        # Options are parsed by the command's own script
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    if not argv or argv[0] not in COMMANDS:
+        args = parser.parse_args(argv)
+        if args.command is None:
+            parser.print_help()
+            return 1
+    result = run_command(argv[0], argv[1:])
+    return result if isinstance(result, int) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Draft-then-final sketch generation
+Every scene is first drafted with the cheap draft preset (config draft.preset) for
+review; only approved scenes are re-rendered at final quality. The final render
+starts from the draft instead of from noise: the draft image is uploaded,
+VAE-encoded (latent-upscaled when the final resolution is larger) and re-sampled
+with the same seed at draft.refine_denoise, so it keeps the approved composition
+and costs a fraction of a from-scratch render.
+
+Usage:
+    python scripts/batch_generate_sketches.py --file prompts.txt --draft                  # drafts for review
+    python scripts/batch_generate_sketches.py --finalize output/survival/images/drafts/run_manifest.json --approve 1,3-5
+    python scripts/batch_generate_sketches.py --file prompts.txt --draft --auto-approve   # both passes
+    python scripts/draft_refine.py output/survival/images/drafts/run_manifest.json        # draft scores
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.generation_config import load_settings
+from scripts.batch_generate_sketches import (
+    SKETCH_NEGATIVE_PROMPT, build_sketch_prompt, build_sketch_workflow, generate_single_sketch
+)
+from scripts.hires_pipeline import refine_steps
+from scripts.run_manifest import MANIFEST_NAME, RunManifest
+from scripts.workflow_compiler import find_nodes, linked_node, load_object_info, set_inputs
+from scripts.workflow_validator import format_problems, load_model_inventory, preflight
+
+WHITE_LEVEL = 235  # grey level counted as background
+
+
+def draft_score(image_path) -> float:
+    """Fraction of near-white pixels: a clean line sketch is mostly background"""
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(image_path) as image:
+        grey = np.asarray(image.convert('L'))
+    return float((grey >= WHITE_LEVEL).mean())
+
+
+def auto_approve(manifest: RunManifest, white_range) -> list:
+    """Scenes whose draft looks like a usable sketch (background fraction within white_range)"""
+    low, high = white_range
+    approved = []
+    for scene, record in sorted(manifest.scenes.items(), key=lambda item: int(item[0])):
+        output = record.get('output')
+        if record.get('success') and output and os.path.exists(output) and low <= draft_score(output) <= high:
+            approved.append(int(scene))
+    return approved
+
+
+def upload_image(api_url, image_path, name) -> str:
+    """Upload a file to ComfyUI's input folder; returns the name LoadImage should use"""
+    from scripts.generate_clip import get_session
+    with open(image_path, 'rb') as f:
+        response = get_session().post(f"{api_url}/upload/image", files={'image': (name, f, 'image/png')},
+                                      data={'overwrite': 'true'}, timeout=60)
+    response.raise_for_status()
+    uploaded = response.json()
+    subfolder = uploaded.get('subfolder')
+    return f"{subfolder}/{uploaded['name']}" if subfolder else uploaded['name']
+
+
+def build_refine_workflow(workflow_path, image_name, prompt, negative_prompt, draft_resolution, resolution,
+                          steps, cfg_scale, seed, denoise, output_filename, object_info=None):
+    """
+    The sketch workflow with its empty latent replaced by the encoded draft
+
+    LoadImage -> VAEEncode [-> LatentUpscale] -> KSampler(denoise < 1), same seed,
+    running refine_steps(steps, denoise) steps.
+    """
+    workflow = build_sketch_workflow(workflow_path, prompt, negative_prompt, resolution, steps, cfg_scale, seed,
+                                     output_filename, object_info)
+    sampler_id = find_nodes(workflow, 'KSampler')[0]
+    latent_id = linked_node(workflow, sampler_id, 'latent_image')
+    vae = workflow[find_nodes(workflow, 'VAEDecode')[0]]['inputs']['vae']
+    del workflow[latent_id]
+
+    next_id = max(int(node_id) for node_id in workflow if node_id.isdigit()) + 1
+    load_id, encode_id = str(next_id), str(next_id + 1)
+    workflow[load_id] = {'class_type': 'LoadImage', 'inputs': {'image': image_name},
+                         '_meta': {'title': 'Load Draft'}}
+    workflow[encode_id] = {'class_type': 'VAEEncode', 'inputs': {'pixels': [load_id, 0], 'vae': vae},
+                           '_meta': {'title': 'Encode Draft'}}
+    latent = [encode_id, 0]
+    if tuple(draft_resolution) != tuple(resolution):
+        upscale_id = str(next_id + 2)
+        workflow[upscale_id] = {'class_type': 'LatentUpscale',
+                                'inputs': {'samples': latent, 'upscale_method': 'bislerp',
+                                           'width': resolution[0], 'height': resolution[1], 'crop': 'disabled'},
+                                '_meta': {'title': 'Upscale Draft'}}
+        latent = [upscale_id, 0]
+    set_inputs(workflow, sampler_id, latent_image=latent, denoise=denoise, steps=refine_steps(steps, denoise))
+    return workflow
+
+
+def gpu_seconds(record) -> float:
+    """GPU time of one job: ComfyUI's execution span, or the whole wait when that is unknown"""
+    timings = record.get('timings') or {}
+    return timings.get('execution', timings.get('wait', 0.0))
+
+
+def gpu_time_report(draft_manifest: RunManifest, final_records: list, resolution, steps) -> dict:
+    """
+    GPU time of draft + refine versus rendering every scene from scratch at final quality
+
+    The from-scratch cost is estimated from the measured draft time, scaled by
+    sampling steps x pixels (both linear in sampler cost).
+    """
+    settings = draft_manifest.settings
+    drafts = [record for record in draft_manifest.scenes.values()
+              if record.get('success') and 'reused_from' not in record]
+    draft_time = sum(gpu_seconds(record) for record in drafts)
+    final_time = sum(gpu_seconds(record) for record in final_records if record.get('success'))
+    draft_pixels = settings['resolution'][0] * settings['resolution'][1]
+    scale = (steps * resolution[0] * resolution[1]) / (settings['steps'] * draft_pixels)
+    per_scene = draft_time / len(drafts) if drafts else 0.0
+    full_time = per_scene * scale * len(draft_manifest.scenes)
+    used = draft_time + final_time
+    return {
+        'draft_seconds': round(draft_time, 2),
+        'final_seconds': round(final_time, 2),
+        'full_quality_estimate_seconds': round(full_time, 2),
+        'saved_seconds': round(full_time - used, 2),
+        'saved_fraction': round(1 - used / full_time, 3) if full_time else 0.0,
+    }
+
+
+def finalize(draft_manifest: RunManifest, scenes, output_dir, resolution, steps, cfg_scale, denoise,
+             parallel=1, api_url=None, preflight_check=True):
+    """
+    Re-render the given draft scenes at final quality from their drafts
+
+    Returns (name, success, output_path, error) tuples like batch_generate_sketches.
+    """
+    if api_url is None:
+        api_url = load_settings().comfyui.url
+    settings = draft_manifest.settings
+    draft_resolution = tuple(settings['resolution'])
+    style = settings.get('style', 'sketch')
+    workflow_path = project_root / "workflows" / "basic_image.json"
+    object_info = load_object_info(api_url)
+
+    jobs = []
+    for scene in scenes:
+        record = draft_manifest.get(scene)
+        if record is None or not record.get('success') or not os.path.exists(record.get('output') or ''):
+            print(f"⚠️  Scene {scene}: no successful draft, skipped")
+            continue
+        jobs.append((scene, record))
+    if not jobs:
+        print("❌ No approved scenes with a draft to finalize")
+        return []
+
+    def upload_name(record):
+        # Content-addressed, so re-finalizing the same draft overwrites rather than piles up
+        return f"draft_{record.get('sha256', '')[:16] or record['seed']}.png"
+
+    def builder(image_name):
+        def build(prompt, negative_prompt, output_filename, seed):
+            return build_refine_workflow(workflow_path, image_name, prompt, negative_prompt, draft_resolution,
+                                         resolution, steps, cfg_scale, seed, denoise, output_filename, object_info)
+        return build
+
+    if preflight_check:
+        models = load_model_inventory(api_url, install_path=load_settings().comfyui.install_path)
+        problems = preflight(((f"scene {scene}", builder(upload_name(record))(
+            build_sketch_prompt(record['prompt'], style), SKETCH_NEGATIVE_PROMPT, f"scene-{scene}", record['seed']))
+            for scene, record in jobs), object_info, models)
+        if problems:
+            print(f"❌ {format_problems(problems)}")
+            print("   Nothing was submitted")
+            return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = RunManifest(Path(output_dir) / MANIFEST_NAME, settings={
+        'prompts_file': settings.get('prompts_file'), 'output_dir': str(output_dir), 'resolution': list(resolution),
+        'steps': steps, 'cfg_scale': cfg_scale, 'seed': settings.get('seed'), 'style': style,
+        'draft_manifest': str(draft_manifest.path), 'refine_denoise': denoise,
+        'refine_steps': refine_steps(steps, denoise),
+    })
+    print(f"🎯 Finalizing {len(jobs)}/{len(draft_manifest.scenes)} scene(s) from drafts: "
+          f"{resolution[0]}x{resolution[1]}, {refine_steps(steps, denoise)} of {steps} steps "
+          f"(denoise {denoise}), CFG {cfg_scale}")
+
+    def run(scene, record):
+        image_name = upload_image(api_url, record['output'], upload_name(record))
+        info = {}
+        result = generate_single_sketch(record['name'], record['prompt'], api_url, workflow_path, output_dir,
+                                        resolution, steps, cfg_scale, record['seed'], style, scene,
+                                        run_info=info, workflow_builder=builder(image_name))
+        return result, info
+
+    results = []
+    final_records = []
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+        futures = {executor.submit(run, scene, record): (scene, record) for scene, record in jobs}
+        for future in as_completed(futures):
+            scene, record = futures[future]
+            try:
+                result, info = future.result()
+            except Exception as e:
+                result, info = (record['name'], False, None, str(e)), {}
+            name, success, path, error = result
+            print(f"{'✅' if success else '❌'} Scene {scene}: {name}" + (f"\n   Error: {error}" if error else ""))
+            final_record = {'name': name, 'prompt': record['prompt'], 'seed': record['seed'], **info,
+                            'success': success, 'output': path, 'error': error, 'draft': record['output']}
+            manifest.record(scene, **final_record)
+            final_records.append(final_record)
+            results.append(result)
+    manifest.save()
+
+    report = gpu_time_report(draft_manifest, final_records, resolution, steps)
+    print("=" * 60)
+    print(f"✅ Finalized: {sum(1 for r in results if r[1])}/{len(results)} in {time.time() - start_time:.1f}s")
+    print(f"⏱️  GPU time: drafts {report['draft_seconds']:.1f}s + finals {report['final_seconds']:.1f}s "
+          f"vs ~{report['full_quality_estimate_seconds']:.1f}s rendering all {len(draft_manifest.scenes)} "
+          f"at final quality")
+    print(f"💰 Saved ~{report['saved_seconds']:.1f}s GPU time ({report['saved_fraction']:.0%})")
+    print(f"📋 Run manifest: {manifest.path}")
+    print("=" * 60)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score the drafts of a --draft run')
+    parser.add_argument('manifest', help='Draft run manifest (<output>/drafts/run_manifest.json)')
+
+    args = parser.parse_args()
+
+    try:
+        manifest = RunManifest.load(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    low, high = load_settings().draft.auto_approve_white
+    approved = auto_approve(manifest, (low, high))
+    print(f"📋 {args.manifest}: {len(manifest.scenes)} draft(s), background {low:.0%}-{high:.0%} approves")
+    for scene, record in sorted(manifest.scenes.items(), key=lambda item: int(item[0])):
+        output = record.get('output')
+        if not record.get('success') or not output or not os.path.exists(output):
+            print(f"   {scene:>4}  ❌ no draft")
+            continue
+        mark = '✅' if int(scene) in approved else '  '
+        print(f"   {scene:>4}  {mark} {draft_score(output):.1%} background  {record.get('name', '')}")
+    if approved:
+        print(f"   --approve {','.join(str(n) for n in approved)}")
+    else:
+        print("   No draft would be auto-approved")
+
+
+if __name__ == '__main__':
+    main()
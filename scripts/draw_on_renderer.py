@@ -0,0 +1,700 @@
+#!/usr/bin/env python3
+"""
+Render a Doodly-style "draw-on" clip from a generated sketch image
+Strokes are revealed in drawing order while a hand/pen sprite follows the stroke tip
+
+Usage:
+    python scripts/draw_on_renderer.py --image output/survival/images/scene-1.png --output scene-1.mp4
+    python scripts/draw_on_renderer.py --image scene-1.png --output scene-1.mp4 --duration 6 --hand assets/hand.png
+    python scripts/draw_on_renderer.py --benchmark
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# 8-neighbourhood, 4-connected offsets first so strokes follow straight runs
+NEIGHBOR_OFFSETS = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+# Rotations (degrees, counter-clockwise) precomputed for every hand sprite
+DEFAULT_HAND_ANGLES = (-30, -15, 0, 15, 30)
+
+# Cache of precomputed sprite variants, keyed by (source, height, angles)
+_SPRITE_CACHE: Dict[tuple, "HandSprite"] = {}
+
+# Bump when the stroke extraction changes so stale .npz plans are ignored
+STROKE_CACHE_VERSION = 1
+
+
+def load_sketch(image_path, resolution=None) -> np.ndarray:
+    """Load a sketch image as an RGB uint8 array, optionally resized to (width, height)"""
+    image = Image.open(image_path).convert('RGB')
+    if resolution is not None and tuple(resolution) != image.size:
+        image = image.resize(tuple(resolution), Image.LANCZOS)
+    return np.asarray(image, dtype=np.uint8)
+
+
+def binarize(sketch: np.ndarray, threshold: int = 160) -> np.ndarray:
+    """Return a boolean ink mask (dark lines on a light background)"""
+    gray = sketch.astype(np.uint16).sum(axis=2) // 3
+    return gray < threshold
+
+
+def thin(mask: np.ndarray) -> np.ndarray:
+    """Zhang-Suen thinning of a boolean mask down to 1px wide skeleton lines"""
+    img = np.pad(mask.astype(np.uint8), 1)
+    while True:
+        changed = False
+        for step in (0, 1):
+            p1 = img[1:-1, 1:-1]
+            p2, p3, p4 = img[:-2, 1:-1], img[:-2, 2:], img[1:-1, 2:]
+            p5, p6, p7 = img[2:, 2:], img[2:, 1:-1], img[2:, :-2]
+            p8, p9 = img[1:-1, :-2], img[:-2, :-2]
+            ring = [p2, p3, p4, p5, p6, p7, p8, p9, p2]
+
+            neighbors = sum(p.astype(np.uint8) for p in ring[:-1])
+            transitions = sum(((ring[i] == 0) & (ring[i + 1] == 1)).astype(np.uint8) for i in range(8))
+            if step == 0:
+                cond = ((p2 * p4 * p6) == 0) & ((p4 * p6 * p8) == 0)
+            else:
+                cond = ((p2 * p4 * p8) == 0) & ((p2 * p6 * p8) == 0)
+
+            remove = (p1 == 1) & (neighbors >= 2) & (neighbors <= 6) & (transitions == 1) & cond
+            if remove.any():
+                p1[remove] = 0
+                changed = True
+        if not changed:
+            break
+    return img[1:-1, 1:-1].astype(bool)
+
+
+def trace_strokes(skeleton: np.ndarray) -> List[np.ndarray]:
+    """Walk a skeleton into polyline strokes of (x, y) points, starting from line ends"""
+    h, w = skeleton.shape
+    remaining = skeleton.copy()
+
+    padded = np.pad(skeleton.astype(np.uint8), 1)
+    degree = sum(
+        padded[1 + dy:h + 1 + dy, 1 + dx:w + 1 + dx] for dy, dx in NEIGHBOR_OFFSETS
+    )
+    endpoints = np.argwhere(skeleton & (degree == 1))
+    others = np.argwhere(skeleton & (degree != 1))
+
+    strokes = []
+    for y, x in np.concatenate([endpoints, others]):
+        if not remaining[y, x]:
+            continue
+        remaining[y, x] = False
+        points = [(x, y)]
+        cy, cx = y, x
+        while True:
+            for dy, dx in NEIGHBOR_OFFSETS:
+                ny, nx = cy + dy, cx + dx
+                if 0 <= ny < h and 0 <= nx < w and remaining[ny, nx]:
+                    break
+            else:
+                break
+            remaining[ny, nx] = False
+            points.append((nx, ny))
+            cy, cx = ny, nx
+        strokes.append(np.array(points, dtype=np.int32))
+    return strokes
+
+
+def order_strokes(strokes: List[np.ndarray]) -> List[np.ndarray]:
+    """Greedy nearest-neighbour ordering from the top-left, reversing strokes when closer"""
+    if not strokes:
+        return []
+    starts = np.array([s[0] for s in strokes], dtype=np.float64)
+    ends = np.array([s[-1] for s in strokes], dtype=np.float64)
+    used = np.zeros(len(strokes), dtype=bool)
+    cursor = np.zeros(2)
+
+    ordered = []
+    for _ in range(len(strokes)):
+        d_start = ((starts - cursor) ** 2).sum(axis=1)
+        d_end = ((ends - cursor) ** 2).sum(axis=1)
+        d_start[used] = np.inf
+        d_end[used] = np.inf
+        i_start = int(np.argmin(d_start))
+        i_end = int(np.argmin(d_end))
+        if d_start[i_start] <= d_end[i_end]:
+            stroke = strokes[i_start]
+            used[i_start] = True
+        else:
+            stroke = strokes[i_end][::-1]
+            used[i_end] = True
+        ordered.append(stroke)
+        cursor = stroke[-1].astype(np.float64)
+    return ordered
+
+
+def extract_stroke_plan(sketch: np.ndarray, threshold: int = 160) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Binarize, skeletonize and order the strokes of a sketch
+
+    Returns:
+        (points, offsets): all stroke points as an (N, 2) array of (x, y) in drawing
+        order, and the start index of every stroke within points
+    """
+    ink = binarize(sketch, threshold)
+    strokes = order_strokes(trace_strokes(thin(ink)))
+    if not strokes:
+        return np.zeros((0, 2), dtype=np.int32), np.zeros(0, dtype=np.int64)
+    offsets = np.cumsum([0] + [len(s) for s in strokes[:-1]]).astype(np.int64)
+    return np.concatenate(strokes).astype(np.int32), offsets
+
+
+def file_sha256(path, chunk_size: int = 1 << 20) -> str:
+    """Hex SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stroke_cache_path(image_path, cache_dir=None, threshold: int = 160) -> Path:
+    """Cache file for an image's stroke plan, keyed by its content hash"""
+    cache_dir = Path(cache_dir) if cache_dir else Path(image_path).parent / '.stroke_cache'
+    return cache_dir / f"{file_sha256(image_path)}_t{threshold}.npz"
+
+
+def save_stroke_plan(cache_path: Path, points: np.ndarray, offsets: np.ndarray, shape) -> bool:
+    """Persist a stroke plan as a compact .npz (int16 points plus stroke order index)"""
+    if len(points) and points.max() > np.iinfo(np.int16).max:
+        return False
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # A unique temp file per writer: renders of the same image may save concurrently
+    with tempfile.NamedTemporaryFile(dir=cache_path.parent, prefix=cache_path.stem, suffix='.tmp',
+                                     delete=False) as f:
+        try:
+            np.savez_compressed(
+                f,
+                version=np.int32(STROKE_CACHE_VERSION),
+                shape=np.array(shape[:2], dtype=np.int32),
+                points=points.astype(np.int16),
+                order=offsets.astype(np.int32),
+            )
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, cache_path)
+    return True
+
+
+def load_stroke_plan(cache_path: Path) -> Optional[Tuple[np.ndarray, np.ndarray, Tuple[int, int]]]:
+    """Load a cached stroke plan; returns None if missing, unreadable or stale"""
+    try:
+        with np.load(cache_path) as data:
+            if int(data['version']) != STROKE_CACHE_VERSION:
+                return None
+            shape = tuple(int(v) for v in data['shape'])
+            return data['points'].astype(np.int32), data['order'].astype(np.int64), shape
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def get_stroke_plan(image_path, sketch: np.ndarray, threshold: int = 160, cache_dir=None,
+                    use_cache: bool = True) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Return the stroke plan for a sketch at its native resolution, using the .npz cache
+
+    Returns:
+        (points, offsets, cached): cached is True when extraction was skipped
+    """
+    cache_path = stroke_cache_path(image_path, cache_dir, threshold) if use_cache else None
+    if cache_path is not None:
+        plan = load_stroke_plan(cache_path)
+        if plan is not None and plan[2] == sketch.shape[:2]:
+            return plan[0], plan[1], True
+
+    points, offsets = extract_stroke_plan(sketch, threshold)
+    if cache_path is not None:
+        save_stroke_plan(cache_path, points, offsets, sketch.shape)
+    return points, offsets, False
+
+
+def scale_stroke_points(points: np.ndarray, source_shape, target_shape) -> np.ndarray:
+    """Map stroke points from one (height, width) to another"""
+    if tuple(source_shape[:2]) == tuple(target_shape[:2]) or not len(points):
+        return points
+    sy = target_shape[0] / source_shape[0]
+    sx = target_shape[1] / source_shape[1]
+    scaled = np.empty_like(points)
+    scaled[:, 0] = np.clip(np.round((points[:, 0] + 0.5) * sx - 0.5), 0, target_shape[1] - 1)
+    scaled[:, 1] = np.clip(np.round((points[:, 1] + 0.5) * sy - 0.5), 0, target_shape[0] - 1)
+    return scaled
+
+
+def build_reveal_order(ink: np.ndarray, points: np.ndarray, radius: int = 6) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Assign every ink pixel the drawing index of the nearest skeleton point
+
+    Returns:
+        (pixel_index, pixel_rank): flat pixel indices sorted by reveal rank, and the ranks
+    """
+    h, w = ink.shape
+    total = len(points)
+    rank = np.full((h, w), np.inf, dtype=np.float32)
+    if total:
+        rank[points[:, 1], points[:, 0]] = np.arange(total, dtype=np.float32)
+
+    # Grow ranks outwards through the ink with a 3x3 min filter
+    for _ in range(radius):
+        padded = np.pad(rank, 1, constant_values=np.inf)
+        grown = rank.copy()
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                np.minimum(grown, padded[1 + dy:h + 1 + dy, 1 + dx:w + 1 + dx], out=grown)
+        rank = np.where(ink, grown, np.inf).astype(np.float32)
+
+    # Ink that no stroke reached appears with the final stroke point
+    rank[ink & np.isinf(rank)] = total
+
+    flat = rank.ravel()
+    pixel_index = np.flatnonzero(ink.ravel())
+    order = np.argsort(flat[pixel_index], kind='stable')
+    pixel_index = pixel_index[order]
+    return pixel_index, flat[pixel_index]
+
+
+def create_default_hand(height: int = 160) -> Tuple[Image.Image, Tuple[float, float]]:
+    """Draw a simple pen-in-hand sprite; returns (RGBA image, pen tip position)"""
+    scale = height / 160.0
+    w, h = int(round(120 * scale)), int(round(160 * scale))
+    sprite = Image.new('RGBA', (w, h), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sprite)
+
+    def pt(x, y):
+        return (x * scale, y * scale)
+
+    # Pen body from the tip (bottom-left) up to the hand
+    draw.polygon([pt(4, 156), pt(14, 134), pt(70, 40), pt(84, 50), pt(26, 144)], fill=(40, 40, 40, 255))
+    draw.polygon([pt(4, 156), pt(10, 144), pt(18, 150)], fill=(10, 10, 10, 255))
+    # Hand holding the pen
+    draw.ellipse([pt(54, 18), pt(118, 92)], fill=(236, 200, 170, 255), outline=(150, 110, 90, 255))
+    draw.ellipse([pt(44, 50), pt(78, 78)], fill=(236, 200, 170, 255), outline=(150, 110, 90, 255))
+    return sprite, (4 * scale, 156 * scale)
+
+
+class HandSprite:
+    """Premultiplied-alpha hand/pen sprite variants at a fixed set of rotations"""
+
+    def __init__(self, image: Image.Image, tip: Tuple[float, float], angles=DEFAULT_HAND_ANGLES):
+        self.angles = np.array(angles, dtype=np.float32)
+        self._angle_list = [float(angle) for angle in self.angles]
+        self._max_tilt = max(abs(angle) for angle in self._angle_list)
+        self._upright = int(np.argmin(np.abs(self.angles)))
+        self.variants = []
+        image = image.convert('RGBA')
+        cx, cy = image.width / 2.0, image.height / 2.0
+        for angle in angles:
+            rotated = image.rotate(angle, resample=Image.BICUBIC, expand=True)
+            theta = math.radians(angle)
+            vx, vy = tip[0] - cx, tip[1] - cy
+            tx = vx * math.cos(theta) + vy * math.sin(theta) + rotated.width / 2.0
+            ty = -vx * math.sin(theta) + vy * math.cos(theta) + rotated.height / 2.0
+
+            # Crop to the visible pixels so blending never touches empty corners
+            left, top, right, bottom = rotated.getbbox() or (0, 0, 1, 1)
+            rgba = np.asarray(rotated.crop((left, top, right, bottom)), dtype=np.uint16)
+            alpha = rgba[:, :, 3:4]
+            # out = (frame * (256 - a') + rgb * a') >> 8, with a' in [0, 256]
+            weight = (alpha * 256 + 127) // 255
+            # Full 3-channel planes: same-dtype, same-shape arithmetic with no broadcasting
+            premultiplied = rgba[:, :, :3] * weight
+            inverse = np.ascontiguousarray(np.broadcast_to(256 - weight, premultiplied.shape))
+
+            self.variants.append({
+                'premultiplied': premultiplied,
+                'inverse': inverse,
+                'tip': (int(round(tx)) - left, int(round(ty)) - top),
+            })
+
+    def pick(self, direction: Optional[np.ndarray]) -> int:
+        """Choose the rotation variant that tilts the hand along the stroke direction"""
+        # Plain floats: this runs once per frame and numpy call overhead would dominate
+        if direction is None:
+            return self._upright
+        dx, dy = float(direction[0]), float(direction[1])
+        norm = math.hypot(dx, dy)
+        if norm == 0:
+            return self._upright
+        tilt = -dx / norm * self._max_tilt
+        return min(range(len(self._angle_list)), key=lambda i: abs(self._angle_list[i] - tilt))
+
+
+def get_hand_sprite(hand_path=None, height: int = 160, tip=None, angles=DEFAULT_HAND_ANGLES) -> HandSprite:
+    """Load (or draw) a hand sprite and precompute its variants once per process"""
+    key = (str(hand_path) if hand_path else 'default', height, tuple(tip) if tip else None, tuple(angles))
+    sprite = _SPRITE_CACHE.get(key)
+    if sprite is not None:
+        return sprite
+
+    if hand_path:
+        image = Image.open(hand_path).convert('RGBA')
+        scale = height / image.height
+        source_tip = tip if tip else (0, image.height - 1)
+        image = image.resize((max(1, int(round(image.width * scale))), height), Image.LANCZOS)
+        tip_xy = (source_tip[0] * scale, source_tip[1] * scale)
+    else:
+        image, tip_xy = create_default_hand(height)
+
+    sprite = HandSprite(image, tip_xy, angles)
+    _SPRITE_CACHE[key] = sprite
+    return sprite
+
+
+class HandOverlay:
+    """Composite a hand sprite onto frames, touching only the sprite's bounding box"""
+
+    def __init__(self, sprite: HandSprite):
+        self.sprite = sprite
+        self._saved = None
+        self._buffers: Dict[Tuple[int, ...], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _buffers_for(self, shape) -> Tuple[np.ndarray, np.ndarray]:
+        """(saved uint8, blend uint16) scratch planes, reused for whole-sprite regions"""
+        buffers = self._buffers.get(shape)
+        if buffers is None:
+            buffers = (np.empty(shape, dtype=np.uint8), np.empty(shape, dtype=np.uint16))
+            self._buffers[shape] = buffers
+        return buffers
+
+    def composite(self, frame: np.ndarray, tip: Tuple[int, int], direction: Optional[np.ndarray] = None):
+        """Blend the sprite into frame in place with its pen tip at (x, y)"""
+        variant = self.sprite.variants[self.sprite.pick(direction)]
+        inverse, premultiplied = variant['inverse'], variant['premultiplied']
+        sh, sw = inverse.shape[:2]
+        fh, fw = frame.shape[:2]
+        x0, y0 = tip[0] - variant['tip'][0], tip[1] - variant['tip'][1]
+
+        # Clip the sprite's bounding box to the frame
+        fx0, fy0 = max(x0, 0), max(y0, 0)
+        fx1, fy1 = min(x0 + sw, fw), min(y0 + sh, fh)
+        if fx0 >= fx1 or fy0 >= fy1:
+            self._saved = None
+            return
+        region = frame[fy0:fy1, fx0:fx1]
+        if region.shape != inverse.shape:
+            sx0, sy0 = fx0 - x0, fy0 - y0
+            inverse = inverse[sy0:sy0 + region.shape[0], sx0:sx0 + region.shape[1]]
+            premultiplied = premultiplied[sy0:sy0 + region.shape[0], sx0:sx0 + region.shape[1]]
+            saved, blend = np.empty_like(region), np.empty(region.shape, dtype=np.uint16)
+        else:
+            saved, blend = self._buffers_for(region.shape)
+
+        # out = (frame * (256 - a') + rgb * a') >> 8, integer-only and in preallocated buffers
+        np.copyto(saved, region)
+        np.copyto(blend, region)
+        blend *= inverse
+        blend += premultiplied
+        blend >>= 8
+        np.copyto(region, blend, casting='unsafe')
+        self._saved = ((fy0, fx0), saved)
+
+    def restore(self, frame: np.ndarray):
+        """Undo the last composite so the frame can be reused as the drawing canvas"""
+        if self._saved is None:
+            return
+        (y0, x0), saved = self._saved
+        frame[y0:y0 + saved.shape[0], x0:x0 + saved.shape[1]] = saved
+        self._saved = None
+
+
+def iter_draw_on_frames(sketch: np.ndarray, points: np.ndarray, fps: int = 24, duration: float = 4.0,
+                        hold: float = 1.0, overlay: Optional[HandOverlay] = None,
+                        threshold: int = 160, radius: int = 6) -> Iterator[np.ndarray]:
+    """
+    Yield RGB frames revealing the sketch along its stroke points
+
+    The same buffer is yielded every time; consume (or copy) it before advancing.
+    """
+    h, w = sketch.shape[:2]
+    ink = binarize(sketch, threshold)
+    pixel_index, pixel_rank = build_reveal_order(ink, points, radius)
+
+    total_frames = max(1, int(round(duration * fps)))
+    hold_frames = min(total_frames - 1, int(round(hold * fps)))
+    draw_frames = total_frames - hold_frames
+    total_points = len(points)
+
+    canvas = np.full((h, w, 3), 255, dtype=np.uint8)
+    canvas_flat = canvas.reshape(-1, 3)
+    sketch_flat = sketch.reshape(-1, 3)
+    revealed = 0
+
+    for frame_num in range(draw_frames):
+        drawn = int(math.ceil(total_points * (frame_num + 1) / draw_frames))
+        count = int(np.searchsorted(pixel_rank, drawn, side='left'))
+        if frame_num == draw_frames - 1:
+            count = len(pixel_index)
+        if count > revealed:
+            new = pixel_index[revealed:count]
+            canvas_flat[new] = sketch_flat[new]
+            revealed = count
+
+        if overlay is not None and 0 < drawn <= total_points and frame_num < draw_frames - 1:
+            tip_index = drawn - 1
+            tip = points[tip_index]
+            direction = tip - points[max(0, tip_index - 8)]
+            overlay.composite(canvas, (int(tip[0]), int(tip[1])), direction)
+            yield canvas
+            overlay.restore(canvas)
+        else:
+            yield canvas
+
+    # Hold on the finished drawing (exact original pixels, anti-aliasing included)
+    np.copyto(canvas, sketch)
+    for _ in range(hold_frames):
+        yield canvas
+
+
+def open_ffmpeg_writer(output_path, width: int, height: int, fps: int = 24) -> subprocess.Popen:
+    """Start ffmpeg reading raw RGB frames from stdin"""
+    cmd = [
+        'ffmpeg',
+        '-f', 'rawvideo',
+        '-pix_fmt', 'rgb24',
+        '-s', f'{width}x{height}',
+        '-r', str(fps),
+        '-i', '-',
+        '-c:v', 'libx264',
+        '-pix_fmt', 'yuv420p',
+        '-y',
+        str(output_path)
+    ]
+    return subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def render_draw_on(image_path, output_path, duration=4.0, fps=24, hold=1.0, resolution=None,
+                   hand=True, hand_path=None, hand_height=None, cache_dir=None, use_cache=True,
+                   vector_dir=None):
+    """
+    Render a draw-on clip for a sketch image
+
+    Args:
+        image_path: Sketch PNG (dark lines on white)
+        output_path: Output MP4 path
+        duration: Total clip length in seconds (including hold)
+        fps: Frame rate
+        hold: Seconds to hold the finished drawing at the end
+        resolution: Optional (width, height) to render at
+        hand: Draw a hand/pen sprite at the stroke tip
+        hand_path: Optional RGBA hand PNG (pen tip at its bottom-left corner)
+        hand_height: Sprite height in pixels (default 20% of frame height)
+        cache_dir: Stroke plan cache directory (default: .stroke_cache next to the image)
+        use_cache: Reuse/persist the stroke plan keyed by the image's content hash
+        vector_dir: Traced vector paths directory (see trace_sketch_svg.py); when a current
+            path cache exists, other resolutions are rasterized from it instead of resampled
+    """
+    native = load_sketch(image_path)
+    points, offsets, cached = get_stroke_plan(image_path, native, cache_dir=cache_dir, use_cache=use_cache)
+    source = 'cached' if cached else 'extracted'
+    print(f"✏️  Stroke plan for {Path(image_path).name} ({source}): {len(offsets)} strokes, {len(points)} points")
+
+    sketch = native
+    if resolution is not None and tuple(resolution) != (native.shape[1], native.shape[0]):
+        from scripts.trace_sketch_svg import load_vector_paths, rasterize_paths
+        paths = load_vector_paths(image_path, vector_dir)
+        if paths is not None:
+            print(f"   Rasterizing vector paths at {resolution[0]}x{resolution[1]}")
+            sketch = rasterize_paths(paths, tuple(resolution))
+        else:
+            sketch = np.asarray(Image.fromarray(native).resize(tuple(resolution), Image.LANCZOS), dtype=np.uint8)
+    # yuv420p needs even dimensions
+    h, w = sketch.shape[0] & ~1, sketch.shape[1] & ~1
+    sketch = np.ascontiguousarray(sketch[:h, :w])
+
+    # The plan is stored at native resolution; widen the reveal radius when upscaling
+    points = scale_stroke_points(points, native.shape, sketch.shape)
+    scale = max(h / native.shape[0], w / native.shape[1])
+    radius = max(6, int(math.ceil(6 * scale)))
+
+    overlay = None
+    if hand:
+        sprite = get_hand_sprite(hand_path, hand_height or max(32, h // 5))
+        overlay = HandOverlay(sprite)
+
+    try:
+        writer = open_ffmpeg_writer(output_path, w, h, fps)
+    except FileNotFoundError:
+        print("❌ Error: ffmpeg not found!")
+        print("   Install with: brew install ffmpeg")
+        return False
+
+    try:
+        for frame in iter_draw_on_frames(sketch, points, fps, duration, hold, overlay, radius=radius):
+            writer.stdin.write(frame.tobytes())
+    except BrokenPipeError:
+        pass
+    finally:
+        writer.stdin.close()
+        writer.wait()
+
+    if writer.returncode != 0:
+        print(f"❌ ffmpeg failed with exit code {writer.returncode}")
+        return False
+
+    print(f"✅ Saved: {output_path}")
+    return True
+
+
+def create_test_sketch(resolution=(1024, 768), strokes=40, seed=0) -> np.ndarray:
+    """Draw a random line sketch for benchmarking"""
+    rng = np.random.default_rng(seed)
+    image = Image.new('RGB', resolution, (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    for _ in range(strokes):
+        pts = [tuple(int(v) for v in rng.integers(0, resolution)) for _ in range(4)]
+        draw.line(pts, fill=(0, 0, 0), width=4, joint='curve')
+    return np.asarray(image, dtype=np.uint8)
+
+
+class _TipRecorder:
+    """Stands in for HandOverlay to record where iter_draw_on_frames places the hand"""
+
+    def __init__(self):
+        self.calls = []
+
+    def composite(self, frame, tip, direction=None):
+        self.calls.append((tip, direction))
+
+    def restore(self, frame):
+        pass
+
+
+def benchmark_overlay(image_path=None, resolution=(1024, 768), fps=24, duration=4.0, budget=0.10, repeats=7):
+    """
+    Compare the hand overlay's per-frame cost with the per-frame render time
+
+    The base is a whole clip rendered without the hand, divided by its frame
+    count (reveal setup included, frame serialisation excluded). The overlay cost
+    is composite + restore replayed at the clip's own tip positions, timed on
+    their own. Each is the best of `repeats` runs, so load spikes on the host do
+    not change the result.
+
+    Returns:
+        True if the overlay adds less than `budget` (fraction) to the per-frame time
+    """
+    sketch = load_sketch(image_path, resolution) if image_path else create_test_sketch(resolution)
+    points, _ = extract_stroke_plan(sketch)
+    overlay = HandOverlay(get_hand_sprite(None, max(32, sketch.shape[0] // 5)))
+    recorder = _TipRecorder()
+    frames = sum(1 for _ in iter_draw_on_frames(sketch, points, fps, duration, 0.0, recorder))
+
+    def render():
+        start = time.perf_counter()
+        for _ in iter_draw_on_frames(sketch, points, fps, duration, 0.0):
+            pass
+        return time.perf_counter() - start
+
+    def reveal_setup():
+        start = time.perf_counter()
+        build_reveal_order(binarize(sketch), points)
+        return time.perf_counter() - start
+
+    canvas = sketch.copy()
+
+    def composite():
+        start = time.perf_counter()
+        for tip, direction in recorder.calls:
+            overlay.composite(canvas, tip, direction)
+            overlay.restore(canvas)
+        return time.perf_counter() - start
+
+    composite()  # warm up the sprite buffers
+    base = min(render() for _ in range(repeats)) / frames
+    setup = min(reveal_setup() for _ in range(repeats))
+    hand = min(composite() for _ in range(repeats)) / frames
+    overhead = hand / base
+
+    print(f"📊 Draw-on render ({sketch.shape[1]}x{sketch.shape[0]}, {len(points)} stroke points, {frames} frames)")
+    print(f"   Frame render: {base * 1e6:.0f} µs/frame (incl. {setup * 1000:.1f} ms reveal setup per clip)")
+    print(f"   Hand overlay: {hand * 1e6:.0f} µs/frame ({len(recorder.calls)} composites)")
+    print(f"   Overhead:     {overhead * 100:.1f}% (budget {budget * 100:.0f}%, best of {repeats})")
+    passed = overhead < budget
+    print("✅ Within budget" if passed else "❌ Over budget")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Render a draw-on clip with a hand/pen overlay from a sketch image',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 4 second draw-on with the built-in pen sprite
+  python scripts/draw_on_renderer.py --image output/survival/images/scene-1.png --output scene-1.mp4
+
+  # Custom hand sprite, no hold at the end
+  python scripts/draw_on_renderer.py --image scene-1.png --output scene-1.mp4 --hand hand.png --hold 0
+
+  # Check the hand overlay stays under 10% of per-frame render time
+  python scripts/draw_on_renderer.py --benchmark
+        """
+    )
+    parser.add_argument('--image', help='Sketch image path')
+    parser.add_argument('--output', help='Output MP4 path')
+    parser.add_argument('--duration', type=float, default=4.0, help='Clip duration in seconds')
+    parser.add_argument('--fps', type=int, default=24, help='Frame rate')
+    parser.add_argument('--hold', type=float, default=1.0, help='Seconds to hold the finished drawing')
+    parser.add_argument('--resolution', default=None, help='Render resolution (WxH), default: image size')
+    parser.add_argument('--hand', default=None, help='Hand sprite PNG with alpha (pen tip at bottom-left)')
+    parser.add_argument('--hand-height', type=int, default=None, help='Hand sprite height in pixels')
+    parser.add_argument('--no-hand', action='store_true', help='Disable the hand overlay')
+    parser.add_argument('--cache-dir', default=None, help='Stroke plan cache directory (default: next to the image)')
+    parser.add_argument('--no-cache', action='store_true', help='Always re-extract the stroke plan')
+    parser.add_argument('--vector-dir', default=None,
+                       help='Traced vector paths directory (default: <image dir>/vector)')
+    parser.add_argument('--benchmark', action='store_true', help='Benchmark hand overlay cost and exit')
+
+    args = parser.parse_args()
+
+    resolution = tuple(map(int, args.resolution.split('x'))) if args.resolution else None
+
+    if args.benchmark:
+        passed = benchmark_overlay(args.image, resolution or (1024, 768), args.fps, args.duration)
+        sys.exit(0 if passed else 1)
+
+    if not args.image or not args.output:
+        print("Error: --image and --output are required")
+        sys.exit(1)
+
+    success = render_draw_on(
+        args.image,
+        args.output,
+        duration=args.duration,
+        fps=args.fps,
+        hold=args.hold,
+        resolution=resolution,
+        hand=not args.no_hand,
+        hand_path=args.hand,
+        hand_height=args.hand_height,
+        cache_dir=args.cache_dir,
+        use_cache=not args.no_cache,
+        vector_dir=args.vector_dir
+    )
+
+    if not success:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,29 +1,65 @@
 #!/usr/bin/env python3
 """
 Generate a single animated clip using ComfyUI API
+Clips longer than one segment window (generation.animatediff.segment_frames) are
+generated as overlapping windows, in parallel across --backends, and
+cross-dissolved into one clip. Each window is sampled independently (its own
+seed, no conditioning on the previous window), so the overlaps hide the seams
+but motion does not carry over from one window to the next.
+
 Usage: python scripts/generate_clip.py --prompt "your prompt" --duration 2
+       python scripts/generate_clip.py --prompt "your prompt" --duration 10 --backends http://gpu1:8188,http://gpu2:8188
 """
 
 import argparse
+import hashlib
+import io
 import json
 import requests
 import time
 import os
 import sys
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from config.generation_config import load_config
+from config.generation_config import load_settings
+from scripts.artifact_pickup import fetch_output, local_output_dir, local_source
+from scripts.history_gc import flush_all as flush_history, release
+from scripts.run_manifest import resolve_seed
+from scripts.workflow_compiler import compile_template, find_nodes, linked_node, load_object_info, set_inputs
+
+
+_session = None
+
+
+def get_session():
+    """
+    One HTTP session shared by every request in the process
+    
+    Keeps connections to ComfyUI alive between queue/poll/download calls; the pool
+    is sized for batch_generate.py --parallel, which calls in from several threads.
+    """
+    global _session
+    if _session is None:
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _session = session
+    return _session
 
 
 def queue_prompt(api_url, prompt_workflow):
     """Queue a prompt to ComfyUI API"""
     p = {"prompt": prompt_workflow}
     data = json.dumps(p).encode('utf-8')
-    req = requests.post(f"{api_url}/prompt", data=data)
+    req = get_session().post(f"{api_url}/prompt", data=data)
     return req.json()
 
 
@@ -31,18 +67,170 @@ def get_image(api_url, filename, subfolder, folder_type):
     """Download generated image/video from ComfyUI"""
     data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
     url = f"{api_url}/view"
-    response = requests.get(url, params=data)
+    response = get_session().get(url, params=data)
     return response.content
 
 
 def get_history(api_url, prompt_id):
     """Get generation history"""
-    response = requests.get(f"{api_url}/history/{prompt_id}")
+    response = get_session().get(f"{api_url}/history/{prompt_id}")
     return response.json()
 
 
+def clip_filename(prompt, seed, frame_count):
+    """Output name for clips encoded from frames; distinct per prompt, seed and length"""
+    digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]
+    return f"clip_{digest}_{seed}_{frame_count}f.mp4"
+
+
+def wait_for_outputs(api_url, prompt_id, max_wait=600, poll_interval=2, cancelled=None):
+    """Poll history until the prompt has outputs; None on timeout or once `cancelled` is set"""
+    start_time = time.time()
+    while time.time() - start_time < max_wait:
+        if cancelled is None:
+            time.sleep(poll_interval)
+        elif cancelled.wait(poll_interval):
+            return None
+        history = get_history(api_url, prompt_id)
+        if prompt_id in history and history[prompt_id]['outputs']:
+            return history[prompt_id]['outputs']
+    return None
+
+
+def download_frames(api_url, outputs):
+    """Decode every output image, in batch order, into a (frames, h, w, 3) uint8 array"""
+    import numpy as np
+    from PIL import Image
+    
+    local_dir = local_output_dir(api_url)
+    frames = []
+    for node_output in outputs.values():
+        for image_info in node_output.get('images', []):
+            # Decode straight from ComfyUI's output folder when it is on this host
+            source = local_source(image_info, local_dir)
+            if source is None:
+                source = io.BytesIO(get_image(api_url, image_info['filename'], image_info.get('subfolder', ''), 'output'))
+            with Image.open(source) as image:
+                frames.append(np.asarray(image.convert('RGB')))
+    if not frames:
+        raise RuntimeError("segment produced no image frames")
+    return np.stack(frames)
+
+
+def cancel_prompt(api_url, prompt_id):
+    """Drop a prompt from the ComfyUI queue, or interrupt it if it is already running"""
+    session = get_session()
+    try:
+        session.post(f"{api_url}/queue", json={"delete": [prompt_id]}, timeout=10)
+        session.post(f"{api_url}/interrupt", json={"prompt_id": prompt_id}, timeout=10)
+    except requests.RequestException:
+        pass
+
+
+def generate_segment(api_url, workflow, max_wait=600, cancelled=None):
+    """Run one window's workflow on a backend and return its frames"""
+    result = queue_prompt(api_url, workflow)
+    if 'prompt_id' not in result:
+        raise RuntimeError(f"API error: {result.get('error', result)}")
+    outputs = wait_for_outputs(api_url, result['prompt_id'], max_wait, cancelled=cancelled)
+    if outputs is None:
+        if cancelled is not None and cancelled.is_set():
+            cancel_prompt(api_url, result['prompt_id'])
+            raise CancelledError()
+        raise RuntimeError("timeout waiting for segment")
+    frames = download_frames(api_url, outputs)
+    release(api_url, result['prompt_id'], outputs)
+    return frames
+
+
+def generate_long_clip(prompt, negative_prompt, frame_count, resolution, steps, cfg_scale, seed,
+                       output_dir, workflow_path, backends, window, overlap, fps=24):
+    """
+    Generate a clip as overlapping frame windows and stitch them into one video
+    
+    Windows are spread over the backends (two in flight per backend so the next
+    one is queued while the current one runs) and written to the output as soon as
+    every earlier window has arrived. Window i is sampled with seed + i, so windows
+    do not repeat each other; they are not conditioned on the previous window's
+    overlap frames (the template has no img2img or AnimateDiff context input, and
+    chaining windows would run them one after another), so the cross-dissolve
+    blends two independent takes. Once a window fails, windows not started yet are
+    cancelled and the ones already queued are removed from their backend.
+    """
+    from scripts.clip_segments import SegmentStitcher, plan_windows
+    from scripts.draw_on_renderer import open_ffmpeg_writer
+    
+    windows = plan_windows(frame_count, window, overlap)
+    object_info = load_object_info(backends[0])
+    print(f"Segments: {len(windows)} windows of <= {window} frames ({overlap} overlap) on {len(backends)} backend(s)")
+    
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, clip_filename(prompt, seed, frame_count))
+    writer = None
+    
+    def write(frames):
+        nonlocal writer
+        if writer is None:
+            writer = open_ffmpeg_writer(output_path, frames.shape[2], frames.shape[1], fps)
+        writer.stdin.write(frames.tobytes())
+    
+    stitcher = SegmentStitcher(windows, write)
+    failed = []
+    cancelled = threading.Event()
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=min(len(windows), 2 * len(backends))) as executor:
+        futures = {}
+        for index, (start, end) in enumerate(windows):
+            # Same prompt and settings keep the style consistent; the seed moves so windows differ
+            workflow = update_workflow(compile_template(workflow_path, object_info), prompt, negative_prompt,
+                                       end - start, resolution, steps, cfg_scale, seed + index)
+            for node_id in find_nodes(workflow, 'SaveImage'):
+                set_inputs(workflow, node_id, filename_prefix=f"clip_{seed}_seg{index:03d}")
+            backend = backends[index % len(backends)]
+            futures[executor.submit(generate_segment, backend, workflow, cancelled=cancelled)] = (index, backend)
+        
+        for future in as_completed(futures):
+            index, backend = futures[future]
+            try:
+                frames = future.result()
+            except CancelledError:
+                continue
+            except Exception as e:
+                print(f"✗ Segment {index} failed on {backend}: {e}")
+                failed.append(index)
+            else:
+                if not failed:
+                    try:
+                        stitcher.add(index, frames)
+                    except ValueError as e:
+                        # Wrong frame count or size for its window: the clip cannot be stitched
+                        print(f"✗ {e} (from {backend})")
+                        failed.append(index)
+            if failed:
+                if not cancelled.is_set():
+                    # The clip is discarded: stop spending GPU time on the remaining windows
+                    cancelled.set()
+                    for pending in futures:
+                        pending.cancel()
+                continue
+            print(f"Segment {index + 1}/{len(windows)} done ({time.time() - start_time:.0f}s)")
+    
+    flush_history()
+    if writer is not None:
+        writer.stdin.close()
+        writer.wait()
+    if failed or not stitcher.complete or (writer is not None and writer.returncode != 0):
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        print(f"Long clip failed (segments {', '.join(str(i) for i in sorted(failed)) or 'incomplete'})")
+        return None
+    print(f"Stitched {stitcher.frames_written} frames")
+    print(f"Saved: {output_path}")
+    return output_path
+
+
 def generate_clip(prompt, negative_prompt="", duration=2, resolution=(768, 768), 
-                  steps=25, cfg_scale=7.5, seed=-1, output_dir="output"):
+                  steps=25, cfg_scale=7.5, seed=-1, output_dir="output", backends=None):
     """
     Generate an animated clip
     
@@ -55,23 +243,37 @@ def generate_clip(prompt, negative_prompt="", duration=2, resolution=(768, 768),
         cfg_scale: CFG scale
         seed: Random seed (-1 for random)
         output_dir: Output directory
+        backends: ComfyUI URLs to spread long-clip segments over (default: config comfyui.backends,
+            else comfyui.url)
     """
-    config = load_config()
-    api_url = config.get('comfyui_url', 'http://127.0.0.1:8188')
+    settings = load_settings()
+    api_url = settings.comfyui.url
+    backends = backends or list(settings.comfyui.backends) or [api_url]
     
     # Calculate frames (24fps)
     frame_count = int(duration * 24)
+    seed = resolve_seed(seed)
     
-    # Load workflow template
+    # Long clips: overlapping windows, stitched on the CPU
     workflow_path = project_root / "workflows" / "whiteboard_animation.json"
+    animatediff = settings.animatediff
+    if frame_count > animatediff.segment_frames and workflow_path.exists():
+        print(f"Generating clip: {prompt[:50]}...")
+        print(f"Duration: {duration}s ({frame_count} frames)")
+        print(f"Resolution: {resolution[0]}x{resolution[1]}")
+        return generate_long_clip(prompt, negative_prompt, frame_count, resolution, steps, cfg_scale, seed,
+                                  output_dir, workflow_path, backends, animatediff.segment_frames,
+                                  animatediff.segment_overlap, fps=24)
+    
+    # Load workflow template
     if not workflow_path.exists():
         print(f"Error: Workflow not found at {workflow_path}")
         print("Using basic workflow...")
         workflow = create_basic_workflow(prompt, negative_prompt, frame_count, 
                                         resolution, steps, cfg_scale, seed)
     else:
-        with open(workflow_path, 'r') as f:
-            workflow = json.load(f)
+        # Compiled template (memoized, schema from the server's /object_info)
+        workflow = compile_template(workflow_path, load_object_info(api_url))
         # Update workflow with parameters
         workflow = update_workflow(workflow, prompt, negative_prompt, frame_count,
                                  resolution, steps, cfg_scale, seed)
@@ -92,39 +294,39 @@ def generate_clip(prompt, negative_prompt="", duration=2, resolution=(768, 768),
     
     # Wait for completion
     print("Generating... (this may take 1-5 minutes)")
-    max_wait = 600  # 10 minutes max
-    start_time = time.time()
-    
-    while time.time() - start_time < max_wait:
-        time.sleep(5)
-        history = get_history(api_url, prompt_id)
-        
-        if prompt_id in history:
-            outputs = history[prompt_id]['outputs']
-            if outputs:
-                print("Generation complete!")
-                break
-    else:
+    output_data = wait_for_outputs(api_url, prompt_id, max_wait=600)  # 10 minutes max
+    if output_data is None:
         print("Timeout waiting for generation")
         return None
+    print("Generation complete!")
     
     # Download result
-    output_data = history[prompt_id]['outputs']
     for node_id, node_output in output_data.items():
         if 'videos' in node_output:
             for video_info in node_output['videos']:
-                filename = video_info['filename']
-                subfolder = video_info.get('subfolder', '')
-                video_data = get_image(api_url, filename, subfolder, 'output')
-                
-                # Save to output directory
-                os.makedirs(output_dir, exist_ok=True)
-                output_path = os.path.join(output_dir, filename)
-                with open(output_path, 'wb') as f:
-                    f.write(video_data)
+                # Save to output directory (hard link when ComfyUI's output folder is local)
+                output_path = os.path.join(output_dir, video_info['filename'])
+                fetch_output(api_url, video_info, output_path, local_output_dir(api_url))
+                release(api_url, prompt_id, output_data)
                 print(f"Saved: {output_path}")
                 return output_path
     
+    # Templates that save frames (SaveImage) are encoded here
+    if any(node_output.get('images') for node_output in output_data.values()):
+        from scripts.draw_on_renderer import open_ffmpeg_writer
+        frames = download_frames(api_url, output_data)
+        release(api_url, prompt_id, output_data)
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, clip_filename(prompt, seed, len(frames)))
+        writer = open_ffmpeg_writer(output_path, frames.shape[2], frames.shape[1], 24)
+        writer.stdin.write(frames.tobytes())
+        writer.stdin.close()
+        if writer.wait() == 0:
+            print(f"Saved: {output_path}")
+            return output_path
+        print("ffmpeg failed to encode the frames")
+        return None
+    
     print("No video output found")
     return None
 
@@ -145,9 +347,22 @@ def create_basic_workflow(prompt, negative_prompt, frame_count, resolution, step
 
 
 def update_workflow(workflow, prompt, negative_prompt, frame_count, resolution, steps, cfg_scale, seed):
-    """Update workflow with parameters"""
-    # This would update the workflow JSON with actual values
-    # Implementation depends on workflow structure
+    """Update a compiled (API format) workflow with parameters
+    Prompt, latent and sampler nodes are found through each KSampler's links, so
+    this works for any template in workflows/ regardless of node ids
+    """
+    for sampler_id in find_nodes(workflow, 'KSampler'):
+        set_inputs(workflow, sampler_id, seed=seed, steps=steps, cfg=cfg_scale)
+        positive_id = linked_node(workflow, sampler_id, 'positive')
+        if positive_id and 'text' in workflow[positive_id]['inputs']:
+            set_inputs(workflow, positive_id, text=prompt)
+        negative_id = linked_node(workflow, sampler_id, 'negative')
+        if negative_id and negative_prompt and 'text' in workflow[negative_id]['inputs']:
+            set_inputs(workflow, negative_id, text=negative_prompt)
+        latent_id = linked_node(workflow, sampler_id, 'latent_image')
+        if latent_id and workflow[latent_id]['class_type'] == 'EmptyLatentImage':
+            # One latent per frame
+            set_inputs(workflow, latent_id, width=resolution[0], height=resolution[1], batch_size=frame_count)
     return workflow
 
 
@@ -161,6 +376,9 @@ def main():
     parser.add_argument('--cfg', type=float, default=7.5, help='CFG scale')
     parser.add_argument('--seed', type=int, default=-1, help='Random seed (-1 for random)')
     parser.add_argument('--output', default='output', help='Output directory')
+    parser.add_argument('--backends', default=None,
+                        help='Comma-separated ComfyUI URLs to spread long-clip segments over '
+                             '(default: config comfyui.backends, else comfyui.url)')
     
     args = parser.parse_args()
     
@@ -175,7 +393,8 @@ def main():
         steps=args.steps,
         cfg_scale=args.cfg,
         seed=args.seed,
-        output_dir=args.output
+        output_dir=args.output,
+        backends=[url.strip().rstrip('/') for url in args.backends.split(',')] if args.backends else None
     )
     
     if result:
@@ -5,10 +5,15 @@ Processes each scene sequentially: generates sketch image and voice chunks
 
 Usage:
     python3 scripts/generate_complete_scenes.py
+    python3 scripts/generate_complete_scenes.py --script my_script.json --output-dir output/my_video/script
+    python3 scripts/generate_complete_scenes.py --script series.jsonl   # one scene per line, streamed
+    python3 scripts/generate_complete_scenes.py --replay output/survival/script/run_manifest.json --scenes 4
+    python3 scripts/generate_complete_scenes.py --priority 1-6 --deadline 20-22=600   # preview + urgent fixes first
+    python3 scripts/generate_complete_scenes.py --local   # in-process even while generation_daemon.py runs
 """
 
+import argparse
 import asyncio
-import json
 import os
 import sys
 from pathlib import Path
@@ -19,22 +24,32 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from scripts.batch_generate_sketches import (
-    generate_single_sketch, convert_workflow_to_api_format,
-    queue_prompt, get_image, get_history, build_sketch_prompt, update_workflow
+    generate_single_sketch, build_sketch_workflow,
+    queue_prompt, get_history, build_sketch_prompt,
+    record_execution_spans, execution_times
 )
+from scripts.artifact_pickup import fetch_output, local_output_dir
+from scripts.history_gc import flush_all as flush_history, release
+from scripts.job_scheduler import CONTROL_NAME, Job, JobScheduler, parse_assignments
 from scripts.generate_openai_voiceover import (
     split_text_into_chunks, convert_pcm_to_mp3
 )
-from config.generation_config import load_config
-import requests
+from scripts.timeline_planner import record_voice_chunk
+from scripts.progress import ProgressTracker
+from scripts.run_manifest import (
+    MANIFEST_NAME, RunManifest, parse_scene_list, resolve_seed, workflow_hash, workflow_models
+)
+from scripts.scene_stream import count_scenes, iter_scenes
+from scripts.tracing import print_summary, span, tracing_enabled
+from scripts.workflow_compiler import load_object_info
+from scripts.workflow_validator import format_problems, load_model_inventory, preflight
+from config.generation_config import ConfigError, load_settings
 import time
-import random
 
 
 def load_script(file_path: Path) -> List[dict]:
-    """Load complete script JSON"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Load a complete script (JSON array or JSONL) into memory; main() streams it instead"""
+    return list(iter_scenes(file_path))
 
 
 def generate_scene_image(
@@ -45,46 +60,54 @@ def generate_scene_image(
     workflow_path: Path,
     resolution=(1024, 768),
     steps=20,
-    cfg_scale=7.0
+    cfg_scale=7.0,
+    seed=-1,
+    run_info: dict = None
 ) -> Tuple[bool, Path]:
     """
     Generate sketch image for a scene
     
+    run_info, if given, is filled with the resolved seed, workflow hash, models,
+    prompt_id, timings and output checksum for the run manifest
+    
     Returns:
         (success, output_path)
     """
+    seed = resolve_seed(seed)
+    if run_info is None:
+        run_info = {}
+    run_info['seed'] = seed
+    job_started = time.time()
     try:
-        # Build full sketch prompt
-        full_prompt = build_sketch_prompt(visual_prompt, "sketch")
-        negative_prompt = "colored, photo realistic, complex background, shadows, gradients, multiple subjects, blurry, low quality, detailed, realistic, watermark, text"
-        
-        # Output filename
-        output_filename = f"scene_{scene_num}"
-        
-        # Load workflow
-        with open(workflow_path, 'r') as f:
-            workflow_array = json.load(f)
-        
-        # Update workflow
-        seed = random.randint(0, 2**31 - 1)
-        workflow_array = update_workflow(
-            workflow_array, full_prompt, negative_prompt, resolution,
-            steps, cfg_scale, seed, output_filename
-        )
-        
-        # Convert to API format
-        workflow = convert_workflow_to_api_format(workflow_array)
+        with span('workflow_build', scene=scene_num):
+            # Build full sketch prompt
+            full_prompt = build_sketch_prompt(visual_prompt, "sketch")
+            negative_prompt = "colored, photo realistic, complex background, shadows, gradients, multiple subjects, blurry, low quality, detailed, realistic, watermark, text"
+            
+            # Output filename
+            output_filename = f"scene_{scene_num}"
+            
+            # Compiled template (memoized) with this scene's inputs
+            workflow = build_sketch_workflow(
+                workflow_path, full_prompt, negative_prompt, resolution,
+                steps, cfg_scale, seed, output_filename, load_object_info(api_url)
+            )
+            run_info['workflow_hash'] = workflow_hash(workflow)
+            run_info['models'] = workflow_models(workflow)
         
         print(f"   Generating image...")
         
         # Queue prompt
-        result = queue_prompt(api_url, workflow)
+        with span('submit', scene=scene_num):
+            result = queue_prompt(api_url, workflow)
+        submitted_at = time.time()
         if 'error' in result:
             return (False, None)
         
         prompt_id = result.get('prompt_id') or result.get('number')
         if not prompt_id:
             return (False, None)
+        run_info['prompt_id'] = prompt_id
         
         # Wait for completion
         max_wait = 180
@@ -100,20 +123,27 @@ def generate_scene_image(
                     break
         else:
             return (False, None)
+        completed_at = time.time()
+        record_execution_spans(history[prompt_id], submitted_at, completed_at, scene=scene_num)
+        started, finished = execution_times(history[prompt_id])
+        timings = run_info.setdefault('timings', {})
+        timings['wait'] = round(completed_at - submitted_at, 3)
+        if started is not None:
+            timings['execution'] = round(finished - started, 3)
         
         # Download result
         output_data = history[prompt_id]['outputs']
         for node_id, node_output in output_data.items():
             if 'images' in node_output:
                 for image_info in node_output['images']:
-                    filename = image_info['filename']
-                    subfolder = image_info.get('subfolder', '')
-                    image_data = get_image(api_url, filename, subfolder, 'output')
-                    
-                    # Save to output directory
+                    # Save to output directory (hard link when ComfyUI's output folder is local)
                     output_path = output_dir / f"scene_{scene_num}.png"
-                    with open(output_path, 'wb') as f:
-                        f.write(image_data)
+                    local_dir = local_output_dir(api_url)
+                    with span('download', scene=scene_num, local=local_dir is not None):
+                        fetched = fetch_output(api_url, image_info, output_path, local_dir)
+                    run_info['sha256'] = fetched['sha256']
+                    timings['total'] = round(time.time() - job_started, 3)
+                    release(api_url, prompt_id, output_data)
                     
                     return (True, output_path)
         
@@ -131,10 +161,12 @@ async def generate_voice_chunk(
     output_dir: Path,
     api_url: str,
     voice: str = "onyx",
-    instructions: str = None
+    instructions: str = None,
+    client=None
 ) -> Tuple[bool, Path]:
     """
     Generate a single voice chunk and save as MP3
+    client: AsyncOpenAI client to reuse (default: a new one for api_url)
     
     Returns:
         (success, output_path)
@@ -143,7 +175,8 @@ async def generate_voice_chunk(
         from openai import AsyncOpenAI
         
         # Initialize client for open source API
-        client = AsyncOpenAI(base_url=api_url, api_key="not-needed")
+        if client is None:
+            client = AsyncOpenAI(base_url=api_url, api_key="not-needed")
         
         # Default dramatic instructions
         if instructions is None:
@@ -160,22 +193,28 @@ Pronunciation: Clear and precise, emphasizing critical words to reinforce impact
 Pauses: Strategic pauses after important statements, creating dramatic effect."""
         
         # Generate speech
-        async with client.audio.speech.with_streaming_response.create(
-            model="gpt-4o-mini-tts",
-            voice=voice,
-            input=text,
-            instructions=instructions,
-            response_format="pcm"
-        ) as response:
-            # Save PCM chunk
-            pcm_path = output_dir / f"voice_scene_{scene_num}_{chunk_letter}.pcm"
-            with open(pcm_path, 'wb') as f:
-                async for chunk in response.iter_bytes():
-                    f.write(chunk)
+        with span('tts_request', scene=scene_num, chunk=chunk_letter, chars=len(text)):
+            async with client.audio.speech.with_streaming_response.create(
+                model="gpt-4o-mini-tts",
+                voice=voice,
+                input=text,
+                instructions=instructions,
+                response_format="pcm"
+            ) as response:
+                # Save PCM chunk (byte count gives the exact duration for the timeline)
+                pcm_path = output_dir / f"voice_scene_{scene_num}_{chunk_letter}.pcm"
+                pcm_bytes = 0
+                with open(pcm_path, 'wb') as f:
+                    async for chunk in response.iter_bytes():
+                        f.write(chunk)
+                        pcm_bytes += len(chunk)
         
         # Convert to MP3
         mp3_path = output_dir / f"voice_scene_{scene_num}_{chunk_letter}.mp3"
-        if convert_pcm_to_mp3(pcm_path, mp3_path):
+        with span('pcm_to_mp3', scene=scene_num, chunk=chunk_letter):
+            converted = convert_pcm_to_mp3(pcm_path, mp3_path)
+        if converted:
+            record_voice_chunk(output_dir, mp3_path.name, pcm_bytes)
             return (True, mp3_path)
         else:
             return (False, None)
@@ -212,11 +251,19 @@ async def process_scene(
     tts_url: str,
     workflow_path: Path,
     scene_index: int,
-    total_scenes: int
+    total_scenes: int,
+    progress: ProgressTracker = None,
+    manifest: RunManifest = None,
+    seed: int = -1,
+    tts_client=None
 ) -> bool:
     """
     Process a single scene: generate image + voice chunks
     
+    The outcome is recorded in manifest (if given) under the scene number,
+    together with the scene itself so it can be replayed. The image is generated
+    in a worker thread, so other scenes sharing the event loop keep running.
+    
     Returns:
         True if successful
     """
@@ -232,13 +279,25 @@ async def process_scene(
     
     # Generate image
     print(f"\n📸 Generating image...")
-    success, image_path = generate_scene_image(
-        scene_num, visual_prompt, output_dir,
-        comfyui_url, workflow_path
+    started = progress.start('image') if progress else None
+    run_info = {}
+    success, image_path = await asyncio.to_thread(
+        generate_scene_image, scene_num, visual_prompt, output_dir,
+        comfyui_url, workflow_path, seed=seed, run_info=run_info
     )
+    if progress:
+        progress.finish('image', started, ok=success)
+    
+    def record(ok, voice=None):
+        if manifest is not None:
+            manifest.record(scene_num, **{'scene': scene, **run_info, 'success': ok,
+                                          'output': str(image_path) if image_path else None, 'voice': voice})
     
     if not success:
         print(f"   ❌ Failed to generate image")
+        if progress:
+            progress.skip('tts', len(split_voice_text(voice_text, max_chars=1000)))
+        record(False)
         return False
     
     print(f"   ✅ Saved: {image_path.name}")
@@ -248,50 +307,130 @@ async def process_scene(
     print(f"\n🎤 Generating voice ({len(voice_chunks)} chunk(s))...")
     
     all_voice_success = True
+    voice_files = {}
     for chunk_letter, chunk_text in voice_chunks:
         print(f"   Generating chunk {chunk_letter} ({len(chunk_text)} chars)...")
         
+        started = progress.start('tts') if progress else None
         success, voice_path = await generate_voice_chunk(
             chunk_text, scene_num, chunk_letter,
-            output_dir, tts_url
+            output_dir, tts_url, client=tts_client
         )
+        if progress:
+            progress.finish('tts', started, ok=success)
         
         if success:
             print(f"   ✅ Saved: {voice_path.name}")
         else:
             print(f"   ❌ Failed to generate chunk {chunk_letter}")
             all_voice_success = False
+        voice_files[chunk_letter] = str(voice_path) if success else None
     
+    record(all_voice_success, voice_files)
     return all_voice_success
 
 
 async def main():
     """Main function"""
-    # Load script
-    script_path = project_root / "scripts" / "complete_script.json"
-    if not script_path.exists():
-        print(f"❌ Script file not found: {script_path}")
-        sys.exit(1)
-    
-    scenes = load_script(script_path)
-    if not scenes:
-        print("❌ No scenes found in script")
-        sys.exit(1)
-    
-    print(f"📝 Loaded {len(scenes)} scenes from script")
+    parser = argparse.ArgumentParser(description='Generate sketch images and voice chunks for every scene in a script')
+    parser.add_argument('--script', default='scripts/complete_script.json',
+                        help='Scene script: JSON array or JSONL (one scene per line)')
+    parser.add_argument('--output-dir', default='output/survival/script', help='Output directory for images and voice chunks')
+    parser.add_argument('--seed', type=int, default=-1, help='Image seed for every scene (-1: random per scene, recorded)')
+    parser.add_argument('--manifest', default=None, help='Run manifest path (default: <output-dir>/run_manifest.json)')
+    parser.add_argument('--replay', default=None, metavar='MANIFEST',
+                        help='Regenerate scenes of a previous run with their recorded seeds')
+    parser.add_argument('--scenes', default=None,
+                        help='With --replay: scene numbers to regenerate, e.g. 3,7-9 (default: failed scenes)')
+    parser.add_argument('--priority', action='append', default=None, metavar='SCENES[=LEVEL]',
+                        help='Generate these scenes first, e.g. 1-8 or 40=5 (overrides a scene\'s "priority")')
+    parser.add_argument('--deadline', action='append', default=None, metavar='SCENES=SECONDS',
+                        help='Scenes due this many seconds after the start (overrides a scene\'s "deadline")')
+    parser.add_argument('--project', default=None,
+                        help='Fair-share project for scenes without a "project" (default: the script name)')
+    parser.add_argument('--local', action='store_true',
+                        help='Generate in this process even when the generation daemon is running')
+    args = parser.parse_args()
+    if args.scenes and not args.replay:
+        parser.error('--scenes requires --replay')
+    try:
+        priorities = parse_assignments(args.priority)
+        deadlines = parse_assignments(args.deadline, default=None)
+    except ValueError as e:
+        parser.error(f'--priority/--deadline: {e}')
+    if any(value is None for value in deadlines.values()):
+        parser.error('--deadline needs SCENES=SECONDS')
     
-    # Setup output directory
-    output_dir = project_root / "output" / "survival" / "script"
+    if args.replay:
+        # Replays take the scenes, seeds and output directory from the manifest
+        try:
+            manifest = RunManifest.load(args.replay)
+            selected = manifest.select(parse_scene_list(args.scenes) if args.scenes else None)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        total_scenes = len(selected)
+        if not total_scenes:
+            print(f"✅ Nothing to replay: no failed scenes in {args.replay}")
+            return
+        scenes = ((record['scene'], record['seed']) for _, record in selected)
+        output_dir = Path(manifest.settings['output_dir'])
+        project = args.project or Path(manifest.settings.get('script') or args.replay).stem
+        print(f"🔁 Replaying {total_scenes} scene(s): {', '.join(str(n) for n, _ in selected)}")
+    else:
+        # Load script
+        script_path = Path(args.script)
+        if not script_path.is_absolute():
+            script_path = project_root / script_path
+        if not script_path.exists():
+            print(f"❌ Script file not found: {script_path}")
+            sys.exit(1)
+        
+        # Scenes are parsed one at a time as generation proceeds; the count only sizes progress
+        total_scenes = count_scenes(script_path)
+        if not total_scenes:
+            print("❌ No scenes found in script")
+            sys.exit(1)
+        
+        print(f"📝 Streaming {total_scenes} scenes from script")
+        
+        # Setup output directory
+        output_dir = Path(args.output_dir)
+        if not output_dir.is_absolute():
+            output_dir = project_root / output_dir
+        
+        # A running daemon takes the project (it uses its own ComfyUI/TTS connections)
+        from scripts.daemon_client import daemon_url, run_on_daemon
+        daemon = None if args.local else daemon_url()
+        if daemon:
+            results = run_on_daemon(daemon, {
+                'kind': 'scenes', 'file': str(script_path.absolute()), 'output_dir': str(output_dir.absolute()),
+                'manifest': str(Path(args.manifest).absolute()) if args.manifest else None, 'seed': args.seed,
+                'name': args.project, 'priorities': priorities, 'deadlines': deadlines,
+            })
+            if not results or any(not r[1] for r in results):
+                sys.exit(1)
+            return
+        # Seeds are resolved per scene up front so every one is recorded and replayable
+        scenes = ((scene, resolve_seed(args.seed)) for scene in iter_scenes(script_path))
+        project = args.project or script_path.stem
+        manifest = RunManifest(Path(args.manifest) if args.manifest else output_dir / MANIFEST_NAME,
+                               settings={'script': str(script_path), 'output_dir': str(output_dir), 'seed': args.seed})
     output_dir.mkdir(parents=True, exist_ok=True)
     
     print(f"📁 Output directory: {output_dir}")
     
     # Load config
-    config = load_config()
-    comfyui_url = config.get('comfyui_url', 'http://127.0.0.1:8188')
+    try:
+        settings = load_settings()
+    except ConfigError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    comfyui_url = settings.comfyui.url
     tts_url = os.getenv("OPENAI_BASE_URL", "http://localhost:8000/v1")
     
     # Check services
+    import requests
     try:
         requests.get(f"{comfyui_url}/system_stats", timeout=5)
         print(f"✅ ComfyUI: Running at {comfyui_url}")
@@ -313,6 +452,33 @@ async def main():
         print(f"❌ Workflow not found: {workflow_path}")
         sys.exit(1)
     
+    # Pre-flight: every scene image uses the same template and settings, so one
+    # offline check covers the run before any GPU time is spent
+    object_info = load_object_info(comfyui_url)
+    problems = preflight(
+        [('all scenes', build_sketch_workflow(workflow_path, 'pre-flight', 'pre-flight', (1024, 768), 20, 7.0,
+                                              0, 'scene_0', object_info))],
+        object_info, load_model_inventory(comfyui_url, install_path=settings.comfyui.install_path)
+    )
+    if problems:
+        print(f"❌ {format_problems(problems)}")
+        sys.exit(1)
+    
+    # Scenes run by priority, then deadline, then fair share across projects, then script
+    # order; the control file re-prioritizes pending scenes while the run is going
+    def scheduled(scene, seed):
+        return Job(scene.get('scene_number'), (scene, seed), int(scene.get('priority', 0)), scene.get('deadline'),
+                   scene.get('project', project))
+    
+    scheduler = JobScheduler((scheduled(scene, seed) for scene, seed in scenes),
+                             control_path=output_dir / CONTROL_NAME)
+    # Command-line settings win over the scene's own and reach scenes beyond the lookahead window
+    for number, level in priorities.items():
+        scheduler.update(number, priority=int(level))
+    for number, seconds in deadlines.items():
+        scheduler.update(number, deadline=seconds)
+    print(f"🎛️  Re-prioritize: python scripts/job_scheduler.py {scheduler.control_path} --scenes N --priority 10")
+    
     print(f"\n🚀 Starting generation...")
     print(f"{'='*60}\n")
     
@@ -320,32 +486,56 @@ async def main():
     successful = 0
     failed = 0
     
-    for idx, scene in enumerate(scenes, 1):
-        success = await process_scene(
-            scene, output_dir, comfyui_url, tts_url,
-            workflow_path, idx, len(scenes)
-        )
-        
-        if success:
-            successful += 1
-        else:
-            failed += 1
-        
-        # Small delay between scenes
-        if idx < len(scenes):
-            print(f"\n⏳ Waiting 3 seconds before next scene...\n")
-            await asyncio.sleep(3)
+    processed = 0
+    voice_chunks_seen = 0
+    script_error = False
+    with ProgressTracker({'image': total_scenes, 'tts': 0}) as progress:
+        try:
+            for idx, (scene, seed) in enumerate(scheduler, 1):
+                # Voice chunk total is extrapolated from the scenes parsed so far
+                voice_chunks_seen += len(split_voice_text(scene['voice_over'], max_chars=1000))
+                total_scenes = max(total_scenes, idx)
+                progress.set_total('image', total_scenes)
+                progress.set_total('tts', round(voice_chunks_seen / idx * total_scenes))
+                
+                success = await process_scene(
+                    scene, output_dir, comfyui_url, tts_url,
+                    workflow_path, idx, total_scenes, progress, manifest, seed
+                )
+                processed = idx
+                
+                if success:
+                    successful += 1
+                else:
+                    failed += 1
+                
+                # Small delay between scenes
+                if len(scheduler):
+                    print(f"\n⏳ Waiting 3 seconds before next scene...\n")
+                    await asyncio.sleep(3)
+        except ValueError as e:
+            print(f"\n❌ Script error after scene {processed}: {e}")
+            script_error = True
+    total_scenes = processed
+    manifest.save()
+    flush_history()
     
     # Summary
     print(f"\n{'='*60}")
     print(f"📊 GENERATION SUMMARY")
     print(f"{'='*60}")
-    print(f"✅ Successful: {successful}/{len(scenes)}")
-    print(f"❌ Failed: {failed}/{len(scenes)}")
+    print(f"✅ Successful: {successful}/{total_scenes}")
+    print(f"❌ Failed: {failed}/{total_scenes}")
+    if scheduler.late:
+        print(f"⏰ Started after their deadline: scene(s) {', '.join(str(n) for n in scheduler.late)}")
     print(f"📁 Output: {output_dir}")
+    print(f"📋 Run manifest: {manifest.path}")
     print(f"{'='*60}\n")
     
-    if failed > 0:
+    if tracing_enabled():
+        print_summary()
+    
+    if failed > 0 or script_error:
         sys.exit(1)
 
 
@@ -22,6 +22,8 @@ from typing import List, Optional
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from scripts.tracing import configure_tracing, print_summary, span, tracing_enabled
+
 
 def split_text_into_chunks(text: str, max_chars: int = 1000, overlap: int = 50) -> List[str]:
     """
@@ -324,17 +326,18 @@ Pauses: Strategic pauses after important statements, creating dramatic effect an
     # Generate all chunks
     chunk_files = []
     for i, chunk in enumerate(chunks, 1):
-        chunk_file = await generate_chunk_openai_async(
-            chunk,
-            i,
-            total_chunks,
-            temp_dir,
-            api_key=api_key,
-            use_open_source=use_open_source,
-            base_url=base_url,
-            voice=voice,
-            instructions=instructions
-        )
+        with span('tts_request', chunk=i, chars=len(chunk), voice=voice):
+            chunk_file = await generate_chunk_openai_async(
+                chunk,
+                i,
+                total_chunks,
+                temp_dir,
+                api_key=api_key,
+                use_open_source=use_open_source,
+                base_url=base_url,
+                voice=voice,
+                instructions=instructions
+            )
         
         if chunk_file is None:
             print(f"❌ Failed to generate chunk {i}")
@@ -346,7 +349,9 @@ Pauses: Strategic pauses after important statements, creating dramatic effect an
         
         # Convert to MP3
         mp3_chunk = temp_dir / f"chunk_{i:03d}.mp3"
-        if convert_pcm_to_mp3(chunk_file, mp3_chunk):
+        with span('pcm_to_mp3', chunk=i):
+            converted = convert_pcm_to_mp3(chunk_file, mp3_chunk)
+        if converted:
             chunk_files.append(mp3_chunk)
         else:
             print(f"⚠️  Warning: Could not convert chunk {i} to MP3, keeping PCM")
@@ -359,7 +364,9 @@ Pauses: Strategic pauses after important statements, creating dramatic effect an
     else:
         # Multiple chunks - merge them
         print(f"\n🔗 Merging {len(chunk_files)} chunks...")
-        if merge_audio_files(chunk_files, output_path):
+        with span('merge', chunks=len(chunk_files)):
+            merged = merge_audio_files(chunk_files, output_path)
+        if merged:
             print(f"✅ Merged successfully!")
         else:
             print(f"❌ Failed to merge chunks")
@@ -376,6 +383,9 @@ Pauses: Strategic pauses after important statements, creating dramatic effect an
     print(f"   Format: MP3")
     print(f"   Duration: ~{len(text) / 150:.1f} seconds (estimated)")
     
+    if tracing_enabled():
+        print_summary()
+    
     return True
 
 
@@ -407,8 +417,10 @@ Examples:
     parser.add_argument('--voice', default='onyx', choices=['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer'],
                        help='Voice to use (default: onyx)')
     parser.add_argument('--instructions', help='Custom voice instructions (optional)')
+    parser.add_argument('--trace', help='Write per-stage timing spans to this JSONL file')
     
     args = parser.parse_args()
+    configure_tracing(args.trace)
     
     # Read text file
     text_file = Path(args.file)
@@ -6,7 +6,6 @@ Usage: python scripts/generate_sketch_image.py --prompt "your prompt" [options]
 
 import argparse
 import json
-import requests
 import time
 import os
 import sys
@@ -16,27 +15,24 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from config.generation_config import load_config
+from config.generation_config import load_settings
+from scripts.artifact_pickup import fetch_output, local_output_dir
+from scripts.history_gc import release
+from scripts.tracing import span
 
 
 def queue_prompt(api_url, prompt_workflow):
     """Queue a prompt to ComfyUI API"""
+    import requests
     p = {"prompt": prompt_workflow}
     data = json.dumps(p).encode('utf-8')
     req = requests.post(f"{api_url}/prompt", data=data)
     return req.json()
 
 
-def get_image(api_url, filename, subfolder, folder_type):
-    """Download generated image from ComfyUI"""
-    data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-    url = f"{api_url}/view"
-    response = requests.get(url, params=data)
-    return response.content
-
-
 def get_history(api_url, prompt_id):
     """Get generation history"""
+    import requests
     response = requests.get(f"{api_url}/history/{prompt_id}")
     return response.json()
 
@@ -71,40 +67,9 @@ def build_sketch_prompt(user_prompt, style="sketch"):
     return full_prompt
 
 
-def update_workflow(workflow, prompt, negative_prompt, resolution, steps, cfg_scale, seed, output_filename):
-    """Update workflow with parameters"""
-    # Find nodes by type
-    for node in workflow['nodes']:
-        # Update CheckpointLoaderSimple - ensure correct model name
-        if node.get('type') == 'CheckpointLoaderSimple':
-            node['widgets_values'] = ["dreamshaperXL_lightningDPMSDE.safetensors"]
-        
-        # Update positive prompt (CLIPTextEncode node 2)
-        elif node.get('id') == 2 and node.get('type') == 'CLIPTextEncode':
-            node['widgets_values'] = [prompt]
-        
-        # Update negative prompt (CLIPTextEncode node 3)
-        elif node.get('id') == 3 and node.get('type') == 'CLIPTextEncode':
-            node['widgets_values'] = [negative_prompt]
-        
-        # Update resolution (EmptyLatentImage node 4)
-        elif node.get('id') == 4 and node.get('type') == 'EmptyLatentImage':
-            node['widgets_values'] = [resolution[0], resolution[1], 1]
-        
-        # Update sampler settings (KSampler node 5)
-        elif node.get('id') == 5 and node.get('type') == 'KSampler':
-            node['widgets_values'] = [seed, "fixed", steps, cfg_scale, "dpmpp_2m", "karras", 1.0]
-        
-        # Update output filename (SaveImage node 7)
-        elif node.get('id') == 7 and node.get('type') == 'SaveImage':
-            node['widgets_values'] = [output_filename]
-    
-    return workflow
-
-
 def generate_sketch_image(prompt, negative_prompt="", resolution=(768, 768), 
                           steps=25, cfg_scale=7.5, seed=-1, output_dir="output/sketches",
-                          style="sketch", output_filename=None):
+                          style="sketch", output_filename=None, api_url=None):
     """
     Generate a sketch-based static image
     
@@ -118,9 +83,10 @@ def generate_sketch_image(prompt, negative_prompt="", resolution=(768, 768),
         output_dir: Output directory
         style: Style type - "sketch", "character", "object", "scene"
         output_filename: Custom output filename (without extension)
+        api_url: ComfyUI URL (default: from config)
     """
-    config = load_config()
-    api_url = config.get('comfyui_url', 'http://127.0.0.1:8188')
+    if api_url is None:
+        api_url = load_settings().comfyui.url
     
     # Build full sketch prompt
     full_prompt = build_sketch_prompt(prompt, style)
@@ -142,16 +108,13 @@ def generate_sketch_image(prompt, negative_prompt="", resolution=(768, 768),
         print(f"Error: Workflow not found at {workflow_path}")
         return None
     
-    with open(workflow_path, 'r') as f:
-        workflow_array = json.load(f)
-    
-    # Update workflow with parameters (array format)
-    workflow_array = update_workflow(workflow_array, full_prompt, negative_prompt, resolution,
-                              steps, cfg_scale, seed, output_filename)
-    
-    # Convert to API format
-    from scripts.batch_generate_sketches import convert_workflow_to_api_format
-    workflow = convert_workflow_to_api_format(workflow_array)
+    # Compiled template with this job's parameters (API requires a seed >= 0)
+    from scripts.batch_generate_sketches import build_sketch_workflow, record_execution_spans
+    from scripts.run_manifest import resolve_seed
+    from scripts.workflow_compiler import load_object_info
+    seed = resolve_seed(seed)
+    workflow = build_sketch_workflow(workflow_path, full_prompt, negative_prompt, resolution,
+                                     steps, cfg_scale, seed, output_filename, load_object_info(api_url))
     
     print(f"Generating sketch image...")
     print(f"Prompt: {full_prompt[:80]}...")
@@ -160,7 +123,9 @@ def generate_sketch_image(prompt, negative_prompt="", resolution=(768, 768),
     
     # Queue prompt
     try:
-        result = queue_prompt(api_url, workflow)
+        with span('submit', job=output_filename):
+            result = queue_prompt(api_url, workflow)
+        submitted_at = time.time()
         prompt_id = result['prompt_id']
         print(f"Queued. Prompt ID: {prompt_id}")
     except Exception as e:
@@ -185,21 +150,19 @@ def generate_sketch_image(prompt, negative_prompt="", resolution=(768, 768),
     else:
         print("Timeout waiting for generation")
         return None
+    record_execution_spans(history[prompt_id], submitted_at, time.time(), job=output_filename)
     
     # Download result
     output_data = history[prompt_id]['outputs']
     for node_id, node_output in output_data.items():
         if 'images' in node_output:
             for image_info in node_output['images']:
-                filename = image_info['filename']
-                subfolder = image_info.get('subfolder', '')
-                image_data = get_image(api_url, filename, subfolder, 'output')
-                
-                # Save to output directory
-                os.makedirs(output_dir, exist_ok=True)
-                output_path = os.path.join(output_dir, filename)
-                with open(output_path, 'wb') as f:
-                    f.write(image_data)
+                # Save to output directory (hard link when ComfyUI's output folder is local)
+                output_path = os.path.join(output_dir, image_info['filename'])
+                local_dir = local_output_dir(api_url)
+                with span('download', job=output_filename, local=local_dir is not None):
+                    fetch_output(api_url, image_info, output_path, local_dir)
+                release(api_url, prompt_id, output_data)
                 print(f"✓ Saved: {output_path}")
                 return output_path
     
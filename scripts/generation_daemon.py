@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""
+Long-running generation service with a local job-submission API
+One process owns everything the batch scripts otherwise rebuild on every run:
+the pooled ComfyUI session, the cached node schema and compiled workflow
+templates, one TTS client, and a result cache of finished fixed-seed jobs (so
+an identical job from another project is hard-linked instead of re-rendered).
+Projects - prompts files or scene scripts - are submitted over HTTP and all of
+their jobs go through one global JobScheduler, so concurrent projects share the
+GPU by priority, deadline and fair share.
+
+While it is running, batch_generate_sketches.py and generate_complete_scenes.py
+submit to it (see scripts/daemon_client.py) instead of generating in-process.
+
+API (JSON, bound to daemon.url in config/generation_config.yaml):
+    GET  /health                       ComfyUI status, workers, queue length
+    GET  /projects                     every project's summary
+    POST /projects                     {"kind": "sketches" | "scenes", "file": "/abs/path", "output_dir": ...,
+                                        "skip_preflight": false}
+    GET  /projects/<id>[?since=N]      one project, with its finished results from index N on
+    POST /projects/<id>/priority       {"scenes": [3, 4], "priority": 10, "deadline": 300}
+    POST /projects/<id>/cancel         {"scenes": [7]} (default: every pending scene)
+    GET  /queue                        pending jobs in dispatch order
+    POST /weights                      {"project": "series-b", "weight": 2}
+
+Usage:
+    python scripts/generation_daemon.py                           # serve on daemon.url
+    python scripts/generation_daemon.py --workers 3
+    python scripts/batch_generate_sketches.py --file prompts.txt  # now a thin client
+    python scripts/daemon_client.py                               # status
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.generation_config import ConfigError, load_settings
+from scripts.batch_generate_sketches import (
+    build_sketch_workflow, generate_single_sketch, iter_prompts_file, sketch_workflows
+)
+from scripts.generate_clip import get_session
+from scripts.generate_complete_scenes import process_scene
+from scripts.history_gc import flush_all as flush_history
+from scripts.job_dedup import job_key, link_or_copy
+from scripts.job_scheduler import Job, JobScheduler
+from scripts.run_manifest import MANIFEST_NAME, RunManifest, resolve_seed
+from scripts.scene_stream import iter_scenes
+from scripts.workflow_compiler import load_object_info
+from scripts.workflow_validator import format_problems, load_model_inventory, preflight
+
+KINDS = ('sketches', 'scenes')
+HEALTH_INTERVAL = 5.0  # seconds a ComfyUI health check is reused
+
+
+class Project:
+    """One submitted prompts file or script and its progress"""
+
+    def __init__(self, project_id, kind, name, file, output_dir, settings, manifest, total):
+        self.id = project_id
+        self.kind = kind
+        self.name = name
+        self.file = file
+        self.output_dir = output_dir
+        self.settings = settings
+        self.manifest = manifest
+        self.total = total
+        self.scenes = range(1, total + 1)  # scene numbers in the file
+        self.entries = iter(())  # (scene, payload, fields) still to be read from the file
+        self.read = set()  # scenes whose job has been handed to the scheduler
+        self.done = set()
+        self.skip = set()  # cancelled before their job was read
+        self.stopped = False  # cancelled as a whole: nothing more is read
+        self.results = []  # finished scenes in completion order
+        self.failed = 0
+        self.cancelled = 0
+        self.submitted = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Scenes not finished yet: unread, queued or running"""
+        return self.total - len(self.done)
+
+    @property
+    def state(self) -> str:
+        if self.pending:
+            return 'running'
+        return 'cancelled' if self.cancelled == self.total else 'done'
+
+    def finish(self, scene, name, success, output, error, record=None, cancelled=False):
+        """Record a finished (or cancelled) scene; the last one saves the manifest"""
+        if record is not None:
+            self.manifest.record(scene, **record, success=success, output=output, error=error)
+        with self._lock:
+            if scene in self.done:
+                return
+            self.done.add(scene)
+            self.results.append({'scene': scene, 'name': name, 'success': success,
+                                 'output': str(output) if output else None, 'error': error})
+            if cancelled:
+                self.cancelled += 1
+            elif not success:
+                self.failed += 1
+            last = not self.pending
+            if last:
+                self.finished_at = time.time()
+        if last:
+            self.manifest.save()
+            flush_history()
+            print(f"🏁 Project {self.id} ({self.name}): "
+                  f"{self.total - self.failed - self.cancelled}/{self.total} succeeded")
+
+    def summary(self, since=None) -> dict:
+        with self._lock:
+            summary = {
+                'id': self.id, 'kind': self.kind, 'name': self.name, 'file': self.file,
+                'output_dir': str(self.output_dir), 'manifest': str(self.manifest.path), 'state': self.state,
+                'total': self.total, 'done': len(self.results), 'failed': self.failed,
+                'cancelled': self.cancelled, 'pending': self.pending,
+                'submitted': datetime.fromtimestamp(self.submitted).isoformat(timespec='seconds'),
+                'elapsed': round((self.finished_at or time.time()) - self.submitted, 3),
+            }
+            if since is not None:
+                summary['results'] = self.results[since:]
+            return summary
+
+
+class GenerationDaemon:
+    """Projects, the global scheduler and the worker threads that drain it"""
+
+    def __init__(self, api_url, tts_url, workers=2):
+        self.api_url = api_url
+        self.tts_url = tts_url
+        self.workers = workers
+        self.workflow_path = project_root / "workflows" / "basic_image.json"
+        self.object_info = load_object_info(api_url)
+        self.scheduler = JobScheduler()
+        self.cond = threading.Condition()
+        self.projects = {}
+        self.ids = itertools.count(1)
+        self.running = 0
+        # Result cache: job key -> (output, sha256, project id, scene) of a finished fixed-seed sketch
+        self.results = {}
+        self.inflight = {}  # job key -> [(project, job)] waiting for the generation in progress
+        self.lock = threading.Lock()
+        self.health = (0.0, False)
+        # One event loop (and TTS client) for every scene's voice chunks
+        self.loop = asyncio.new_event_loop()
+        self.tts_client = None
+        threading.Thread(target=self.loop.run_forever, name='tts-loop', daemon=True).start()
+        for n in range(workers):
+            threading.Thread(target=self._work, name=f'worker-{n}', daemon=True).start()
+
+    def comfyui_ok(self) -> bool:
+        checked_at, ok = self.health
+        if time.monotonic() - checked_at > HEALTH_INTERVAL:
+            try:
+                ok = get_session().get(f"{self.api_url}/system_stats", timeout=1).ok
+            except Exception:
+                ok = False
+            self.health = (time.monotonic(), ok)
+        return ok
+
+    def project(self, project_id) -> Project:
+        try:
+            return self.projects[int(project_id)]
+        except (KeyError, ValueError):
+            raise KeyError(f"no project {project_id}") from None
+
+    # Submission
+
+    def submit(self, request: dict) -> Project:
+        """Validate, pre-flight and queue a project; raises ValueError when it is rejected"""
+        kind = request.get('kind')
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        file = Path(str(request.get('file') or ''))
+        if not file.is_absolute() or not file.is_file():
+            raise ValueError(f"file not found (give an absolute path): {file}")
+        output_dir = Path(str(request.get('output_dir') or ''))
+        if not output_dir.is_absolute():
+            raise ValueError("output_dir must be an absolute path")
+        name = str(request.get('name') or file.stem)
+        priorities = {int(scene): int(level) for scene, level in (request.get('priorities') or {}).items()}
+        deadlines = {int(scene): float(seconds) for scene, seconds in (request.get('deadlines') or {}).items()}
+        seed = int(request.get('seed', -1))
+        skip_preflight = bool(request.get('skip_preflight'))
+        models = None if skip_preflight else load_model_inventory(self.api_url,
+                                                                  install_path=load_settings().comfyui.install_path)
+
+        # Nothing is kept from these passes: the file is streamed again as jobs are dispatched
+        if kind == 'sketches':
+            settings = {
+                'prompts_file': str(file), 'output_dir': str(output_dir),
+                'resolution': [int(v) for v in request.get('resolution', (1024, 768))],
+                'steps': int(request.get('steps', 20)), 'cfg_scale': float(request.get('cfg_scale', 7.0)),
+                'seed': seed, 'style': str(request.get('style', 'sketch')), 'hires': bool(request.get('hires')),
+            }
+            total = 0
+
+            def counted():
+                nonlocal total
+                for idx, (prompt_name, prompt) in enumerate(iter_prompts_file(file), 1):
+                    total += 1
+                    yield idx, prompt_name, prompt, seed
+
+            if skip_preflight:
+                problems = {}
+                total = sum(1 for _ in counted())
+            else:
+                problems = preflight(sketch_workflows(counted(), self.workflow_path, settings['style'],
+                                                      settings['resolution'], settings['steps'],
+                                                      settings['cfg_scale'], settings['hires'], self.object_info),
+                                     self.object_info, models)
+
+            def entries():
+                for idx, (prompt_name, prompt) in enumerate(iter_prompts_file(file), 1):
+                    yield idx, (idx, prompt_name, prompt, resolve_seed(seed)), {}
+        else:
+            settings = {'script': str(file), 'output_dir': str(output_dir), 'seed': seed}
+            numbers = set()  # kept: re-prioritizing a scene not read yet needs to know it exists
+            for scene in iter_scenes(file):
+                if 'scene_number' not in scene:
+                    raise ValueError(f"{file}: every scene needs a scene_number")
+                numbers.add(scene['scene_number'])
+            total = len(numbers)
+            # Every scene uses the same template and settings: one check covers the project
+            problems = {} if skip_preflight else preflight([('all scenes', build_sketch_workflow(
+                self.workflow_path, 'pre-flight', 'pre-flight', (1024, 768), 20, 7.0, 0, 'scene_0',
+                self.object_info))], self.object_info, models)
+
+            def entries():
+                for scene in iter_scenes(file):
+                    yield scene['scene_number'], (scene, resolve_seed(seed)), scene
+        if problems:
+            raise ValueError(format_problems(problems))
+        if not total:
+            raise ValueError(f"{file}: nothing to generate")
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        project_id = next(self.ids)
+        manifest = RunManifest(Path(request['manifest']) if request.get('manifest') else output_dir / MANIFEST_NAME,
+                               settings=dict(settings, daemon_project=project_id))
+        project = Project(project_id, kind, name, str(file), output_dir, settings, manifest, total)
+        if kind == 'scenes':
+            project.scenes = numbers
+        project.entries = entries()
+        with self.cond:
+            self.projects[project.id] = project
+            if request.get('weight') is not None:
+                self.scheduler.set_weight(name, float(request['weight']))
+            # Deadlines count from the submission, on the scheduler's clock
+            offset = self.scheduler.now()
+            self.scheduler.add_source(self._jobs(project, offset))
+            # Requested settings win over a scene's own and reach scenes beyond the lookahead window
+            for scene, level in priorities.items():
+                if scene in project.scenes:
+                    self.scheduler.update((project.id, scene), priority=level)
+            for scene, seconds in deadlines.items():
+                if scene in project.scenes:
+                    self.scheduler.update((project.id, scene), deadline=offset + seconds)
+            self.cond.notify_all()
+        print(f"📥 Project {project.id} ({name}, {kind}): {project.total} job(s) from {file}")
+        return project
+
+    def _jobs(self, project: Project, offset):
+        """A project's jobs, read from its file as the scheduler's lookahead needs them"""
+        for scene, job, fields in project.entries:
+            if project.stopped:
+                return
+            if scene in project.read:
+                continue  # a repeated scene number runs once
+            project.read.add(scene)
+            if scene in project.skip:
+                project.finish(scene, f"scene {scene}", False, None, 'cancelled', cancelled=True)
+                continue
+            deadline = fields.get('deadline')
+            yield Job((project.id, scene), (project, job), int(fields.get('priority', 0)),
+                      None if deadline is None else offset + float(deadline), fields.get('project', project.name))
+
+    def reprioritize(self, project: Project, scenes, priority=None, deadline=None) -> list:
+        """Change queued scenes of a project; returns the scenes that were still queued"""
+        if priority is None and deadline is None:
+            raise ValueError("give a priority and/or deadline")
+        changed = []
+        with self.cond:
+            offset = self.scheduler.now()
+            for scene in scenes:
+                # Scenes not read yet get the setting when they arrive
+                unread = scene in project.scenes and scene not in project.read and scene not in project.skip
+                if (project.id, scene) in self.scheduler or unread:
+                    self.scheduler.update((project.id, scene), None if priority is None else int(priority),
+                                          None if deadline is None else offset + float(deadline))
+                    changed.append(scene)
+        return changed
+
+    def cancel(self, project: Project, scenes=None) -> list:
+        """
+        Drop queued scenes of a project (default: all of them); running ones finish
+
+        Named scenes that have not been read from the file yet are dropped when reached.
+        """
+        cancelled = []
+        with self.cond:
+            if scenes is None:
+                project.stopped = True
+                scenes = list(project.read - project.done)
+                # The rest of the file is only scanned for its scene numbers
+                for scene, _, _ in project.entries:
+                    if scene not in project.read:
+                        project.read.add(scene)
+                        self.scheduler.forget((project.id, scene))
+                        cancelled.append(scene)
+            for scene in scenes:
+                if (project.id, scene) in self.scheduler and self.scheduler.cancel((project.id, scene)):
+                    cancelled.append(scene)
+                elif scene in project.scenes and scene not in project.read and scene not in project.skip:
+                    project.skip.add(scene)
+                    self.scheduler.forget((project.id, scene))
+        for scene in cancelled:
+            project.finish(scene, f"scene {scene}", False, None, 'cancelled', cancelled=True)
+        return cancelled
+
+    # Workers
+
+    def _work(self):
+        while True:
+            with self.cond:
+                job = self.scheduler.next_job()
+                while job is None:
+                    self.cond.wait()
+                    job = self.scheduler.next_job()
+                self.running += 1
+            project, payload = job.payload
+            try:
+                if project.kind == 'sketches':
+                    self._run_sketch(project, payload)
+                else:
+                    self._run_scene(project, payload)
+            except Exception as e:
+                scene = job.key[1]
+                print(f"❌ Project {project.id} scene {scene}: {e}")
+                project.finish(scene, f"scene {scene}", False, None, str(e), record={})
+            finally:
+                with self.cond:
+                    self.running -= 1
+
+    def _run_sketch(self, project: Project, job):
+        idx, name, prompt, seed = job
+        s = project.settings
+        # A random seed means every scene should differ: never served from the cache
+        key = None if s['seed'] == -1 else job_key(prompt, style=s['style'], resolution=s['resolution'],
+                                                    steps=s['steps'], cfg_scale=s['cfg_scale'], seed=seed,
+                                                    hires=s['hires'])
+        if key is not None:
+            with self.lock:
+                cached = self.results.get(key)
+                if cached is not None and os.path.exists(cached[0]):
+                    self._reuse(project, job, cached)
+                    return
+                if key in self.inflight:
+                    self.inflight[key].append((project, job))
+                    return
+                self.inflight[key] = []
+
+        if s['hires']:
+            from scripts.hires_pipeline import generate_hires_sketch as generate
+        else:
+            generate = generate_single_sketch
+        info = {}
+        try:
+            result = generate(name, prompt, self.api_url, self.workflow_path, str(project.output_dir),
+                              tuple(s['resolution']), s['steps'], s['cfg_scale'], seed, s['style'], idx,
+                              run_info=info)
+        except Exception as e:
+            result = (name, False, None, str(e))
+        _, success, path, error = result
+        print(f"{'✅' if success else '❌'} Project {project.id} scene {idx}: {name}"
+              + (f" ({error})" if error else ""))
+        project.finish(idx, name, success, path, error,
+                       record={'name': name, 'prompt': prompt, 'seed': seed, **info})
+
+        waiting = []
+        if key is not None:
+            with self.lock:
+                waiting = self.inflight.pop(key, [])
+                if success:
+                    self.results[key] = (path, info.get('sha256'), project.id, idx)
+        for other, other_job in waiting:
+            if success:
+                self._reuse(other, other_job, self.results[key])
+            else:
+                other.finish(other_job[0], other_job[1], False, None, error,
+                             record={'name': other_job[1], 'prompt': other_job[2], 'seed': other_job[3]})
+
+    def _reuse(self, project: Project, job, cached):
+        """Hard-link an identical job's output instead of generating it again"""
+        idx, name, prompt, seed = job
+        path, sha256, source_project, source_scene = cached
+        target = link_or_copy(path, project.output_dir / f"scene-{idx}{os.path.splitext(path)[1] or '.png'}")
+        print(f"♻️  Project {project.id} scene {idx}: linked from project {source_project} scene {source_scene}")
+        project.finish(idx, name, True, target, None,
+                       record={'name': name, 'prompt': prompt, 'seed': seed, 'sha256': sha256,
+                               'reused_from': source_scene, 'reused_project': source_project})
+
+    def _run_scene(self, project: Project, job):
+        scene, seed = job
+        future = asyncio.run_coroutine_threadsafe(self._process_scene(project, scene, seed), self.loop)
+        success = future.result()
+        record = project.manifest.get(scene['scene_number']) or {}
+        name = scene['visual_prompt'][:60] if scene.get('visual_prompt') else f"scene {scene['scene_number']}"
+        project.finish(scene['scene_number'], name, success, record.get('output'),
+                       None if success else 'image or voice generation failed')
+
+    async def _process_scene(self, project: Project, scene, seed):
+        if self.tts_client is None:
+            try:
+                from openai import AsyncOpenAI
+                self.tts_client = AsyncOpenAI(base_url=self.tts_url, api_key="not-needed")
+            except ImportError:
+                pass  # generate_voice_chunk reports the missing package per chunk
+        return await process_scene(scene, project.output_dir, self.api_url, self.tts_url, self.workflow_path,
+                                   len(project.results) + 1, project.total, None, project.manifest, seed,
+                                   tts_client=self.tts_client)
+
+    # API views
+
+    def health_view(self) -> dict:
+        with self.cond:
+            pending, running = len(self.scheduler), self.running
+        return {'status': 'ok', 'comfyui': self.api_url, 'comfyui_ok': self.comfyui_ok(), 'workers': self.workers,
+                'running': running, 'pending': pending, 'projects': len(self.projects)}
+
+    def queue_view(self) -> dict:
+        now = self.scheduler.now()
+        return {'jobs': [{'project_id': job.key[0], 'scene': job.key[1], 'project': job.project,
+                          'priority': job.priority,
+                          'deadline': None if job.deadline is None else round(job.deadline - now, 1)}
+                         for job in self.scheduler.pending()]}
+
+
+def make_handler(daemon: GenerationDaemon):
+    """Build a request handler class bound to a GenerationDaemon"""
+
+    class GenerationDaemonHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, body, status=200):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+            if not isinstance(body, dict):
+                raise ValueError("expected a JSON object")
+            return body
+
+        def _route(self, method):
+            parsed = urlparse(self.path)
+            parts = [part for part in parsed.path.split('/') if part]
+            query = parse_qs(parsed.query)
+            body = self._read_json() if method == 'POST' else {}
+            if method == 'GET' and parts == ['health']:
+                return daemon.health_view()
+            if method == 'GET' and parts == ['queue']:
+                return daemon.queue_view()
+            if parts == ['projects']:
+                if method == 'POST':
+                    return 201, daemon.submit(body).summary()
+                return {'projects': [project.summary() for project in daemon.projects.values()]}
+            if len(parts) >= 2 and parts[0] == 'projects':
+                project = daemon.project(parts[1])
+                if method == 'GET' and len(parts) == 2:
+                    since = query.get('since', [None])[0]
+                    return project.summary(None if since is None else int(since))
+                if method == 'POST' and parts[2:] == ['priority']:
+                    scenes = [int(scene) for scene in body.get('scenes', [])]
+                    return {'updated': daemon.reprioritize(project, scenes, body.get('priority'),
+                                                           body.get('deadline'))}
+                if method == 'POST' and parts[2:] == ['cancel']:
+                    scenes = body.get('scenes')
+                    return {'cancelled': daemon.cancel(project, None if scenes is None else
+                                                       [int(scene) for scene in scenes])}
+            if method == 'POST' and parts == ['weights']:
+                weight = float(body.get('weight', 0))
+                if not body.get('project') or weight <= 0:
+                    raise ValueError("give a project and a positive weight")
+                with daemon.cond:
+                    daemon.scheduler.set_weight(str(body['project']), weight)
+                return {'project': body['project'], 'weight': weight}
+            return 404, {'error': f"no route {method} {parsed.path}"}
+
+        def _handle(self, method):
+            try:
+                response = self._route(method)
+            except KeyError as e:
+                self._send_json({'error': str(e.args[0])}, 404)
+                return
+            except (ValueError, TypeError, OSError) as e:
+                self._send_json({'error': str(e)}, 400)
+                return
+            status, body = response if isinstance(response, tuple) else (200, response)
+            self._send_json(body, status)
+
+        def do_GET(self):
+            self._handle('GET')
+
+        def do_POST(self):
+            self._handle('POST')
+
+    return GenerationDaemonHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the local generation daemon')
+    parser.add_argument('--workers', type=int, default=None, help='Jobs in flight on ComfyUI (default: daemon.workers)')
+    parser.add_argument('--port', type=int, default=None, help='Port (default: from daemon.url)')
+
+    args = parser.parse_args()
+
+    try:
+        settings = load_settings()
+    except ConfigError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if not settings.daemon.url:
+        print("❌ daemon.url is not set in config/generation_config.yaml")
+        sys.exit(1)
+    bind = urlparse(settings.daemon.url)
+    port = args.port or bind.port or 8765
+    api_url = settings.comfyui.url
+    tts_url = os.getenv("OPENAI_BASE_URL", "http://localhost:8000/v1")
+
+    try:
+        get_session().get(f"{api_url}/system_stats", timeout=5).raise_for_status()
+        print(f"✅ ComfyUI: Running at {api_url}")
+    except Exception:
+        print(f"❌ ComfyUI not running at {api_url}")
+        print("   Start it with: ./scripts/start_comfyui.sh")
+        sys.exit(1)
+
+    daemon = GenerationDaemon(api_url, tts_url, max(1, args.workers or settings.daemon.workers))
+    server = ThreadingHTTPServer((bind.hostname or '127.0.0.1', port), make_handler(daemon))
+    print(f"🛰️  Generation daemon on http://{bind.hostname or '127.0.0.1'}:{port} "
+          f"({daemon.workers} worker(s), TTS {tts_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        flush_history()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Two-stage hi-res sketch generation for presets with `hires: true` (hd)
+SDXL is trained at about 1 MP; asking it for 1920x1080 directly is slow, uses a
+lot of memory and tends to duplicate subjects. Instead each image is:
+
+  1. generated from the basic_image template at the model's native size with the
+     output aspect ratio (1344x768 for 16:9), then
+  2. uploaded and run through a second workflow built from the same template:
+     optional model upscale -> resize to the output size -> tiled VAE encode ->
+     low-denoise KSampler (same seed) -> tiled VAE decode.
+
+The tiled VAE nodes keep encode/decode memory bounded by hires.tile_size at any
+output size.
+
+Usage:
+    python scripts/batch_generate_sketches.py --file prompts.txt --preset hd          # hires (preset default)
+    python scripts/hires_pipeline.py --benchmark --frames 6                          # modeled estimate (fake server)
+    python scripts/hires_pipeline.py --benchmark --frames 6 --api-url http://127.0.0.1:8188
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.generation_config import ConfigError, load_settings
+from scripts.batch_generate_sketches import build_sketch_workflow, generate_single_sketch
+from scripts.run_manifest import resolve_seed
+from scripts.workflow_compiler import find_nodes, linked_node, load_object_info, set_inputs, use_cache_dir
+
+BASE_DIR = "hires_base"
+
+
+def native_resolution(resolution, native_pixels=1024 * 1024, multiple=64):
+    """Size with the output's aspect ratio and about native_pixels pixels, in multiples of 64"""
+    width, height = resolution
+    scale = (native_pixels / (width * height)) ** 0.5
+    return (max(multiple, round(width * scale / multiple) * multiple),
+            max(multiple, round(height * scale / multiple) * multiple))
+
+
+def refine_steps(steps, denoise) -> int:
+    """Executed steps for a refine at `denoise` that matches a `steps`-step schedule's tail"""
+    return max(1, round(steps * denoise))
+
+
+def build_hires_workflow(workflow_path, image_name, prompt, negative_prompt, resolution, steps, cfg_scale, seed,
+                         denoise, output_filename, tile_size=512, upscale_model="", object_info=None):
+    """
+    Second-stage workflow: the sketch template re-wired to refine an uploaded base image
+
+    LoadImage [-> ImageUpscaleWithModel] -> ImageScale -> VAEEncodeTiled -> KSampler -> VAEDecodeTiled
+    The KSampler runs refine_steps(steps, denoise) steps, not the full `steps`.
+    """
+    workflow = build_sketch_workflow(workflow_path, prompt, negative_prompt, resolution, steps, cfg_scale, seed,
+                                     output_filename, object_info)
+    sampler_id = find_nodes(workflow, 'KSampler')[0]
+    del workflow[linked_node(workflow, sampler_id, 'latent_image')]
+    decode_id = find_nodes(workflow, 'VAEDecode')[0]
+    vae = workflow[decode_id]['inputs']['vae']
+    overlap = max(32, tile_size // 8 // 32 * 32)
+
+    next_id = max(int(node_id) for node_id in workflow if node_id.isdigit()) + 1
+
+    def add(class_type, title, **inputs):
+        nonlocal next_id
+        node_id = str(next_id)
+        next_id += 1
+        workflow[node_id] = {'class_type': class_type, 'inputs': inputs, '_meta': {'title': title}}
+        return [node_id, 0]
+
+    image = add('LoadImage', 'Load Base', image=image_name)
+    if upscale_model:
+        model = add('UpscaleModelLoader', 'Upscale Model', model_name=upscale_model)
+        image = add('ImageUpscaleWithModel', 'Upscale Base', upscale_model=model, image=image)
+    # Exact output size (a model upscale overshoots by its fixed factor)
+    image = add('ImageScale', 'Resize Base', image=image, upscale_method='lanczos',
+                width=resolution[0], height=resolution[1], crop='disabled')
+    latent = add('VAEEncodeTiled', 'Encode Base (tiled)', pixels=image, vae=vae, tile_size=tile_size,
+                 overlap=overlap, temporal_size=64, temporal_overlap=8)
+    # KSampler runs all `steps` whatever the denoise; only the tail of the schedule is needed
+    set_inputs(workflow, sampler_id, latent_image=latent, denoise=denoise, steps=refine_steps(steps, denoise))
+
+    decode = workflow[decode_id]
+    workflow[decode_id] = dict(decode, class_type='VAEDecodeTiled',
+                               inputs=dict(decode['inputs'], tile_size=tile_size, overlap=overlap,
+                                           temporal_size=64, temporal_overlap=8),
+                               _meta={'title': 'VAE Decode (tiled)'})
+    return workflow
+
+
+def generate_hires_sketch(name, prompt, api_url, workflow_path, output_dir,
+                          resolution=(1920, 1080), steps=25, cfg_scale=7.5,
+                          seed=-1, style="sketch", scene_number=None, run_info=None):
+    """
+    Drop-in for generate_single_sketch that renders through the two-stage pipeline
+
+    run_info gets the final image's record, the combined timings and each stage's
+    timings under 'stages'.
+    Returns: (name, success, output_path, error_message)
+    """
+    from scripts.draft_refine import upload_image
+
+    hires = load_settings().hires
+    seed = resolve_seed(seed)
+    if run_info is None:
+        run_info = {}
+    native = native_resolution(resolution, hires.native_pixels)
+
+    base_info = {}
+    base = generate_single_sketch(name, prompt, api_url, workflow_path, os.path.join(output_dir, BASE_DIR),
+                                  native, steps, cfg_scale, seed, style, scene_number, run_info=base_info)
+    if not base[1]:
+        run_info.update(base_info, stages={'base': base_info.get('timings', {})})
+        return (name, False, None, f"base image: {base[3]}")
+
+    try:
+        image_name = upload_image(api_url, base[2], f"hires_{base_info['sha256'][:16]}.png")
+    except Exception as e:
+        run_info.update(base_info, stages={'base': base_info.get('timings', {})})
+        return (name, False, None, f"upload: {e}")
+    object_info = load_object_info(api_url)
+
+    def build(full_prompt, negative_prompt, output_filename, job_seed):
+        return build_hires_workflow(workflow_path, image_name, full_prompt, negative_prompt, resolution, steps,
+                                    cfg_scale, job_seed, hires.denoise, output_filename, hires.tile_size,
+                                    hires.upscale_model, object_info)
+
+    result = generate_single_sketch(name, prompt, api_url, workflow_path, output_dir, resolution, steps, cfg_scale,
+                                    seed, style, scene_number, run_info=run_info, workflow_builder=build)
+    stages = {'base': base_info.get('timings', {}), 'refine': run_info.get('timings', {})}
+    run_info['timings'] = {key: round(sum(stage.get(key, 0.0) for stage in stages.values()), 3)
+                           for key in ('wait', 'execution', 'total') if any(key in stage for stage in stages.values())}
+    run_info['stages'] = stages
+    run_info['base_resolution'] = list(native)
+    run_info['base_output'] = base[2]
+    return result
+
+
+class VramSampler:
+    """Poll /system_stats in the background and keep the highest VRAM use seen (first GPU)"""
+
+    def __init__(self, api_url, interval=0.25):
+        import threading
+        self.api_url = api_url
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        import requests
+        while True:
+            try:
+                device = requests.get(f"{self.api_url}/system_stats", timeout=5).json()['devices'][0]
+                used = device['vram_total'] - device['vram_free']
+                self.peak = used if self.peak is None else max(self.peak, used)
+            except (requests.RequestException, ValueError, KeyError, IndexError):
+                pass
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_benchmark(api_url, frames, resolution, steps, cfg_scale, parallel=2, sample_vram=False):
+    """
+    Render the same frames directly at `resolution` and through the hires pipeline
+
+    With parallel >= 2 the GPU queue never runs dry, so seconds per frame measure
+    GPU throughput rather than the client's polling interval. With sample_vram
+    (real servers only) models are unloaded before each mode and peak VRAM use is
+    sampled from /system_stats while it runs.
+    """
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+    from scripts.history_gc import flush_all as flush_history
+
+    workflow_path = project_root / "workflows" / "basic_image.json"
+    modes = {'direct': generate_single_sketch, 'hires': generate_hires_sketch}
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, generate in modes.items():
+            def job(i):
+                info = {}
+                result = generate(f"bench_{i}", f"A benchmark sketch number {i}", api_url, workflow_path,
+                                  os.path.join(tmp, mode), resolution, steps, cfg_scale, 1000 + i,
+                                  scene_number=i + 1, run_info=info)
+                return result, info
+
+            if sample_vram:
+                # Start each mode from an empty GPU so the peak is its own
+                requests.post(f"{api_url}/free", json={'unload_models': True, 'free_memory': True}, timeout=30)
+            sampler = VramSampler(api_url) if sample_vram else contextlib.nullcontext()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()), sampler, \
+                    ThreadPoolExecutor(max_workers=parallel) as executor:
+                outcomes = list(executor.map(job, range(frames)))
+            wall = time.perf_counter() - start
+            # Send pending history deletions while the server is still up
+            flush_history()
+            execution = [info.get('timings', {}).get('execution', 0.0) for result, info in outcomes if result[1]]
+            for i, (result, _) in enumerate(outcomes):
+                if not result[1]:
+                    print(f"   ⚠️  {mode} frame {i + 1}: {result[3]}")
+            results[mode] = {
+                'frames': frames,
+                'parallel': parallel,
+                'succeeded': len(execution),
+                'wall_seconds': round(wall, 3),
+                'seconds_per_frame': round(wall / max(len(execution), 1), 3),
+                'gpu_seconds_per_frame': round(sum(execution) / max(len(execution), 1), 3),
+            }
+            if sample_vram:
+                results[mode]['peak_vram_mb'] = round(sampler.peak / 2**20) if sampler.peak is not None else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the hi-res pipeline against direct HD generation')
+    parser.add_argument('--benchmark', action='store_true', help='Run the benchmark (default: show the plan)')
+    parser.add_argument('--frames', type=int, default=4, help='Images per mode')
+    parser.add_argument('--parallel', type=int, default=2, help='Images in flight per mode')
+    parser.add_argument('--preset', default='hd', help='Preset giving the output resolution/steps')
+    parser.add_argument('--api-url', default=None,
+                        help='Measure on a real ComfyUI, including peak VRAM '
+                             '(default: modeled estimate from the fake server)')
+    parser.add_argument('--latency', type=float, default=4.0,
+                        help='Fake server: seconds for one 1 MP image at 20 steps')
+    parser.add_argument('--port', type=int, default=8199, help='Fake server port')
+    parser.add_argument('--output', default=None, help='Results JSON (default: output/benchmarks/hires_<timestamp>.json)')
+
+    args = parser.parse_args()
+
+    try:
+        settings = load_settings()
+        preset = settings.preset(args.preset)
+    except ConfigError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    hires = settings.hires
+    native = native_resolution(preset.resolution, hires.native_pixels)
+    print(f"🖼️  {preset.name}: {preset.resolution[0]}x{preset.resolution[1]}, {preset.steps} steps")
+    print(f"   hires: base {native[0]}x{native[1]} -> "
+          f"{hires.upscale_model or 'lanczos'} -> refine denoise {hires.denoise}, VAE tiles {hires.tile_size}px")
+    if not args.benchmark:
+        return
+
+    with contextlib.ExitStack() as stack:
+        if args.api_url:
+            api_url = args.api_url.rstrip('/')
+        else:
+            from scripts.benchmark_comfyui import fake_server_process
+            # Fake-server schema and model snapshots must not land in the real cache
+            stack.enter_context(use_cache_dir(stack.enter_context(tempfile.TemporaryDirectory())))
+            api_url = stack.enter_context(fake_server_process(args.port, args.latency, 0.0, 0.0, 64, 1,
+                                                              gpu_model=True))
+        print(f"🧪 {args.frames} frame(s) per mode, {args.parallel} in flight, on {api_url}")
+        results = run_benchmark(api_url, args.frames, preset.resolution, preset.steps, preset.cfg_scale,
+                                max(1, args.parallel), sample_vram=bool(args.api_url))
+
+    print(f"{'mode':<7} {'ok':>7} {'s/frame':>8} {'GPU s/frame':>12} {'peak VRAM':>10}")
+    for mode, run in results.items():
+        peak = run.get('peak_vram_mb')
+        print(f"{mode:<7} {run['succeeded']:>3}/{run['frames']:<3} {run['seconds_per_frame']:8.2f} "
+              f"{run['gpu_seconds_per_frame']:12.2f} {f'{peak} MB' if peak is not None else '-':>10}")
+    direct, staged = results['direct'], results['hires']
+    summary = {}
+    if not args.api_url:
+        # The fake server's job time is pixels x executed steps, so this restates its cost model
+        if direct['gpu_seconds_per_frame'] and staged['succeeded']:
+            summary['modeled_gpu_ratio'] = round(staged['gpu_seconds_per_frame'] / direct['gpu_seconds_per_frame'], 3)
+            print(f"📐 Modeled estimate: hires takes {summary['modeled_gpu_ratio']:.2f}x the GPU time of direct "
+                  f"under the fake server's cost model (pixels x executed steps), not a measurement")
+        print("   Speedup and peak memory are only reported for a real server (--api-url)")
+    elif direct['seconds_per_frame'] and staged['succeeded']:
+        summary['speedup'] = round(direct['seconds_per_frame'] / staged['seconds_per_frame'], 3)
+        print(f"⚡ hires: {summary['speedup']:.2f}x direct "
+              f"({staged['seconds_per_frame']:.2f} vs {direct['seconds_per_frame']:.2f} s per HD frame)")
+        if direct.get('peak_vram_mb') is not None and staged.get('peak_vram_mb') is not None:
+            print(f"💾 Peak VRAM: hires {staged['peak_vram_mb']} MB vs direct {direct['peak_vram_mb']} MB")
+
+    output_path = Path(args.output) if args.output else \
+        project_root / 'output' / 'benchmarks' / f"hires_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump({'created': datetime.now().isoformat(timespec='seconds'), 'api_url': args.api_url or 'fake',
+                   'preset': args.preset, 'resolution': list(preset.resolution), 'base_resolution': list(native),
+                   'hires': {'denoise': hires.denoise, 'tile_size': hires.tile_size,
+                             'upscale_model': hires.upscale_model},
+                   'measured': bool(args.api_url), **summary, 'runs': results}, f, indent=2)
+    print(f"💾 Results saved: {output_path}")
+
+
+if __name__ == '__main__':
+    main()
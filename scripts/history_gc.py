@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Clean up ComfyUI after its outputs have been saved
+ComfyUI keeps every finished prompt in /history (in memory, for the lifetime of
+the server) and every output file in its output folder, so a long batch run
+grows both without bound. Once a job's artifact is saved here:
+
+  - its prompt_id is queued for deletion from /history; pending ids go out as one
+    POST /history {"delete": [...]} every comfyui.gc_batch_size jobs, and at the
+    end of the run, instead of one request per job
+  - with comfyui.prune_outputs, ComfyUI's copy of each saved output is unlinked.
+    Only possible when its output folder is on this host (comfyui.local_output_dir);
+    our hard-linked copies keep the data.
+
+Usage:
+    python scripts/history_gc.py                 # show history size / cleanup settings
+    python scripts/history_gc.py --clear         # delete all finished entries from /history
+"""
+
+import argparse
+import atexit
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.generation_config import load_settings
+from scripts.artifact_pickup import local_output_dir, local_source
+
+OUTPUT_KINDS = ('images', 'videos', 'gifs')
+
+
+def delete_history(api_url, prompt_ids=None):
+    """Delete the given prompts from ComfyUI's /history (all finished ones when None)"""
+    from scripts.generate_clip import get_session
+    body = {'clear': True} if prompt_ids is None else {'delete': list(prompt_ids)}
+    response = get_session().post(f"{api_url}/history", json=body, timeout=30)
+    response.raise_for_status()
+
+
+def prune_outputs(outputs: dict, local_dir) -> int:
+    """Unlink ComfyUI's copy of each output in a history entry; returns the number removed"""
+    removed = 0
+    for node_output in outputs.values():
+        for kind in OUTPUT_KINDS:
+            for info in node_output.get(kind, []):
+                source = local_source(info, local_dir)
+                if source is None:
+                    continue
+                try:
+                    source.unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+    return removed
+
+
+class HistoryCollector:
+    """Batches history deletions for one ComfyUI server; safe to share between threads"""
+
+    def __init__(self, api_url, batch_size=16, delete=True, prune=False):
+        self.api_url = api_url
+        self.batch_size = batch_size
+        self.delete = delete
+        # Pruning needs the output folder; another host's files are out of reach
+        self.local_dir = local_output_dir(api_url) if prune else None
+        self.pending = []
+        self.deleted = 0
+        self.pruned = 0
+        self.failed = False
+        self._lock = threading.Lock()
+
+    def saved(self, prompt_id, outputs=None):
+        """Call once the job's outputs are saved; outputs is its history 'outputs' dict"""
+        if outputs and self.local_dir is not None:
+            removed = prune_outputs(outputs, self.local_dir)
+            with self._lock:
+                self.pruned += removed
+        if not self.delete or not prompt_id:
+            return
+        with self._lock:
+            self.pending.append(prompt_id)
+            if len(self.pending) < self.batch_size:
+                return
+            batch, self.pending = self.pending, []
+        self._send(batch)
+
+    def flush(self):
+        """Delete whatever is still pending"""
+        with self._lock:
+            batch, self.pending = self.pending, []
+        if batch:
+            self._send(batch)
+
+    def _send(self, batch):
+        try:
+            delete_history(self.api_url, batch)
+        except Exception as e:
+            # Cleanup never fails a job; the entries just stay until ComfyUI restarts
+            if not self.failed:
+                print(f"⚠️  Could not delete ComfyUI history on {self.api_url}: {e}")
+            self.failed = True
+            return
+        with self._lock:
+            self.deleted += len(batch)
+
+
+_collectors = {}
+_collectors_lock = threading.Lock()
+
+
+def history_collector(api_url) -> HistoryCollector:
+    """The shared collector for api_url, configured from the comfyui section"""
+    with _collectors_lock:
+        collector = _collectors.get(api_url)
+        if collector is None:
+            comfyui = load_settings().comfyui
+            collector = HistoryCollector(api_url, comfyui.gc_batch_size, comfyui.delete_history,
+                                         comfyui.prune_outputs)
+            _collectors[api_url] = collector
+        return collector
+
+
+def release(api_url, prompt_id, outputs=None):
+    """Hand a finished job to its server's collector"""
+    history_collector(api_url).saved(prompt_id, outputs)
+
+
+def flush_all():
+    """Flush every collector; run at the end of a batch and at exit"""
+    with _collectors_lock:
+        collectors = list(_collectors.values())
+    for collector in collectors:
+        collector.flush()
+
+
+atexit.register(flush_all)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or clear ComfyUI history')
+    parser.add_argument('--api-url', default=None, help='ComfyUI URL (default: config comfyui.url)')
+    parser.add_argument('--clear', action='store_true', help='Delete all finished entries from /history')
+
+    args = parser.parse_args()
+
+    from scripts.generate_clip import get_session
+    comfyui = load_settings().comfyui
+    api_url = (args.api_url or comfyui.url).rstrip('/')
+    try:
+        if args.clear:
+            delete_history(api_url)
+            print(f"🧹 Cleared history on {api_url}")
+        history = get_session().get(f"{api_url}/history", timeout=30).json()
+    except Exception as e:
+        print(f"❌ {api_url}: {e}")
+        sys.exit(1)
+    print(f"📋 {api_url}: {len(history)} entr{'y' if len(history) == 1 else 'ies'} in /history")
+    print(f"   delete_history: {comfyui.delete_history} (batches of {comfyui.gc_batch_size}), "
+          f"prune_outputs: {comfyui.prune_outputs}"
+          + ("" if local_output_dir(api_url) else " (no local output folder, pruning inactive)"))
+
+
+if __name__ == '__main__':
+    main()
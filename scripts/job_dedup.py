@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Batch-level deduplication of identical generation jobs
+Jobs with the same normalized prompt and settings are generated once and the
+output is hard-linked to every other scene that asked for it. Jobs with a random
+seed are never merged, since each is expected to produce a different image.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace and case so trivially different copies of a prompt match"""
+    return ' '.join(prompt.split()).lower()
+
+
+def job_key(prompt: str, **settings) -> str:
+    """Stable key for a (prompt, settings) job"""
+    payload = json.dumps({'prompt': normalize_prompt(prompt), **settings}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def plan_unique_jobs(jobs: Iterable, key_fn: Callable) -> List[Tuple[object, list]]:
+    """
+    Group jobs by key_fn(job), keeping first-seen order
+
+    key_fn returns None for jobs that must not be merged (e.g. random seed).
+    Returns [(primary_job, [duplicate_jobs...]), ...]
+    """
+    groups: Dict[str, Tuple[object, list]] = {}
+    plan = []
+    for job in jobs:
+        key = key_fn(job)
+        if key is not None and key in groups:
+            groups[key][1].append(job)
+            continue
+        entry = (job, [])
+        plan.append(entry)
+        if key is not None:
+            groups[key] = entry
+    return plan
+
+
+def link_or_copy(source, target):
+    """Hard-link source to target (replacing target), copying when linking is not possible"""
+    source = os.fspath(source)
+    target = os.fspath(target)
+    if os.path.abspath(source) == os.path.abspath(target):
+        return target
+    tmp_target = target + '.tmp'
+    if os.path.lexists(tmp_target):
+        os.unlink(tmp_target)
+    try:
+        os.link(source, tmp_target)
+    except OSError:
+        # Cross-device or filesystem without hard links
+        shutil.copy2(source, tmp_target)
+    os.replace(tmp_target, target)
+    return target
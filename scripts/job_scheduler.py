@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Priority- and deadline-aware scheduling of generation jobs
+Jobs are dispatched from a heap instead of in file order:
+
+  1. higher priority first (default 0)
+  2. then earliest deadline (seconds after the run started; none = last)
+  3. then fair share across projects: each job gets a virtual finish tag
+     (start-time fair queuing), so a project with weight 2 is served twice as
+     often as one with weight 1 and a big project cannot starve a small one
+  4. then submission order
+
+Jobs are read from their sources lazily, LOOKAHEAD at a time (round-robin when
+there are several), so a huge prompts file or script is still streamed. Settings
+for scenes that have not been read yet are kept and applied when they arrive;
+while any of them sets a priority or deadline, reading continues past the window
+until those scenes are found, parking the jobs in between in file order. So
+`--priority 2000=10` still runs scene 2000 first, at the cost of holding the
+~2000 jobs before it (a scene that does not exist holds the whole file).
+
+A running batch polls its control file (<output>/scheduler_control.jsonl) before
+every dispatch; each appended line is one command:
+
+    {"scenes": [3, 4, 5], "priority": 10}        jump the queue
+    {"scenes": [12], "deadline": 300}            due 300 s after the run started
+    {"cancel": [7, 8]}                           drop pending scenes
+    {"project": "series-b", "weight": 2}         fair-share weight
+
+Usage:
+    python scripts/batch_generate_sketches.py --file prompts.txt --priority 1-8          # preview first
+    python scripts/job_scheduler.py output/survival/images/scheduler_control.jsonl --scenes 3,7-9 --priority 10
+    python scripts/job_scheduler.py CONTROL --scenes 12 --deadline 300
+    python scripts/job_scheduler.py CONTROL --cancel 20-25
+    python scripts/job_scheduler.py CONTROL --project series-b --weight 2
+"""
+
+import argparse
+import collections
+import heapq
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.run_manifest import parse_scene_list
+
+CONTROL_NAME = "scheduler_control.jsonl"
+LOOKAHEAD = 1024
+DEFAULT_PROJECT = "default"
+
+
+@dataclass
+class Job:
+    """One schedulable unit; payload is whatever the caller dispatches"""
+    key: Hashable
+    payload: Any
+    priority: int = 0
+    deadline: Optional[float] = None  # seconds after the scheduler started
+    project: str = DEFAULT_PROJECT
+
+
+class JobScheduler:
+    """
+    Heap of pending jobs, iterated in dispatch order
+
+    source yields Job objects and is read on demand; add_source() adds more and
+    add() enqueues directly. Iteration ends when the heap is empty and every
+    source is exhausted.
+    """
+
+    def __init__(self, source: Iterable[Job] = (), control_path=None, lookahead=LOOKAHEAD,
+                 weights: Dict[str, float] = None, clock=time.monotonic):
+        self.sources = collections.deque([iter(source)])
+        self.lookahead = lookahead
+        self.clock = clock
+        self.started = clock()
+        self.weights = dict(weights or {})
+        self.heap = []
+        self.entries = {}  # key -> live heap entry
+        self.overrides = {}  # key -> {'priority'/'deadline'/'cancel'} for jobs not read yet
+        self.wanted = set()  # keys of unread jobs given a priority or deadline
+        self.parked = collections.OrderedDict()  # key -> job read past the window while looking for them
+        self.vtime = 0.0  # virtual time: start tag of the last dispatched job
+        self.finish = {}  # project -> virtual finish tag of its last queued job
+        self.counter = itertools.count()
+        self.uids = itertools.count()
+        self.dispatched = 0
+        self.late = []  # keys dispatched after their deadline
+        self._lock = threading.RLock()
+        self.control_path = Path(control_path) if control_path else None
+        self.control_offset = 0
+        if self.control_path is not None:
+            # Only commands appended during this run apply
+            self.control_path.parent.mkdir(parents=True, exist_ok=True)
+            self.control_path.touch()
+            self.control_offset = self.control_path.stat().st_size
+
+    def __len__(self):
+        return len(self.entries) + len(self.parked)
+
+    def __contains__(self, key):
+        return key in self.entries or key in self.parked
+
+    def now(self) -> float:
+        """Seconds since the scheduler started: the clock deadlines are measured on"""
+        return self.clock() - self.started
+
+    def _tag(self, project) -> tuple:
+        start = max(self.vtime, self.finish.get(project, 0.0))
+        tag = start + 1.0 / self.weights.get(project, 1.0)
+        self.finish[project] = tag
+        return start, tag
+
+    def _push(self, job: Job, start, tag, seq):
+        deadline = math.inf if job.deadline is None else job.deadline
+        # The unique id keeps a re-pushed job from ever tying with its own stale entry
+        entry = [-job.priority, deadline, tag, seq, next(self.uids), start, job]
+        self.entries[job.key] = entry
+        heapq.heappush(self.heap, entry)
+
+    def add(self, job: Job):
+        """Queue a job; a pending job with the same key is replaced"""
+        with self._lock:
+            override = self.overrides.pop(job.key, {})
+            self.wanted.discard(job.key)
+            if override.get('cancel'):
+                return
+            for field in ('priority', 'deadline'):
+                if field in override:
+                    setattr(job, field, override[field])
+            self._remove(job.key)
+            self._push(job, *self._tag(job.project), next(self.counter))
+
+    def _remove(self, key):
+        """Take a pending job out of the heap; returns (entry fields, job) or None"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        job = entry[-1]
+        entry[-1] = None  # lazily dropped when it reaches the top
+        return entry[:-1], job
+
+    def update(self, key, priority=None, deadline=None) -> bool:
+        """Change a pending job's priority/deadline (remembered if it has not been read yet)"""
+        with self._lock:
+            if key in self.parked:
+                job = self.parked.pop(key)
+                if priority is not None:
+                    job.priority = priority
+                if deadline is not None:
+                    job.deadline = deadline
+                self.add(job)
+                return True
+            removed = self._remove(key)
+            if removed is None:
+                override = self.overrides.setdefault(key, {})
+                if priority is not None:
+                    override['priority'] = priority
+                if deadline is not None:
+                    override['deadline'] = deadline
+                if not override.get('cancel'):
+                    self.wanted.add(key)
+                return False
+            entry, job = removed
+            if priority is not None:
+                job.priority = priority
+            if deadline is not None:
+                job.deadline = deadline
+            # Keeps its fair-share tag and submission order
+            self._push(job, entry[5], entry[2], entry[3])
+            return True
+
+    def cancel(self, key) -> bool:
+        """Drop a pending job (or a job that has not been read yet)"""
+        with self._lock:
+            if self.parked.pop(key, None) is not None:
+                return True
+            if self._remove(key) is None:
+                self.overrides[key] = {'cancel': True}
+                self.wanted.discard(key)
+                return False
+            return True
+
+    def forget(self, key):
+        """Drop settings remembered for a job that will never be read"""
+        with self._lock:
+            self.overrides.pop(key, None)
+            self.wanted.discard(key)
+
+    def set_weight(self, project, weight):
+        """Fair-share weight of a project; pending tags are recomputed"""
+        with self._lock:
+            self.weights[project] = float(weight)
+            live = sorted(self.entries.values(), key=lambda entry: entry[3])
+            self.heap, self.entries, self.finish = [], {}, {}
+            for entry in live:
+                self._push(entry[-1], *self._tag(entry[-1].project), entry[3])
+
+    def add_source(self, source: Iterable[Job]):
+        """Read jobs from another iterable as well, taking turns with the others"""
+        with self._lock:
+            self.sources.append(iter(source))
+
+    def _read(self) -> Optional[Job]:
+        """Next job from the sources in turn, or None when they are all exhausted"""
+        while self.sources:
+            try:
+                job = next(self.sources[0])
+            except StopIteration:
+                self.sources.popleft()
+                continue
+            self.sources.rotate(-1)
+            return job
+        return None
+
+    def _fill(self):
+        while len(self.entries) < self.lookahead:
+            job = self.parked.popitem(last=False)[1] if self.parked else self._read()
+            if job is None:
+                break
+            self.add(job)
+        # Prioritized jobs further down jump the window; the ones in between wait their turn
+        while self.wanted:
+            job = self._read()
+            if job is None:
+                self.wanted.clear()
+                break
+            if job.key in self.wanted:
+                self.add(job)
+            else:
+                self.parked[job.key] = job
+
+    def poll_control(self) -> list:
+        """Apply commands appended to the control file since the last poll; returns them"""
+        if self.control_path is None:
+            return []
+        try:
+            if self.control_path.stat().st_size <= self.control_offset:
+                return []
+            with open(self.control_path, 'rb') as f:
+                f.seek(self.control_offset)
+                data = f.read()
+        except OSError:
+            return []
+        # Only whole lines: a command still being appended is read next time
+        complete = data[:data.rfind(b'\n') + 1]
+        self.control_offset += len(complete)
+        commands = []
+        for line in complete.decode('utf-8', errors='replace').splitlines():
+            if not line.strip():
+                continue
+            try:
+                command = json.loads(line)
+                self.apply(command)
+            except (ValueError, TypeError, AttributeError) as e:
+                print(f"⚠️  Ignored scheduler command {line.strip()!r}: {e}")
+                continue
+            commands.append(command)
+        return commands
+
+    def apply(self, command: dict):
+        """Apply one control command (see the module docstring)"""
+        if 'project' in command and 'weight' in command:
+            weight = float(command['weight'])
+            if weight <= 0:
+                raise ValueError("weight must be > 0")
+            self.set_weight(command['project'], weight)
+            print(f"⚖️  Project {command['project']}: weight {weight:g}")
+        if 'cancel' in command:
+            keys = list(command['cancel'])
+            for key in keys:
+                self.cancel(key)
+            print(f"🚫 Cancelled scene(s) {', '.join(str(k) for k in keys)}")
+        if 'scenes' in command:
+            priority = command.get('priority')
+            deadline = command.get('deadline')
+            if priority is None and deadline is None:
+                raise ValueError("scenes needs a priority and/or deadline")
+            keys = list(command['scenes'])
+            for key in keys:
+                self.update(key, None if priority is None else int(priority),
+                            None if deadline is None else float(deadline))
+            changes = ([f"priority {priority}"] if priority is not None else []) + \
+                      ([f"deadline {deadline}s"] if deadline is not None else [])
+            print(f"⏫ Scene(s) {', '.join(str(k) for k in keys)}: {', '.join(changes)}")
+
+    def next_job(self) -> Optional[Job]:
+        """Pop the job to dispatch now, or None when nothing is left"""
+        self.poll_control()
+        with self._lock:
+            self._fill()
+            while self.heap:
+                entry = heapq.heappop(self.heap)
+                job = entry[-1]
+                if job is None:
+                    continue
+                del self.entries[job.key]
+                self.vtime = entry[5]
+                self.dispatched += 1
+                if job.deadline is not None and self.now() > job.deadline:
+                    self.late.append(job.key)
+                return job
+            return None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        job = self.next_job()
+        if job is None:
+            raise StopIteration
+        return job.payload
+
+    def pending(self) -> list:
+        """Pending jobs in dispatch order (as of now)"""
+        with self._lock:
+            return [entry[-1] for entry in sorted(self.entries.values())] + list(self.parked.values())
+
+
+def parse_assignments(values, default=1) -> Dict[int, float]:
+    """['1-8', '12=5'] -> {1: default, ..., 8: default, 12: 5}; later values win"""
+    assigned = {}
+    for value in values or []:
+        scenes, _, level = value.partition('=')
+        for scene in parse_scene_list(scenes):
+            assigned[scene] = float(level) if level else default
+    return assigned
+
+
+def append_command(control_path, command: dict):
+    """Append one command as a single write, so the scheduler never sees half a line"""
+    line = json.dumps(command) + '\n'
+    fd = os.open(control_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line.encode('utf-8'))
+    finally:
+        os.close(fd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-prioritize the pending jobs of a running batch')
+    parser.add_argument('control', help=f'Control file of the running batch (<output>/{CONTROL_NAME})')
+    parser.add_argument('--scenes', default=None, help='Scenes to change, e.g. 3,7-9')
+    parser.add_argument('--priority', type=int, default=None, help='New priority (higher runs first)')
+    parser.add_argument('--deadline', type=float, default=None, help='Seconds after the run started')
+    parser.add_argument('--cancel', default=None, help='Scenes to drop, e.g. 20-25')
+    parser.add_argument('--project', default=None, help='Project whose fair-share weight to set')
+    parser.add_argument('--weight', type=float, default=None, help='Fair-share weight (default 1)')
+
+    args = parser.parse_args()
+
+    command = {}
+    if args.scenes:
+        if args.priority is None and args.deadline is None:
+            parser.error('--scenes needs --priority and/or --deadline')
+        command['scenes'] = parse_scene_list(args.scenes)
+        if args.priority is not None:
+            command['priority'] = args.priority
+        if args.deadline is not None:
+            command['deadline'] = args.deadline
+    if args.cancel:
+        command['cancel'] = parse_scene_list(args.cancel)
+    if args.project or args.weight is not None:
+        if not args.project or args.weight is None or args.weight <= 0:
+            parser.error('--project and a positive --weight go together')
+        command.update(project=args.project, weight=args.weight)
+    if not command:
+        parser.error('nothing to do: give --scenes, --cancel or --project/--weight')
+    if not os.path.exists(args.control):
+        print(f"❌ {args.control} not found (is the batch running?)")
+        sys.exit(1)
+
+    append_command(args.control, command)
+    print(f"📨 {json.dumps(command)} -> {args.control}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Shared progress and ETA tracking for long batch runs
+Each stage (image, tts, encode) keeps an EWMA of observed job durations and the
+number of jobs actually in flight, so throughput and ETA follow the real worker
+concurrency rather than the configured one.
+
+In a terminal a single status line is kept at the bottom (regular prints scroll
+above it); when output is piped, progress is written as periodic JSON lines.
+Set DOODLY_PROGRESS=tty|json|off to override the auto-detection.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+PROGRESS_ENV = "DOODLY_PROGRESS"
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    """Compact duration: 45s, 12m05s, 2h14m"""
+    if seconds is None:
+        return '?'
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+class StageProgress:
+    """Completion counts and EWMA job duration for one stage"""
+
+    def __init__(self, name: str, total: int, alpha: float = 0.3):
+        self.name = name
+        self.total = total
+        self.alpha = alpha
+        self.done = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.workers = 0
+        self.ewma_duration: Optional[float] = None
+
+    def start(self):
+        self.in_flight += 1
+        self.workers = max(self.workers, self.in_flight)
+
+    def finish(self, duration: float, ok: bool = True):
+        self.in_flight = max(0, self.in_flight - 1)
+        self.done += 1
+        if not ok:
+            self.failed += 1
+        if self.ewma_duration is None:
+            self.ewma_duration = duration
+        else:
+            self.ewma_duration += self.alpha * (duration - self.ewma_duration)
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.total - self.done)
+
+    def throughput(self) -> Optional[float]:
+        """Jobs per second at the observed concurrency"""
+        if not self.ewma_duration:
+            return None
+        return max(1, self.workers) / self.ewma_duration
+
+    def eta(self) -> Optional[float]:
+        if not self.remaining:
+            return 0.0
+        rate = self.throughput()
+        if rate is None:
+            return None
+        # The tail of a stage cannot use more workers than jobs left
+        workers = max(1, min(self.workers, self.remaining))
+        return self.remaining * self.ewma_duration / workers
+
+    def as_dict(self) -> dict:
+        rate = self.throughput()
+        eta = self.eta()
+        return {
+            'done': self.done,
+            'total': self.total,
+            'failed': self.failed,
+            'in_flight': self.in_flight,
+            'jobs_per_min': round(rate * 60, 2) if rate else None,
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+        }
+
+
+class _StatusLineStream:
+    """stdout proxy that clears the status line before output and redraws it after each line"""
+
+    def __init__(self, stream, tracker):
+        self._stream = stream
+        self._tracker = tracker
+
+    def write(self, text):
+        with self._tracker._lock:
+            self._tracker._clear_line()
+            written = self._stream.write(text)
+            if text.endswith('\n'):
+                self._stream.flush()
+                self._tracker._draw_line()
+        return written
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class ProgressTracker:
+    """
+    Track per-stage progress and render it as a status line or JSON lines
+
+    Usage:
+        progress = ProgressTracker({'image': 40, 'tts': 55})
+        with progress:
+            started = progress.start('image')
+            ...
+            progress.finish('image', started, ok=True)
+    """
+
+    def __init__(self, stages: Dict[str, int], mode: Optional[str] = None, stream=None,
+                 interval: Optional[float] = None, alpha: float = 0.3):
+        self.stages = {name: StageProgress(name, total, alpha) for name, total in stages.items()}
+        self.stream = stream or sys.stderr
+        mode = (mode or os.getenv(PROGRESS_ENV) or 'auto').lower()
+        if mode == 'auto':
+            mode = 'tty' if hasattr(self.stream, 'isatty') and self.stream.isatty() else 'json'
+        self.mode = mode
+        self.interval = interval if interval is not None else (0.5 if mode == 'tty' else 10.0)
+        self.started_at = time.time()
+        self._lock = threading.RLock()
+        self._line_shown = False
+        self._last_emit = 0.0
+        self._stop = threading.Event()
+        self._ticker: Optional[threading.Thread] = None
+        self._saved_stdout = None
+
+    # Job accounting
+
+    def set_total(self, stage: str, total: int):
+        with self._lock:
+            self.stages[stage].total = total
+
+    def skip(self, stage: str, count: int = 1):
+        """Drop jobs that will not run (e.g. voice chunks of a scene whose image failed)"""
+        with self._lock:
+            self.stages[stage].total = max(self.stages[stage].done, self.stages[stage].total - count)
+
+    def start(self, stage: str) -> float:
+        """Mark a job as started; returns the start time to pass to finish()"""
+        with self._lock:
+            self.stages[stage].start()
+        return time.time()
+
+    def finish(self, stage: str, started: float, ok: bool = True):
+        with self._lock:
+            self.stages[stage].finish(time.time() - started, ok)
+        self.refresh(force=self.mode == 'tty')
+
+    # Estimates
+
+    def eta(self) -> Optional[float]:
+        """Remaining time over all stages (stages run one after another per item)"""
+        total = 0.0
+        for stage in self.stages.values():
+            eta = stage.eta()
+            if eta is None:
+                return None
+            total += eta
+        return total
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            eta = self.eta()
+            return {
+                'event': 'progress',
+                'elapsed_seconds': round(time.time() - self.started_at, 1),
+                'eta_seconds': round(eta, 1) if eta is not None else None,
+                'stages': {name: stage.as_dict() for name, stage in self.stages.items()},
+            }
+
+    def status_line(self) -> str:
+        parts = []
+        for stage in self.stages.values():
+            if not stage.total:
+                continue
+            rate = stage.throughput()
+            rate_text = f"{rate * 60:.1f}/min" if rate else "-/min"
+            failed = f" {stage.failed}✗" if stage.failed else ""
+            parts.append(f"{stage.name} {stage.done}/{stage.total}{failed} {rate_text} ETA {format_eta(stage.eta())}")
+        elapsed = format_eta(time.time() - self.started_at)
+        return f"⏱  {elapsed} | " + ' | '.join(parts) + f" | total ETA {format_eta(self.eta())}"
+
+    # Rendering
+
+    def _clear_line(self):
+        if self._line_shown:
+            self.stream.write('\r\x1b[K')
+            self._line_shown = False
+
+    def _draw_line(self):
+        line = self.status_line()
+        width = self._terminal_width()
+        if len(line) > width - 1:
+            line = line[:width - 2] + '…'
+        self.stream.write('\r\x1b[K' + line)
+        self.stream.flush()
+        self._line_shown = True
+
+    def _terminal_width(self) -> int:
+        try:
+            return os.get_terminal_size(self.stream.fileno()).columns
+        except (AttributeError, OSError, ValueError):
+            return 120
+
+    def refresh(self, force: bool = False):
+        """Redraw the status line or emit a JSON line if the interval has elapsed"""
+        if self.mode == 'off':
+            return
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_emit < self.interval:
+                return
+            self._last_emit = now
+            if self.mode == 'tty':
+                self._draw_line()
+            else:
+                self.stream.write(json.dumps(self.snapshot()) + '\n')
+                self.stream.flush()
+
+    def _tick(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def __enter__(self):
+        if self.mode == 'off':
+            return self
+        if self.mode == 'tty' and sys.stdout.isatty():
+            self._saved_stdout = sys.stdout
+            sys.stdout = _StatusLineStream(sys.stdout, self)
+        self._ticker = threading.Thread(target=self._tick, daemon=True)
+        self._ticker.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.mode == 'off':
+            return False
+        self._stop.set()
+        if self._ticker:
+            self._ticker.join()
+        with self._lock:
+            if self._saved_stdout is not None:
+                sys.stdout = self._saved_stdout
+                self._saved_stdout = None
+            if self.mode == 'tty':
+                self._draw_line()
+                self.stream.write('\n')
+                self._line_shown = False
+            else:
+                final = self.snapshot()
+                final['event'] = 'done'
+                self.stream.write(json.dumps(final) + '\n')
+            self.stream.flush()
+        return False
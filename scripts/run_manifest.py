@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Run manifests for reproducible generation
+Every job records the resolved seed, a hash of the API workflow it submitted, the
+model file(s), the ComfyUI prompt_id, timings and the output checksum, so a good
+image can be regenerated exactly and failed scenes can be replayed.
+
+Scenes are indexed by scene number for direct lookup:
+
+    {
+      "version": 1,
+      "created": "...", "updated": "...",
+      "settings": {...},
+      "scenes": {
+        "3": {"name": "...", "prompt": "...", "seed": 123, "workflow_hash": "...",
+              "models": [...], "prompt_id": "...", "timings": {...},
+              "success": true, "output": "...", "sha256": "..."}
+      }
+    }
+
+Usage:
+    python scripts/run_manifest.py output/survival/images/run_manifest.json           # summary
+    python scripts/run_manifest.py output/survival/images/run_manifest.json --failed  # failed scene numbers
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "run_manifest.json"
+SEED_MAX = 2**31 - 1
+# Loader inputs that name a model file
+MODEL_INPUTS = ('ckpt_name', 'unet_name', 'vae_name', 'lora_name', 'model_name', 'clip_name')
+
+
+def resolve_seed(seed: int) -> int:
+    """Turn -1 (random) into a concrete seed so it can be recorded"""
+    if seed is None or seed < 0:
+        return random.randint(0, SEED_MAX)
+    return seed
+
+
+def workflow_hash(api_workflow: dict) -> str:
+    """Stable hash of an API-format workflow (key order does not matter)"""
+    payload = json.dumps(api_workflow, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def workflow_models(api_workflow: dict) -> list:
+    """Model filenames referenced by loader nodes"""
+    models = []
+    for node in api_workflow.values():
+        for key in MODEL_INPUTS:
+            value = node.get('inputs', {}).get(key)
+            if isinstance(value, str) and value not in models:
+                models.append(value)
+    return models
+
+
+class RunManifest:
+    """Thread-safe per-scene job records, written atomically"""
+
+    def __init__(self, path, settings: dict = None, data: dict = None, save_interval: float = 2.0):
+        self.path = Path(path)
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        now = datetime.now().isoformat(timespec='seconds')
+        self.data = data or {'version': MANIFEST_VERSION, 'created': now, 'updated': now,
+                             'settings': settings or {}, 'scenes': {}}
+        if settings:
+            self.data['settings'] = settings
+
+    @classmethod
+    def load(cls, path) -> 'RunManifest':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not isinstance(data.get('scenes'), dict):
+            raise ValueError(f"{path}: not a run manifest")
+        if data.get('version', 0) > MANIFEST_VERSION:
+            raise ValueError(f"{path}: manifest version {data['version']} is newer than supported ({MANIFEST_VERSION})")
+        return cls(path, data=data)
+
+    @property
+    def settings(self) -> dict:
+        return self.data.get('settings', {})
+
+    @property
+    def scenes(self) -> dict:
+        return self.data['scenes']
+
+    def get(self, scene_number):
+        return self.scenes.get(str(scene_number))
+
+    def record(self, scene_number, **fields):
+        """Store (replace) the record for a scene; saves at most every save_interval seconds"""
+        with self._lock:
+            self.scenes[str(scene_number)] = fields
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def failed(self) -> list:
+        return sorted(int(n) for n, record in self.scenes.items() if not record.get('success'))
+
+    def select(self, scene_numbers=None) -> list:
+        """(scene_number, record) pairs to replay: the given scenes, or every failed one"""
+        numbers = self.failed() if scene_numbers is None else scene_numbers
+        missing = [n for n in numbers if self.get(n) is None]
+        if missing:
+            raise ValueError(f"Scenes not in manifest: {', '.join(str(n) for n in missing)}")
+        return [(n, self.get(n)) for n in numbers]
+
+    def save(self):
+        with self._lock:
+            self.data['updated'] = datetime.now().isoformat(timespec='seconds')
+            # Parallel runs record in completion order; keep the file in scene order
+            self.data['scenes'] = dict(sorted(self.scenes.items(), key=lambda item: int(item[0])))
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._last_save = time.monotonic()
+
+
+def parse_scene_list(value: str) -> list:
+    """'3,5,8-10' -> [3, 5, 8, 9, 10]"""
+    scenes = []
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(p) for p in part.split('-', 1))
+            scenes.extend(range(start, end + 1))
+        else:
+            scenes.append(int(part))
+    return scenes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect a generation run manifest')
+    parser.add_argument('manifest', help='run_manifest.json')
+    parser.add_argument('--failed', action='store_true', help='Print only the failed scene numbers')
+
+    args = parser.parse_args()
+
+    try:
+        manifest = RunManifest.load(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    failed = manifest.failed()
+    if args.failed:
+        print(','.join(str(n) for n in failed))
+        return
+
+    total = len(manifest.scenes)
+    print(f"📋 {args.manifest}")
+    print(f"   Created: {manifest.data.get('created')}  Updated: {manifest.data.get('updated')}")
+    print(f"   Scenes: {total}  ✅ {total - len(failed)}  ❌ {len(failed)}")
+    if failed:
+        print(f"   Failed: {','.join(str(n) for n in failed)}")
+        print(f"   Replay: --replay {args.manifest}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Streaming scene script loaders
+Scenes are yielded one at a time from either format, so generation can start on
+the first scene while the rest of a large series script is still unread:
+
+    complete_script.json   [ {"scene_number": 1, ...}, {"scene_number": 2, ...}, ... ]
+    complete_script.jsonl  one scene object per line
+
+Usage:
+    python scripts/scene_stream.py scripts/complete_script.json            # count + validate
+    python scripts/scene_stream.py scripts/complete_script.json --to-jsonl out.jsonl
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Iterator
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+JSONL_SUFFIXES = ('.jsonl', '.ndjson')
+READ_CHUNK = 64 * 1024
+WHITESPACE = ' \t\r\n'
+
+
+def iter_jsonl(path) -> Iterator[dict]:
+    """Yield one object per non-empty line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e.msg})") from None
+
+
+def iter_json_array(path, chunk_size: int = READ_CHUNK) -> Iterator[dict]:
+    """Yield the elements of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            # Drop consumed text so the buffer only ever holds about one element
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] != '[':
+            raise ValueError(f"{path}: expected a JSON array of scenes")
+        pos += 1
+
+        expect_comma = False
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise ValueError(f"{path}: unexpected end of file inside the scene array")
+            char = buffer[pos]
+            if char == ']':
+                return
+            if expect_comma:
+                if char != ',':
+                    raise ValueError(f"{path}: expected ',' between scenes, found {char!r}")
+                pos += 1
+                skip_whitespace()
+            while True:
+                try:
+                    element, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise ValueError(f"{path}: invalid JSON in scene array") from None
+                    fill()
+                    continue
+                # A bare number/literal may continue in the next chunk
+                if end == len(buffer) and not eof:
+                    fill()
+                    continue
+                break
+            pos = end
+            expect_comma = True
+            yield element
+
+
+def iter_scenes(path) -> Iterator[dict]:
+    """Yield scenes from a JSONL (.jsonl/.ndjson) or JSON array script"""
+    if Path(path).suffix.lower() in JSONL_SUFFIXES:
+        return iter_jsonl(path)
+    return iter_json_array(path)
+
+
+def count_scenes(path) -> int:
+    """
+    Cheap scene count for progress totals (no JSON parsing)
+
+    JSONL: non-empty lines. JSON: occurrences of the "scene_number" key, which every
+    scene carries.
+    """
+    if Path(path).suffix.lower() in JSONL_SUFFIXES:
+        with open(path, 'r', encoding='utf-8') as f:
+            return sum(1 for line in f if line.strip())
+
+    key = b'"scene_number"'
+    count = 0
+    tail = b''
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk:
+                return count
+            data = tail + chunk
+            count += data.count(key)
+            # Keep a partial key that may straddle the chunk boundary (too short to hold a whole one)
+            tail = data[-(len(key) - 1):]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate, count or convert a scene script')
+    parser.add_argument('script', help='Scene script (.json array or .jsonl)')
+    parser.add_argument('--to-jsonl', help='Write the scenes as JSONL to this path')
+
+    args = parser.parse_args()
+
+    count = 0
+    out = open(args.to_jsonl, 'w', encoding='utf-8') if args.to_jsonl else None
+    try:
+        for scene in iter_scenes(args.script):
+            count += 1
+            if 'scene_number' not in scene:
+                print(f"⚠️  Scene {count} has no scene_number")
+            if out:
+                out.write(json.dumps(scene, ensure_ascii=False) + '\n')
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        if out:
+            out.close()
+
+    print(f"✅ {count} scenes in {args.script}")
+    if args.to_jsonl:
+        print(f"   JSONL written: {args.to_jsonl}")
+
+
+if __name__ == '__main__':
+    main()
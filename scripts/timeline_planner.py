@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Plan the video timeline from the real length of each scene's narration
+Scene durations come from PCM sample counts (recorded while streaming TTS),
+so video and voiceover line up exactly instead of being cut with -shortest
+
+Usage:
+    python scripts/timeline_planner.py --scenes-dir output/survival/script --output output/survival/timeline.json
+    python scripts/timeline_planner.py --scenes-dir output/survival/script --output timeline.json --render-clips
+    python scripts/assemble_video.py --timeline output/survival/timeline.json --output output/survival/final.mp4
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# OpenAI-compatible TTS PCM: 24kHz, 16-bit, mono
+PCM_SAMPLE_RATE = 24000
+PCM_SAMPLE_WIDTH = 2
+PCM_CHANNELS = 1
+
+# Sidecar written next to the voice chunks: {"voice_scene_1_A.mp3": pcm_bytes, ...}
+VOICE_INDEX_FILENAME = "voice_index.json"
+
+# Bitrate used by convert_pcm_to_mp3, only for estimating chunks with no recorded length
+MP3_BITRATE = 192000
+
+_index_lock = threading.Lock()
+
+
+def pcm_samples(pcm_bytes: int, sample_width: int = PCM_SAMPLE_WIDTH, channels: int = PCM_CHANNELS) -> int:
+    """Number of sample frames in a raw PCM byte count"""
+    return pcm_bytes // (sample_width * channels)
+
+
+def record_voice_chunk(output_dir: Path, audio_filename: str, pcm_bytes: int):
+    """Record a chunk's PCM byte length in the directory's voice index"""
+    index_path = Path(output_dir) / VOICE_INDEX_FILENAME
+    with _index_lock:
+        index = load_voice_index(output_dir)
+        index[audio_filename] = int(pcm_bytes)
+        tmp_path = index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, index_path)
+
+
+def load_voice_index(output_dir: Path) -> Dict[str, int]:
+    """Load the voice index ({filename: pcm_bytes}); empty if missing"""
+    index_path = Path(output_dir) / VOICE_INDEX_FILENAME
+    if not index_path.exists():
+        return {}
+    with open(index_path, 'r') as f:
+        return json.load(f)
+
+
+def chunk_pcm_bytes(audio_path: Path, index: Dict[str, int]) -> Optional[int]:
+    """PCM byte length of a voice chunk from the index, or the .pcm file size if it was kept"""
+    if audio_path.name in index:
+        return index[audio_path.name]
+    pcm_path = audio_path.with_suffix('.pcm')
+    if pcm_path.exists():
+        return pcm_path.stat().st_size
+    return None
+
+
+def find_scene_audio(scenes_dir: Path, scene_num: int) -> List[Path]:
+    """Voice chunks for a scene in chunk order (voice_scene_N_A, _B, ...)"""
+    chunks = {}
+    pattern = re.compile(rf"^voice_scene_{scene_num}_([A-Z]+)\.(mp3|pcm)$")
+    for path in scenes_dir.glob(f"voice_scene_{scene_num}_*"):
+        match = pattern.match(path.name)
+        if match and (match.group(1) not in chunks or path.suffix == '.mp3'):
+            chunks[match.group(1)] = path
+    return [chunks[letter] for letter in sorted(chunks, key=lambda k: (len(k), k))]
+
+
+def find_scene_numbers(scenes_dir: Path) -> List[int]:
+    """Scene numbers that have an image in the directory"""
+    numbers = set()
+    for path in scenes_dir.glob("scene_*.png"):
+        match = re.match(r"^scene_(\d+)\.png$", path.name)
+        if match:
+            numbers.add(int(match.group(1)))
+    return sorted(numbers)
+
+
+def plan_timeline(scenes_dir, scene_numbers: Optional[List[int]] = None, fps: int = 24,
+                  padding: float = 0.5, min_duration: float = 2.0, hold: float = 1.0,
+                  sample_rate: int = PCM_SAMPLE_RATE, clips_dir=None) -> dict:
+    """
+    Build a timeline where each scene lasts as long as its narration (plus padding)
+
+    Scene boundaries are snapped to whole video frames on the cumulative clock so the
+    rounding never drifts across hundreds of scenes.
+
+    Args:
+        scenes_dir: Directory with scene_N.png and voice_scene_N_X.mp3 files
+        scene_numbers: Scenes in order (default: every scene_N.png found)
+        fps: Video frame rate
+        padding: Seconds of silence after each scene's narration
+        min_duration: Minimum scene length in seconds (scenes without narration)
+        hold: Seconds the finished drawing stays on screen at the end of a scene
+        sample_rate: PCM sample rate of the voice chunks
+        clips_dir: Optional directory with pre-rendered scene_N.mp4 clips
+    """
+    scenes_dir = Path(scenes_dir)
+    index = load_voice_index(scenes_dir)
+    if scene_numbers is None:
+        scene_numbers = find_scene_numbers(scenes_dir)
+
+    scenes = []
+    timeline_frames = 0
+    timeline_samples = 0
+    for scene_num in scene_numbers:
+        audio = []
+        for chunk_path in find_scene_audio(scenes_dir, scene_num):
+            pcm_bytes = chunk_pcm_bytes(chunk_path, index)
+            estimated = pcm_bytes is None
+            if estimated:
+                # Last resort for chunks generated before lengths were recorded
+                seconds = chunk_path.stat().st_size * 8 / MP3_BITRATE
+                pcm_bytes = int(seconds * sample_rate) * PCM_SAMPLE_WIDTH * PCM_CHANNELS
+            samples = pcm_samples(pcm_bytes)
+            audio.append({
+                'file': str(chunk_path.absolute()),
+                'pcm_bytes': pcm_bytes,
+                'samples': samples,
+                'duration': samples / sample_rate,
+                'estimated': estimated,
+            })
+
+        audio_samples = sum(chunk['samples'] for chunk in audio)
+        target_samples = max(audio_samples + int(round(padding * sample_rate)) if audio else 0,
+                             int(round(min_duration * sample_rate)))
+
+        start_frame = timeline_frames
+        timeline_samples += target_samples
+        end_frame = int(math.ceil(timeline_samples * fps / sample_rate))
+        frames = max(1, end_frame - start_frame)
+        timeline_frames = start_frame + frames
+        duration = frames / fps
+
+        scene_hold = min(hold, duration / 2)
+        image_path = scenes_dir / f"scene_{scene_num}.png"
+        clip_path = Path(clips_dir) / f"scene_{scene_num}.mp4" if clips_dir else None
+        scenes.append({
+            'scene_number': scene_num,
+            'image': str(image_path.absolute()),
+            'clip': str(clip_path.absolute()) if clip_path and clip_path.exists() else None,
+            'audio': audio,
+            'audio_duration': audio_samples / sample_rate,
+            'start': start_frame / fps,
+            'duration': duration,
+            'frames': frames,
+            'draw_duration': duration - scene_hold,
+            'hold': scene_hold,
+        })
+
+    return {
+        'fps': fps,
+        'sample_rate': sample_rate,
+        'total_frames': timeline_frames,
+        'total_duration': timeline_frames / fps,
+        'scenes': scenes,
+    }
+
+
+def save_timeline(timeline: dict, output_path):
+    """Write the timeline JSON"""
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(timeline, f, indent=2)
+
+
+def load_timeline(timeline_path) -> dict:
+    """Read a timeline JSON"""
+    with open(timeline_path, 'r') as f:
+        return json.load(f)
+
+
+def render_timeline_clips(timeline: dict, clips_dir, resolution=None, hand=True) -> int:
+    """Render a draw-on clip per scene whose reveal speed matches its planned duration"""
+    from scripts.draw_on_renderer import render_draw_on
+
+    clips_dir = Path(clips_dir)
+    clips_dir.mkdir(parents=True, exist_ok=True)
+    rendered = 0
+    for scene in timeline['scenes']:
+        clip_path = clips_dir / f"scene_{scene['scene_number']}.mp4"
+        if render_draw_on(scene['image'], clip_path, duration=scene['duration'], fps=timeline['fps'],
+                          hold=scene['hold'], resolution=resolution, hand=hand):
+            scene['clip'] = str(clip_path.absolute())
+            rendered += 1
+    return rendered
+
+
+def scene_audio_filter(scene: dict, first_input: int, sample_rate: int, label: str) -> str:
+    """Filter graph chain joining a scene's voice chunks, padded with silence to the scene length"""
+    duration = f"{scene['duration']:.6f}"
+    if not scene['audio']:
+        return f"anullsrc=r={sample_rate}:cl=mono,atrim=0:{duration}{label}"
+    inputs = ''.join(f"[{first_input + i}:a]" for i in range(len(scene['audio'])))
+    return (
+        f"{inputs}concat=n={len(scene['audio'])}:v=0:a=1,aresample={sample_rate},"
+        f"apad=whole_dur={duration},atrim=0:{duration}{label}"
+    )
+
+
+def build_ffmpeg_command(timeline: dict, output_path, work_dir, resolution=(1920, 1080)) -> List[str]:
+    """
+    Build a single ffmpeg invocation that renders the whole timeline
+
+    Video comes from a concat list (scene clips, or still images shown for their planned
+    duration). Each scene's narration chunks are concatenated and padded with silence to
+    the scene length, so nothing is truncated.
+    """
+    fps = timeline['fps']
+    sample_rate = timeline['sample_rate']
+    scenes = timeline['scenes']
+    width, height = resolution
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    use_clips = bool(scenes) and all(scene.get('clip') for scene in scenes)
+    concat_file = work_dir / 'timeline_concat.txt'
+    with open(concat_file, 'w') as f:
+        for scene in scenes:
+            if use_clips:
+                f.write(f"file '{scene['clip']}'\n")
+                f.write(f"outpoint {scene['duration']:.6f}\n")
+            else:
+                f.write(f"file '{scene['image']}'\n")
+                f.write(f"duration {scene['duration']:.6f}\n")
+        if scenes and not use_clips:
+            # The concat demuxer ignores the last image's duration unless it is repeated
+            f.write(f"file '{scenes[-1]['image']}'\n")
+
+    cmd = ['ffmpeg', '-f', 'concat', '-safe', '0', '-i', str(concat_file)]
+
+    filters = []
+    scene_labels = []
+    input_index = 1
+    for i, scene in enumerate(scenes):
+        for chunk in scene['audio']:
+            cmd.extend(['-i', chunk['file']])
+        label = f"[s{i}]"
+        filters.append(scene_audio_filter(scene, input_index, sample_rate, label))
+        input_index += len(scene['audio'])
+        scene_labels.append(label)
+    filters.append(f"{''.join(scene_labels)}concat=n={len(scene_labels)}:v=0:a=1[aout]")
+    filters.append(
+        f"[0:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:white,fps={fps},setsar=1[vout]"
+    )
+
+    cmd.extend([
+        '-filter_complex', ';'.join(filters),
+        '-map', '[vout]',
+        '-map', '[aout]',
+        '-c:v', 'libx264',
+        '-c:a', 'aac',
+        '-pix_fmt', 'yuv420p',
+        '-frames:v', str(timeline['total_frames']),
+        '-y',
+        str(Path(output_path).absolute())
+    ])
+    return cmd
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Plan a scene timeline from voiceover PCM lengths',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Plan from generate_complete_scenes.py output
+  python scripts/timeline_planner.py --scenes-dir output/survival/script --output output/survival/timeline.json
+
+  # Also render draw-on clips whose reveal speed matches each scene
+  python scripts/timeline_planner.py --scenes-dir output/survival/script --output timeline.json --render-clips
+
+  # Assemble in a single ffmpeg pass
+  python scripts/assemble_video.py --timeline timeline.json --output final.mp4
+        """
+    )
+    parser.add_argument('--scenes-dir', required=True, help='Directory with scene_N.png and voice_scene_N_X.mp3')
+    parser.add_argument('--script', default=None, help='complete_script.json to take scene order from')
+    parser.add_argument('--output', required=True, help='Timeline JSON output path')
+    parser.add_argument('--fps', type=int, default=24, help='Frame rate')
+    parser.add_argument('--padding', type=float, default=0.5, help='Silence after each scene (seconds)')
+    parser.add_argument('--min-duration', type=float, default=2.0, help='Minimum scene duration (seconds)')
+    parser.add_argument('--hold', type=float, default=1.0, help='Finished-drawing hold per scene (seconds)')
+    parser.add_argument('--render-clips', action='store_true', help='Render draw-on clips to match the plan')
+    parser.add_argument('--clips-dir', default=None, help='Draw-on clip directory (default: <scenes dir>/clips)')
+    parser.add_argument('--resolution', default=None, help='Clip render resolution (WxH)')
+
+    args = parser.parse_args()
+
+    scenes_dir = Path(args.scenes_dir)
+    if not scenes_dir.exists():
+        print(f"❌ Scenes directory not found: {scenes_dir}")
+        sys.exit(1)
+
+    scene_numbers = None
+    if args.script:
+        with open(args.script, 'r', encoding='utf-8') as f:
+            scene_numbers = [scene['scene_number'] for scene in json.load(f)]
+
+    clips_dir = Path(args.clips_dir) if args.clips_dir else scenes_dir / 'clips'
+    timeline = plan_timeline(scenes_dir, scene_numbers, fps=args.fps, padding=args.padding,
+                             min_duration=args.min_duration, hold=args.hold, clips_dir=clips_dir)
+    if not timeline['scenes']:
+        print(f"❌ No scenes found in {scenes_dir}")
+        sys.exit(1)
+
+    if args.render_clips:
+        resolution = tuple(map(int, args.resolution.split('x'))) if args.resolution else None
+        rendered = render_timeline_clips(timeline, clips_dir, resolution)
+        print(f"🎬 Rendered {rendered}/{len(timeline['scenes'])} draw-on clips")
+
+    save_timeline(timeline, args.output)
+
+    estimated = sum(1 for scene in timeline['scenes'] for chunk in scene['audio'] if chunk['estimated'])
+    print(f"📝 Planned {len(timeline['scenes'])} scenes, {timeline['total_duration']:.1f}s total")
+    if estimated:
+        print(f"⚠️  {estimated} chunk(s) had no recorded PCM length; estimated from MP3 size")
+    print(f"✅ Timeline saved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
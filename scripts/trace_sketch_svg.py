@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Trace sketch PNGs into simplified vector paths (SVG + binary path cache)
+Vector sketches can be rasterized at any resolution (e.g. the hd preset)
+without another diffusion pass on the GPU
+
+Backends:
+    numpy   - centerline strokes from the draw-on stroke plan, simplified (default)
+    potrace - filled outlines traced by the potrace CLI, if installed locally
+
+Usage:
+    python scripts/trace_sketch_svg.py --input output/survival/images
+    python scripts/trace_sketch_svg.py --input output/survival/images/scene-1.png --backend potrace
+    python scripts/trace_sketch_svg.py --rasterize output/survival/images/vector/scene-1.paths.npz --resolution 1920x1080 --output scene-1_hd.png
+    python scripts/trace_sketch_svg.py --benchmark
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.draw_on_renderer import (
+    binarize, create_test_sketch, extract_stroke_plan, file_sha256, get_stroke_plan, load_sketch
+)
+
+# Bump when the path cache layout changes
+PATH_CACHE_VERSION = 1
+
+
+class VectorPaths:
+    """
+    Traced vector paths in source pixel coordinates
+
+    kind 'stroke': polylines drawn with a round pen of `width` pixels
+    kind 'fill':   closed rings filled even-odd; `groups` marks where each shape's rings start
+    """
+
+    def __init__(self, kind: str, points: np.ndarray, offsets: np.ndarray, shape: Tuple[int, int],
+                 width: float = 1.0, groups: Optional[np.ndarray] = None, source_sha256: str = ""):
+        self.kind = kind
+        self.points = points.astype(np.float32)
+        self.offsets = offsets.astype(np.int32)
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.width = float(width)
+        self.groups = (groups if groups is not None else np.arange(len(offsets))).astype(np.int32)
+        self.source_sha256 = source_sha256
+
+    def polylines(self) -> List[np.ndarray]:
+        """Split points into individual polylines/rings"""
+        return np.split(self.points, self.offsets[1:]) if len(self.offsets) else []
+
+    def save(self, cache_path: Path):
+        """Write the binary path cache atomically"""
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temp file per writer: the same sketch may be traced concurrently
+        with tempfile.NamedTemporaryFile(dir=cache_path.parent, prefix=cache_path.stem, suffix='.tmp',
+                                         delete=False) as f:
+            try:
+                np.savez_compressed(
+                    f,
+                    version=np.int32(PATH_CACHE_VERSION),
+                    kind=np.array(self.kind),
+                    points=self.points,
+                    offsets=self.offsets,
+                    groups=self.groups,
+                    shape=np.array(self.shape, dtype=np.int32),
+                    width=np.float32(self.width),
+                    source_sha256=np.array(self.source_sha256),
+                )
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, cache_path)
+
+    @classmethod
+    def load(cls, cache_path: Path) -> Optional["VectorPaths"]:
+        """Read a binary path cache; returns None if missing, unreadable or stale"""
+        try:
+            with np.load(cache_path) as data:
+                if int(data['version']) != PATH_CACHE_VERSION:
+                    return None
+                return cls(
+                    str(data['kind']), data['points'], data['offsets'], tuple(data['shape']),
+                    float(data['width']), data['groups'], str(data['source_sha256'])
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def simplify_polyline(points: np.ndarray, tolerance: float = 1.0) -> np.ndarray:
+    """Ramer-Douglas-Peucker simplification with vectorized distance checks"""
+    if len(points) < 3:
+        return points
+    pts = points.astype(np.float64)
+    keep = np.zeros(len(pts), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(pts) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end <= start + 1:
+            continue
+        seg = pts[end] - pts[start]
+        rel = pts[start + 1:end] - pts[start]
+        norm = np.hypot(seg[0], seg[1])
+        if norm == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+
+def trace_numpy(sketch: np.ndarray, tolerance: float = 1.0, threshold: int = 160,
+                image_path=None, use_cache: bool = True) -> VectorPaths:
+    """Centerline tracing: ordered skeleton strokes simplified into polylines"""
+    if image_path is not None:
+        points, offsets, _ = get_stroke_plan(image_path, sketch, threshold, use_cache=use_cache)
+    else:
+        points, offsets = extract_stroke_plan(sketch, threshold)
+
+    ink_pixels = int(binarize(sketch, threshold).sum())
+    width = max(1.0, ink_pixels / max(1, len(points)))
+
+    simplified = [simplify_polyline(stroke, tolerance) for stroke in np.split(points, offsets[1:])] if len(points) else []
+    lengths = [len(s) for s in simplified]
+    new_offsets = np.cumsum([0] + lengths[:-1]) if simplified else np.zeros(0)
+    new_points = np.concatenate(simplified) if simplified else np.zeros((0, 2))
+    return VectorPaths('stroke', new_points, new_offsets, sketch.shape[:2], width)
+
+
+def trace_potrace(sketch: np.ndarray, potrace_bin: str, threshold: int = 160,
+                  turdsize: int = 2, tolerance: float = 0.2) -> VectorPaths:
+    """Outline tracing with the potrace CLI (GeoJSON backend, curves flattened to polygons)"""
+    ink = binarize(sketch, threshold)
+    h, w = ink.shape
+    pbm = b'P4\n%d %d\n' % (w, h) + np.packbits(ink, axis=1).tobytes()
+
+    result = subprocess.run(
+        [potrace_bin, '-b', 'geojson', '-t', str(turdsize), '-O', str(tolerance), '-o', '-', '-'],
+        input=pbm, capture_output=True, check=True
+    )
+    features = json.loads(result.stdout)['features']
+
+    rings, groups = [], []
+    for feature in features:
+        groups.append(len(rings))
+        for ring in feature['geometry']['coordinates']:
+            coords = np.array(ring, dtype=np.float32)
+            # potrace uses a bottom-left origin
+            coords[:, 1] = h - coords[:, 1]
+            rings.append(coords)
+
+    offsets = np.cumsum([0] + [len(r) for r in rings[:-1]]) if rings else np.zeros(0)
+    points = np.concatenate(rings) if rings else np.zeros((0, 2))
+    return VectorPaths('fill', points, offsets, (h, w), groups=np.array(groups))
+
+
+def find_potrace() -> Optional[str]:
+    """Locate a local potrace binary"""
+    return shutil.which('potrace')
+
+
+def trace_sketch(image_path, backend: str = 'auto', tolerance: float = 1.0,
+                 threshold: int = 160, use_cache: bool = True) -> VectorPaths:
+    """Trace a sketch image with the requested backend ('auto' prefers potrace)"""
+    sketch = load_sketch(image_path)
+    potrace_bin = find_potrace() if backend in ('auto', 'potrace') else None
+    if backend == 'potrace' and not potrace_bin:
+        raise RuntimeError("potrace not found (install with: brew install potrace)")
+
+    if potrace_bin:
+        paths = trace_potrace(sketch, potrace_bin, threshold)
+    else:
+        paths = trace_numpy(sketch, tolerance, threshold, image_path=image_path, use_cache=use_cache)
+    paths.source_sha256 = file_sha256(image_path)
+    return paths
+
+
+def paths_to_svg(paths: VectorPaths) -> str:
+    """Render vector paths as an SVG document"""
+    h, w = paths.shape
+    lines = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="{h}" viewBox="0 0 {w} {h}">',
+        f'<rect width="{w}" height="{h}" fill="#ffffff"/>',
+    ]
+
+    def fmt(poly):
+        return ' L'.join(f'{x:.1f} {y:.1f}' for x, y in poly)
+
+    polys = paths.polylines()
+    if paths.kind == 'stroke':
+        lines.append(
+            f'<g fill="none" stroke="#000000" stroke-width="{paths.width:.2f}" '
+            f'stroke-linecap="round" stroke-linejoin="round">'
+        )
+        for poly in polys:
+            if len(poly) == 1:
+                lines.append(f'<path d="M{poly[0][0]:.1f} {poly[0][1]:.1f} l0 0"/>')
+            else:
+                lines.append(f'<path d="M{fmt(poly)}"/>')
+    else:
+        lines.append('<g fill="#000000" fill-rule="evenodd" stroke="none">')
+        bounds = list(paths.groups) + [len(polys)]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            d = ' '.join(f'M{fmt(ring)} Z' for ring in polys[start:end])
+            lines.append(f'<path d="{d}"/>')
+    lines.append('</g>')
+    lines.append('</svg>')
+    return '\n'.join(lines) + '\n'
+
+
+def rasterize_paths(paths: VectorPaths, resolution: Tuple[int, int], supersample: int = 2) -> np.ndarray:
+    """
+    Rasterize vector paths to an RGB array at any (width, height)
+
+    Lines are drawn at `supersample` times the size and downsampled for anti-aliasing.
+    """
+    width, height = resolution
+    sx = width * supersample / paths.shape[1]
+    sy = height * supersample / paths.shape[0]
+    canvas = Image.new('L', (width * supersample, height * supersample), 255)
+    draw = ImageDraw.Draw(canvas)
+    polys = [poly * np.array([sx, sy], dtype=np.float32) for poly in paths.polylines()]
+
+    if paths.kind == 'stroke':
+        pen = max(1, int(round(paths.width * (sx + sy) / 2)))
+        r = pen / 2.0
+        for poly in polys:
+            pts = [tuple(p) for p in poly.tolist()]
+            if len(pts) > 1:
+                draw.line(pts, fill=0, width=pen, joint='curve')
+            for x, y in (pts[0], pts[-1]):
+                draw.ellipse([x - r, y - r, x + r, y + r], fill=0)
+    else:
+        bounds = list(paths.groups) + [len(polys)]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            for i, ring in enumerate(polys[start:end]):
+                if len(ring) >= 3:
+                    draw.polygon([tuple(p) for p in ring.tolist()], fill=0 if i == 0 else 255)
+
+    if supersample > 1:
+        canvas = canvas.resize((width, height), Image.LANCZOS)
+    return np.asarray(canvas.convert('RGB'), dtype=np.uint8)
+
+
+def vector_paths_for(image_path, output_dir=None) -> Tuple[Path, Path]:
+    """SVG and path cache locations for a sketch image"""
+    image_path = Path(image_path)
+    output_dir = Path(output_dir) if output_dir else image_path.parent / 'vector'
+    return output_dir / f"{image_path.stem}.svg", output_dir / f"{image_path.stem}.paths.npz"
+
+
+def load_vector_paths(image_path, output_dir=None) -> Optional[VectorPaths]:
+    """Load the path cache for an image if it matches the image's current contents"""
+    _, cache_path = vector_paths_for(image_path, output_dir)
+    paths = VectorPaths.load(cache_path)
+    if paths is None or paths.source_sha256 != file_sha256(image_path):
+        return None
+    return paths
+
+
+def vectorize_image(image_path, output_dir=None, backend='auto', tolerance=1.0, force=False) -> Tuple[Path, bool]:
+    """
+    Trace one sketch to SVG + path cache, skipping images whose cache is current
+
+    Returns:
+        (svg_path, traced): traced is False when the existing cache was reused
+    """
+    svg_path, cache_path = vector_paths_for(image_path, output_dir)
+    if not force and svg_path.exists() and load_vector_paths(image_path, output_dir) is not None:
+        return svg_path, False
+
+    paths = trace_sketch(image_path, backend, tolerance)
+    paths.save(cache_path)
+    svg_path.write_text(paths_to_svg(paths), encoding='utf-8')
+    return svg_path, True
+
+
+def benchmark_tracing(resolutions=((1024, 768), (1920, 1080)), repeats=3):
+    """Time the tracing stage (uncached) on synthetic sketches at each resolution"""
+    potrace_bin = find_potrace()
+    print("📊 Tracing benchmark")
+    for resolution in resolutions:
+        sketch = create_test_sketch(resolution)
+        backends = [('numpy', lambda: trace_numpy(sketch))]
+        if potrace_bin:
+            backends.append(('potrace', lambda: trace_potrace(sketch, potrace_bin)))
+        for name, fn in backends:
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                paths = fn()
+                timings.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            svg = paths_to_svg(paths)
+            svg_time = time.perf_counter() - start
+            start = time.perf_counter()
+            rasterize_paths(paths, (1920, 1080))
+            raster_time = time.perf_counter() - start
+            print(f"   {resolution[0]}x{resolution[1]} [{name}]: trace {min(timings) * 1000:.0f} ms, "
+                  f"svg {svg_time * 1000:.0f} ms ({len(svg) // 1024} KB, {len(paths.offsets)} paths, "
+                  f"{len(paths.points)} points), rasterize@1920x1080 {raster_time * 1000:.0f} ms")
+    if not potrace_bin:
+        print("   (potrace not installed; numpy backend only)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Trace sketch images into SVG + binary vector path caches',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Trace every PNG in a folder (writes <folder>/vector/scene-N.svg + .paths.npz)
+  python scripts/trace_sketch_svg.py --input output/survival/images
+
+  # Re-rasterize a traced sketch at HD without touching the GPU
+  python scripts/trace_sketch_svg.py --rasterize output/survival/images/vector/scene-1.paths.npz --resolution 1920x1080 --output scene-1_hd.png
+
+  # Measure tracing time at 1024x768 and 1920x1080
+  python scripts/trace_sketch_svg.py --benchmark
+        """
+    )
+    parser.add_argument('--input', help='Sketch PNG or directory of PNGs')
+    parser.add_argument('--output-dir', default=None, help='Output directory (default: <input dir>/vector)')
+    parser.add_argument('--backend', default='auto', choices=['auto', 'numpy', 'potrace'],
+                       help='Tracing backend (auto = potrace if installed, else numpy)')
+    parser.add_argument('--tolerance', type=float, default=1.0, help='Path simplification tolerance (pixels)')
+    parser.add_argument('--force', action='store_true', help='Re-trace even if the cache is current')
+    parser.add_argument('--rasterize', help='Path cache (.paths.npz) to rasterize')
+    parser.add_argument('--resolution', default='1920x1080', help='Rasterize resolution (WxH)')
+    parser.add_argument('--output', help='Rasterized PNG output path')
+    parser.add_argument('--benchmark', action='store_true', help='Benchmark the tracing stage and exit')
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_tracing()
+        return
+
+    if args.rasterize:
+        paths = VectorPaths.load(Path(args.rasterize))
+        if paths is None or not args.output:
+            print("❌ Need a valid --rasterize cache and --output path")
+            sys.exit(1)
+        width, height = map(int, args.resolution.split('x'))
+        Image.fromarray(rasterize_paths(paths, (width, height))).save(args.output)
+        print(f"✅ Saved: {args.output}")
+        return
+
+    if not args.input:
+        print("Error: Must provide --input, --rasterize or --benchmark")
+        sys.exit(1)
+
+    input_path = Path(args.input)
+    images = sorted(input_path.glob('*.png')) if input_path.is_dir() else [input_path]
+    if not images:
+        print(f"❌ No PNG files found in {input_path}")
+        sys.exit(1)
+
+    print(f"✏️  Tracing {len(images)} sketch(es)...")
+    start = time.time()
+    traced = 0
+    for image_path in images:
+        try:
+            svg_path, did_trace = vectorize_image(image_path, args.output_dir, args.backend, args.tolerance, args.force)
+        except (RuntimeError, subprocess.CalledProcessError) as e:
+            print(f"❌ {image_path.name}: {e}")
+            sys.exit(1)
+        traced += did_trace
+        print(f"   {'✅' if did_trace else '♻️ '} {svg_path}")
+    print(f"\n✅ Traced {traced}, reused {len(images) - traced} in {time.time() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Lightweight per-stage tracing shared by the generation scripts
+Spans (workflow build, submit, queue wait, execution, poll slack, download,
+disk write, TTS request, PCM->MP3 convert, merge, encode) are tagged with scene/chunk IDs and
+appended to a JSONL file; this module also summarizes a trace and exports it
+in Chrome trace format (chrome://tracing, https://ui.perfetto.dev)
+
+Enable tracing with --trace PATH on the scripts, or for any script:
+    DOODLY_TRACE=output/trace.jsonl python scripts/generate_complete_scenes.py
+
+Usage:
+    python scripts/tracing.py summary output/trace.jsonl
+    python scripts/tracing.py chrome output/trace.jsonl --output output/trace.chrome.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+TRACE_ENV = "DOODLY_TRACE"
+
+# Stages grouped by the resource they wait on, for the "bound by" line of the summary
+STAGE_RESOURCES = {
+    'queue_wait': 'gpu',
+    'execution': 'gpu',
+    'generation_wait': 'gpu',
+    'submit': 'network',
+    'download': 'network',
+    'tts_request': 'network',
+    'pcm_to_mp3': 'ffmpeg',
+    'merge': 'ffmpeg',
+    'encode': 'ffmpeg',
+    'workflow_build': 'cpu',
+    'disk_write': 'disk',
+    'poll_slack': 'client',
+}
+
+
+class Tracer:
+    """Append-only JSONL span writer; safe to use from threads and asyncio tasks"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', buffering=1, encoding='utf-8')
+        self._lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def record(self, name: str, start: float, end: float, **attrs):
+        """Write a finished span; start/end are wall-clock seconds (time.time())"""
+        event = {
+            'name': name,
+            'start': start,
+            'duration': max(0.0, end - start),
+            'pid': self.pid,
+            'tid': threading.get_ident(),
+        }
+        event.update({k: v for k, v in attrs.items() if v is not None})
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+_tracer: Optional[Tracer] = None
+_configured = False
+
+
+def configure_tracing(path=None) -> Optional[Tracer]:
+    """Enable tracing to path (default: $DOODLY_TRACE); returns the tracer or None"""
+    global _tracer, _configured
+    path = path or os.getenv(TRACE_ENV)
+    if _tracer is not None and (path is None or Path(path) == _tracer.path):
+        return _tracer
+    if _tracer is not None:
+        _tracer.close()
+        _tracer = None
+    if path:
+        _tracer = Tracer(path)
+    _configured = True
+    return _tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Active tracer, configured from $DOODLY_TRACE on first use"""
+    if not _configured:
+        configure_tracing()
+    return _tracer
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a block as a span; a no-op when tracing is disabled"""
+    tracer = get_tracer()
+    if tracer is None:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        tracer.record(name, start, time.time(), **attrs)
+
+
+def record_span(name: str, start: float, end: float, **attrs):
+    """Record a span whose boundaries were measured elsewhere (e.g. server timestamps)"""
+    tracer = get_tracer()
+    if tracer is not None:
+        tracer.record(name, start, end, **attrs)
+
+
+def tracing_enabled() -> bool:
+    return get_tracer() is not None
+
+
+def load_spans(path) -> List[dict]:
+    """Read all spans from a JSONL trace"""
+    spans = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    return spans
+
+
+def summarize(spans: List[dict]) -> Dict[str, dict]:
+    """Per-stage count, total, mean, p50, p95 and max duration"""
+    by_name: Dict[str, List[float]] = {}
+    for s in spans:
+        by_name.setdefault(s['name'], []).append(s['duration'])
+
+    summary = {}
+    for name, durations in by_name.items():
+        durations.sort()
+        n = len(durations)
+        summary[name] = {
+            'count': n,
+            'total': sum(durations),
+            'mean': sum(durations) / n,
+            'p50': durations[int(0.50 * (n - 1))],
+            'p95': durations[int(round(0.95 * (n - 1)))],
+            'max': durations[-1],
+        }
+    return summary
+
+
+def format_summary(spans: List[dict]) -> str:
+    """Summary table plus which resource the run spent most time waiting on"""
+    summary = summarize(spans)
+    if not summary:
+        return "No spans recorded"
+    lines = [
+        f"{'stage':<18} {'count':>6} {'total s':>9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}",
+        "-" * 75,
+    ]
+    for name, stats in sorted(summary.items(), key=lambda kv: -kv[1]['total']):
+        lines.append(
+            f"{name:<18} {stats['count']:>6} {stats['total']:>9.2f} {stats['mean'] * 1000:>9.1f} "
+            f"{stats['p50'] * 1000:>9.1f} {stats['p95'] * 1000:>9.1f} {stats['max'] * 1000:>9.1f}"
+        )
+
+    resources: Dict[str, float] = {}
+    for name, stats in summary.items():
+        resource = STAGE_RESOURCES.get(name)
+        if resource:
+            resources[resource] = resources.get(resource, 0.0) + stats['total']
+    if resources:
+        total = sum(resources.values())
+        ranked = sorted(resources.items(), key=lambda kv: -kv[1])
+        shares = ', '.join(f"{r} {t / total * 100:.0f}%" for r, t in ranked)
+        lines.append("-" * 75)
+        lines.append(f"Bound by: {ranked[0][0]} ({shares})")
+    return '\n'.join(lines)
+
+
+def print_summary(path=None):
+    """Print the summary of the active (or given) trace file"""
+    tracer = get_tracer()
+    path = path or (tracer.path if tracer else None)
+    if not path or not Path(path).exists():
+        return
+    print("\n📈 Stage timings")
+    print(format_summary(load_spans(path)))
+    print(f"Trace: {path}")
+
+
+def to_chrome_trace(spans: List[dict]) -> dict:
+    """Convert spans to the Chrome trace event format (complete 'X' events)"""
+    events = []
+    origin = min((s['start'] for s in spans), default=0.0)
+    for s in spans:
+        args = {k: v for k, v in s.items() if k not in ('name', 'start', 'duration', 'pid', 'tid')}
+        events.append({
+            'name': s['name'],
+            'cat': STAGE_RESOURCES.get(s['name'], 'other'),
+            'ph': 'X',
+            'ts': (s['start'] - origin) * 1e6,
+            'dur': s['duration'] * 1e6,
+            'pid': s.get('pid', 0),
+            'tid': s.get('tid', 0),
+            'args': args,
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize or export a JSONL stage trace')
+    parser.add_argument('command', choices=['summary', 'chrome'], help='summary table or Chrome trace export')
+    parser.add_argument('trace', help='Trace JSONL file')
+    parser.add_argument('--output', help='Chrome trace output path (default: <trace>.chrome.json)')
+
+    args = parser.parse_args()
+
+    trace_path = Path(args.trace)
+    if not trace_path.exists():
+        print(f"❌ Trace not found: {trace_path}")
+        sys.exit(1)
+    spans = load_spans(trace_path)
+
+    if args.command == 'summary':
+        print(format_summary(spans))
+    else:
+        output_path = Path(args.output) if args.output else trace_path.with_suffix('.chrome.json')
+        with open(output_path, 'w') as f:
+            json.dump(to_chrome_trace(spans), f)
+        print(f"✅ Chrome trace saved: {output_path} ({len(spans)} spans)")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,11 +6,14 @@ Provides local TTS service without API key requirements
 Usage:
     python3 scripts/tts_api_server.py
     # Server runs on http://localhost:8000
+    # Prometheus metrics at http://localhost:8000/metrics
 """
 
 import asyncio
+import importlib.util
 import io
 import sys
+import time
 from pathlib import Path
 from typing import Optional
 
@@ -20,7 +23,7 @@ sys.path.insert(0, str(project_root))
 
 try:
     from fastapi import FastAPI, HTTPException
-    from fastapi.responses import StreamingResponse
+    from fastapi.responses import PlainTextResponse, StreamingResponse
     from pydantic import BaseModel
     import uvicorn
 except ImportError:
@@ -28,13 +31,13 @@ except ImportError:
     print("   Install with: pip install fastapi uvicorn")
     sys.exit(1)
 
-try:
-    from TTS.api import TTS
-    TTS_AVAILABLE = True
-except ImportError:
-    TTS_AVAILABLE = False
+# Coqui TTS pulls in torch; check it is installed here and import it when a model is first loaded
+TTS_AVAILABLE = importlib.util.find_spec("TTS") is not None
+if not TTS_AVAILABLE:
     print("⚠️  TTS library not available, will use fallback")
 
+from scripts.tts_metrics import CONTENT_TYPE, RTF_BUCKETS, MetricsRegistry
+
 
 app = FastAPI(title="OpenAI-Compatible TTS API")
 
@@ -59,6 +62,21 @@ VOICE_MODELS = {
 }
 
 
+# PCM output format (16-bit mono at 24kHz)
+PCM_BYTES_PER_SECOND = 24000 * 2
+
+METRICS = MetricsRegistry()
+REQUESTS = METRICS.counter('tts_requests_total', 'Speech requests by voice and final status', ('voice', 'status'))
+SYNTHESIS_SECONDS = METRICS.histogram('tts_synthesis_seconds', 'Wall time from request to last audio byte', ('voice',))
+TTFB_SECONDS = METRICS.histogram('tts_time_to_first_byte_seconds', 'Wall time from request to first audio byte', ('voice',))
+REAL_TIME_FACTOR = METRICS.histogram('tts_real_time_factor', 'Audio seconds produced per wall second', ('voice',),
+                                     buckets=RTF_BUCKETS)
+MODEL_LOAD_SECONDS = METRICS.histogram('tts_model_load_seconds', 'TTS model load time', ('model',))
+QUEUE_DEPTH = METRICS.gauge('tts_queue_depth', 'Speech requests accepted and not yet finished streaming')
+BYTES_STREAMED = METRICS.counter('tts_bytes_streamed_total', 'PCM bytes streamed to clients', ('voice',))
+AUDIO_SECONDS = METRICS.counter('tts_audio_seconds_total', 'Seconds of audio streamed to clients', ('voice',))
+
+
 def get_tts_model(voice: str = "onyx"):
     """Get TTS model for voice"""
     if not TTS_AVAILABLE:
@@ -66,7 +84,11 @@ def get_tts_model(voice: str = "onyx"):
     
     model_name = VOICE_MODELS.get(voice, VOICE_MODELS["onyx"])
     try:
-        return TTS(model_name=model_name)
+        from TTS.api import TTS
+        load_start = time.perf_counter()
+        model = TTS(model_name=model_name)
+        MODEL_LOAD_SECONDS.observe(time.perf_counter() - load_start, model_name)
+        return model
     except Exception as e:
         print(f"⚠️  Error loading TTS model: {e}")
         return None
@@ -166,12 +188,43 @@ async def generate_speech_stream(text: str, voice: str = "onyx"):
                 pass
 
 
+async def metered_speech_stream(text: str, voice: str = "onyx"):
+    """generate_speech_stream wrapped with request, latency and throughput metrics"""
+    # Unknown voices fall back to onyx; keep them in one label to bound cardinality
+    label = voice if voice in VOICE_MODELS else "other"
+    start = time.perf_counter()
+    sent = 0
+    status = "error"
+    QUEUE_DEPTH.inc()
+    try:
+        async for chunk in generate_speech_stream(text, voice):
+            if not sent:
+                TTFB_SECONDS.observe(time.perf_counter() - start, label)
+            sent += len(chunk)
+            yield chunk
+        status = "ok"
+    except (asyncio.CancelledError, GeneratorExit):
+        status = "cancelled"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        QUEUE_DEPTH.dec()
+        REQUESTS.inc(label, status)
+        SYNTHESIS_SECONDS.observe(elapsed, label)
+        if sent:
+            audio_seconds = sent / PCM_BYTES_PER_SECOND
+            BYTES_STREAMED.inc(label, amount=sent)
+            AUDIO_SECONDS.inc(label, amount=audio_seconds)
+            if elapsed > 0:
+                REAL_TIME_FACTOR.observe(audio_seconds / elapsed, label)
+
+
 @app.post("/v1/audio/speech")
 async def create_speech(request: SpeechRequest):
     """OpenAI-compatible speech endpoint"""
     try:
         return StreamingResponse(
-            generate_speech_stream(request.input, request.voice),
+            metered_speech_stream(request.input, request.voice),
             media_type="audio/pcm",
             headers={
                 "Content-Type": "audio/pcm",
@@ -193,6 +246,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return PlainTextResponse(METRICS.render(), media_type=CONTENT_TYPE)
+
+
 def main():
     import argparse
     parser = argparse.ArgumentParser(description='OpenAI-compatible TTS API Server')
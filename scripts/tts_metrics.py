@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Minimal Prometheus-style metrics for the TTS API server
+Counters, gauges and pre-bucketed histograms rendered in the Prometheus text
+exposition format (0.0.4), without a prometheus_client dependency.
+
+All updates happen on the server's event loop thread, so they are plain
+dict/list arithmetic with no locks; observing a histogram is one bisect over a
+fixed bucket tuple plus two additions.
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds buckets shared by the latency-style histograms
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Audio seconds produced per wall second
+RTF_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 25.0, 50.0, 100.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._label_text: Dict[Tuple, str] = {}
+
+    def _labels(self, values: Tuple, extra: str = '') -> str:
+        text = self._label_text.get(values)
+        if text is None:
+            if len(values) != len(self.labels):
+                raise ValueError(f"{self.name} expects labels {self.labels}, got {values}")
+            text = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values))
+            self._label_text[values] = text
+        parts = [p for p in (text, extra) if p]
+        return '{' + ','.join(parts) + '}' if parts else ''
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1.0):
+        self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        if not self.values and not self.labels:
+            lines.append(f"{self.name} 0")
+        for values, total in sorted(self.values.items()):
+            lines.append(f"{self.name}{self._labels(values)} {_format_value(total)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[Tuple, float] = {}
+
+    def set(self, value: float, *label_values):
+        self.values[label_values] = value
+
+    def inc(self, *label_values, amount: float = 1.0):
+        self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def dec(self, *label_values, amount: float = 1.0):
+        self.inc(*label_values, amount=-amount)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        if not self.values and not self.labels:
+            lines.append(f"{self.name} 0")
+        for values, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{self._labels(values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_text = [f'le="{_format_value(b)}"' for b in self.buckets] + ['le="+Inf"']
+        # label values -> [per-bucket counts (non-cumulative, last is +Inf), sum]
+        self.series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *label_values):
+        state = self.series.get(label_values)
+        if state is None:
+            state = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for values, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bucket_text, count in zip(self._bucket_text, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._labels(values, bucket_text)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(values)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(values)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics in registration order and renders the /metrics payload"""
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labels=()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Offline pre-flight validation of API workflows
+Checks every job's workflow against the cached /object_info schema and a cached
+listing of the model folders before anything is submitted: unknown node types,
+missing required inputs, dangling or type-incompatible links, out-of-range or
+invalid widget values, model files that are not installed, and prompts with no
+output node. A bad batch is rejected in milliseconds instead of as N
+`node_errors` responses.
+
+Usage:
+    python scripts/workflow_validator.py workflows/basic_image.json
+    python scripts/workflow_validator.py workflows/*.json --refresh   # re-fetch schema and model listing
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.workflow_compiler import (
+    CORE_OBJECT_INFO, WorkflowCompileError, compile_workflow, is_api_workflow, is_ui_workflow, latest_snapshot,
+    load_object_info, schema_inputs, server_cache_dir, server_version
+)
+
+# Loader input -> ComfyUI model folder
+MODEL_FOLDERS = {
+    'ckpt_name': 'checkpoints',
+    'vae_name': 'vae',
+    'lora_name': 'loras',
+    'unet_name': 'diffusion_models',
+    'clip_name': 'text_encoders',
+    'control_net_name': 'controlnet',
+    'upscale_model': 'upscale_models',
+    'model_name': 'animatediff_models',
+}
+# Loaders whose input name alone does not identify the folder
+NODE_MODEL_FOLDERS = {
+    ('UpscaleModelLoader', 'model_name'): 'upscale_models',
+}
+MODEL_EXTENSIONS = ('.safetensors', '.ckpt', '.pt', '.pth', '.bin', '.sft', '.gguf')
+
+# Folders whose files a model may also be listed under
+FOLDER_ALIASES = {'diffusion_models': 'unet', 'text_encoders': 'clip'}
+
+_inventories = {}
+
+
+class ModelInventory(dict):
+    """
+    {folder: [filenames]} that can re-fetch one folder from the server
+
+    A cached listing goes stale when models are installed while the server keeps
+    running (same version, same cache key), so a model missing from it is looked
+    up again once per folder before it is reported.
+    """
+
+    def __init__(self, listing, api_url=None, cache_path=None, fresh=False):
+        super().__init__(listing)
+        self.api_url = api_url
+        self.cache_path = cache_path
+        self.refreshed = set(self) if fresh else set()
+        self._lock = threading.Lock()
+
+    def refresh_folder(self, folder) -> bool:
+        """Re-fetch a folder (and its alias) unless already done; True if the listing was updated"""
+        if self.api_url is None:
+            return False
+        import requests
+        with self._lock:
+            if folder in self.refreshed:
+                return False
+            self.refreshed.add(folder)
+            try:
+                for name in (folder, FOLDER_ALIASES.get(folder)):
+                    if name in self:
+                        listing = requests.get(f"{self.api_url}/models/{name}", timeout=10)
+                        listing.raise_for_status()
+                        self[name] = listing.json()
+            except (requests.RequestException, ValueError):
+                return False
+            if self.cache_path is not None:
+                _write_json(self.cache_path, dict(self))
+            return True
+
+
+def _write_json(path: Path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _scan_models(install_path: Path) -> dict:
+    """Model files per folder under a local ComfyUI install"""
+    inventory = {}
+    models_dir = Path(install_path).expanduser() / "models"
+    if not models_dir.is_dir():
+        return inventory
+    for folder in sorted(set(MODEL_FOLDERS.values()) | {'unet', 'clip'}):
+        root = models_dir / folder
+        if not root.is_dir():
+            continue
+        files = []
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.lower().endswith(MODEL_EXTENSIONS):
+                    files.append(os.path.relpath(os.path.join(dirpath, filename), root))
+        inventory[folder] = sorted(files)
+    return inventory
+
+
+def load_model_inventory(api_url: str = None, cache_dir: Path = None, refresh: bool = False,
+                         install_path: Path = None):
+    """
+    {folder: [filenames]} of installed models, cached on disk per server and version
+
+    Uses the server's /models/<folder> listing, falling back to the newest listing
+    cached for the same server, then to scanning a local install. Returns None when nothing is known,
+    in which case only the schema's option lists are checked. A listing read from
+    the cache is a ModelInventory that re-fetches a folder when a model is missing.
+    """
+    key = (api_url, str(install_path))
+    if key in _inventories and not refresh:
+        return _inventories[key]
+
+    import requests
+    inventory = None
+    try:
+        if api_url is None:
+            raise ValueError("no server")
+        version = re.sub(r'[^A-Za-z0-9_.-]', '_', server_version(api_url))
+        cache_path = server_cache_dir(api_url, cache_dir) / f"models_{version}.json"
+        if cache_path.exists() and not refresh:
+            with open(cache_path, 'r') as f:
+                inventory = ModelInventory(json.load(f), api_url, cache_path)
+        else:
+            response = requests.get(f"{api_url}/models", timeout=10)
+            response.raise_for_status()
+            inventory = {}
+            for folder in response.json():
+                if folder in MODEL_FOLDERS.values() or folder in ('unet', 'clip'):
+                    listing = requests.get(f"{api_url}/models/{folder}", timeout=10)
+                    listing.raise_for_status()
+                    inventory[folder] = listing.json()
+            _write_json(cache_path, inventory)
+            inventory = ModelInventory(inventory, api_url, cache_path, fresh=True)
+    except (requests.RequestException, ValueError, OSError):
+        latest = latest_snapshot(api_url, 'models', cache_dir) if api_url is not None else None
+        if latest is not None:
+            with open(latest, 'r') as f:
+                inventory = json.load(f)
+        elif install_path is not None:
+            inventory = _scan_models(install_path) or None
+
+    _inventories[key] = inventory
+    return inventory
+
+
+def _spec_type(spec):
+    return spec[0] if isinstance(spec, (list, tuple)) and spec else spec
+
+
+def _spec_options(spec) -> dict:
+    return spec[1] if isinstance(spec, (list, tuple)) and len(spec) > 1 and isinstance(spec[1], dict) else {}
+
+
+def _types_compatible(output_type, input_type) -> bool:
+    if output_type == '*' or input_type == '*' or output_type is None:
+        return True
+    if isinstance(input_type, list):
+        # Combo inputs can be fed by primitives/selectors emitting COMBO or a matching string
+        return output_type in ('COMBO', 'STRING') or isinstance(output_type, list)
+    outputs = set(str(output_type).split(','))
+    inputs = set(str(input_type).split(','))
+    return bool(outputs & inputs)
+
+
+def _check_value(name, value, spec, models, problems, where, class_type=None):
+    input_type = _spec_type(spec)
+    options = _spec_options(spec)
+    folder = NODE_MODEL_FOLDERS.get((class_type, name)) or MODEL_FOLDERS.get(name)
+    if folder and models is not None and folder in models:
+        installed = models[folder] + models.get(FOLDER_ALIASES.get(folder), [])
+        if value not in installed and isinstance(models, ModelInventory) and models.refresh_folder(folder):
+            installed = models[folder] + models.get(FOLDER_ALIASES.get(folder), [])
+        if value not in installed:
+            problems.append(f"{where}: model '{value}' not found in models/{folder}")
+        return
+    if isinstance(input_type, list):
+        if input_type and value not in input_type:
+            shown = ', '.join(map(str, input_type[:5])) + (', ...' if len(input_type) > 5 else '')
+            problems.append(f"{where}: value {value!r} not in list [{shown}]")
+        return
+    if input_type in ('INT', 'FLOAT'):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            problems.append(f"{where}: expected {input_type}, got {value!r}")
+            return
+        if input_type == 'INT' and isinstance(value, float) and not value.is_integer():
+            problems.append(f"{where}: expected INT, got {value!r}")
+        minimum, maximum = options.get('min'), options.get('max')
+        if minimum is not None and value < minimum:
+            problems.append(f"{where}: {value} is below the minimum {minimum}")
+        if maximum is not None and value > maximum:
+            problems.append(f"{where}: {value} is above the maximum {maximum}")
+    elif input_type == 'STRING' and not isinstance(value, str):
+        problems.append(f"{where}: expected STRING, got {value!r}")
+    elif input_type == 'BOOLEAN' and not isinstance(value, bool):
+        problems.append(f"{where}: expected BOOLEAN, got {value!r}")
+
+
+def validate_workflow(api_workflow: dict, object_info: dict = None, models: dict = None) -> list:
+    """Problems ComfyUI would report for this API workflow (empty list if it looks valid)"""
+    object_info = object_info or CORE_OBJECT_INFO
+    problems = []
+    has_output = False
+
+    for node_id, node in api_workflow.items():
+        class_type = node.get('class_type')
+        node_schema = object_info.get(class_type)
+        label = f"node {node_id} ({class_type})"
+        if node_schema is None:
+            problems.append(f"{label}: unknown node type")
+            continue
+        has_output = has_output or bool(node_schema.get('output_node'))
+        inputs = node.get('inputs', {})
+        required = node_schema.get('input', {}).get('required') or {}
+
+        for name, spec in schema_inputs(node_schema):
+            where = f"{label}.{name}"
+            if name not in inputs:
+                if name in required:
+                    problems.append(f"{where}: required input missing")
+                continue
+            value = inputs[name]
+            if isinstance(value, list) and len(value) == 2 and isinstance(value[1], int) and isinstance(value[0], str):
+                source = api_workflow.get(value[0])
+                if source is None:
+                    problems.append(f"{where}: linked to missing node {value[0]}")
+                    continue
+                source_schema = object_info.get(source.get('class_type'))
+                if source_schema is None:
+                    continue  # reported on the source node
+                outputs = source_schema.get('output') or []
+                if value[1] >= len(outputs):
+                    problems.append(f"{where}: node {value[0]} has no output slot {value[1]}")
+                    continue
+                output_type = outputs[value[1]]
+                if not _types_compatible(output_type, _spec_type(spec)):
+                    problems.append(f"{where}: expects {_spec_type(spec)}, linked to {output_type} "
+                                    f"from node {value[0]} ({source['class_type']})")
+            else:
+                _check_value(name, value, spec, models, problems, where, class_type)
+
+    if not has_output:
+        problems.append("workflow has no output node (e.g. SaveImage)")
+    return problems
+
+
+def preflight(jobs, object_info: dict = None, models: dict = None) -> dict:
+    """
+    Validate (label, api_workflow) pairs; returns {problem: [labels]} for every problem found
+
+    Identical problems across jobs (e.g. one missing checkpoint) are reported once.
+    """
+    problems = {}
+    for label, api_workflow in jobs:
+        for problem in validate_workflow(api_workflow, object_info, models):
+            problems.setdefault(problem, []).append(label)
+    return problems
+
+
+def format_problems(problems: dict, max_labels: int = 5) -> str:
+    lines = [f"Pre-flight validation failed ({len(problems)} problem(s)):"]
+    for problem, labels in problems.items():
+        shown = ', '.join(str(label) for label in labels[:max_labels])
+        if len(labels) > max_labels:
+            shown += f", ... ({len(labels)} jobs)"
+        lines.append(f"  - {problem}  [{shown}]")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate ComfyUI workflows without submitting them')
+    parser.add_argument('workflows', nargs='+', help='UI or API workflow JSON files')
+    parser.add_argument('--api-url', default=None, help='ComfyUI URL for schema/model listing (default: from config)')
+    parser.add_argument('--offline', action='store_true', help='Use only cached data and the local install')
+    parser.add_argument('--refresh', action='store_true', help='Re-fetch /object_info and the model listing')
+
+    args = parser.parse_args()
+
+    from config.generation_config import load_settings
+    settings = load_settings()
+    api_url = None if args.offline else (args.api_url or settings.comfyui.url)
+    object_info = load_object_info(api_url, refresh=args.refresh)
+    models = load_model_inventory(api_url, refresh=args.refresh, install_path=settings.comfyui.install_path)
+    if models is None:
+        print("⚠️  No model listing available; model names are only checked against the schema")
+
+    jobs = []
+    compile_failed = False
+    for workflow_path in args.workflows:
+        with open(workflow_path, 'r') as f:
+            workflow = json.load(f)
+        if not is_ui_workflow(workflow) and not is_api_workflow(workflow):
+            print(f"⏭️  {workflow_path}: not a workflow, skipped")
+            continue
+        try:
+            jobs.append((workflow_path, compile_workflow(workflow, object_info)))
+        except WorkflowCompileError as e:
+            print(f"❌ {workflow_path}: {e}")
+            compile_failed = True
+
+    start = time.perf_counter()
+    problems = preflight(jobs, object_info, models)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if problems:
+        print(f"❌ {format_problems(problems)}")
+        print(f"   ({len(jobs)} workflow(s) checked in {elapsed_ms:.1f} ms)")
+        sys.exit(1)
+    print(f"✅ {len(jobs)} workflow(s) valid ({elapsed_ms:.1f} ms)")
+    if compile_failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()